@@ -20,6 +20,7 @@
 import os.path
 import zipfile
 import tempfile
+import bcf.reader
 from xml.dom import minidom
 
 
@@ -45,6 +46,24 @@ def load(filepath):
             raise Exception(f"Version {version_id} not supported.")
 
 
+def read(filepath):
+    """Open a BCF archive for reading without extracting it
+
+    Topic summaries are indexed on opening, whereas markups and viewpoints
+    are parsed on demand. See bcf.reader.ArchiveReader.
+    """
+    version_id = bcf.reader.get_archive_version(filepath)
+    if version_id == "2.1" or version_id == "2.0":
+        from bcf.v2.bcfxml import BcfReader
+
+        return BcfReader(filepath)
+    elif version_id == "3.0":
+        from bcf.v3.bcfxml import BcfReader
+
+        return BcfReader(filepath)
+    raise Exception(f"Version {version_id} not supported.")
+
+
 def get_version(version_path):
     xmlparse = minidom.parse(version_path)
     version_el = xmlparse.getElementsByTagName("Version")[0]
@@ -0,0 +1,213 @@
+# BCF - BCF Python library
+# Copyright (C) 2020, 2021 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of BCF.
+#
+# BCF is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# BCF is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with BCF.  If not, see <http://www.gnu.org/licenses/>.
+import uuid
+import zipfile
+import posixpath
+from xml.etree import ElementTree
+
+
+class TopicSummary:
+    def __init__(self):
+        self.guid = None
+        self.title = ""
+        self.topic_status = None
+        self.topic_type = None
+        self.priority = None
+        self.assigned_to = None
+        self.creation_date = None
+        self.modified_date = None
+        self.due_date = None
+
+
+class ReadOnlyError(ValueError):
+    def __init__(self, method):
+        super().__init__(
+            f"{method}() is not supported as archives opened with bcf.bcfxml.read() are read-only, "
+            "use bcf.bcfxml.load() to edit an archive"
+        )
+
+
+class ArchiveReader:
+    """Read a BCF archive directly from its zip file
+
+    This is mixed into the BcfXml class of each BCF version. Nothing is
+    extracted to disk. When the archive is opened, only the topic elements of
+    every markup are scanned to build a lightweight index of topic
+    summaries. Full markups and viewpoints are only parsed, and validated
+    against the schemas, on demand. The archive is read-only, so methods which
+    would edit it raise a ReadOnlyError.
+    """
+
+    summary_elements = {
+        "Title": "title",
+        "Priority": "priority",
+        "AssignedTo": "assigned_to",
+        "CreationDate": "creation_date",
+        "ModifiedDate": "modified_date",
+        "DueDate": "due_date",
+    }
+
+    def open_archive(self, filepath):
+        self.archive = zipfile.ZipFile(filepath)
+        self.members = {}
+        for info in self.archive.infolist():
+            if not info.is_dir():
+                self.members[normalise_path(info.filename)] = info
+        self.last_read = None
+        self.topic_index = self.build_topic_index()
+
+    def build_topic_index(self):
+        index = {}
+        for name in self.members:
+            parts = name.split("/")
+            if len(parts) != 2 or parts[1] != "markup.bcf":
+                continue
+            try:
+                uuid.UUID(parts[0])
+            except ValueError:
+                continue
+            index[parts[0]] = self.get_topic_summary(parts[0])
+        return index
+
+    def get_topic_summary(self, guid):
+        summary = TopicSummary()
+        summary.guid = guid
+        depth = 0
+        with self.open_file(posixpath.join(guid, "markup.bcf")) as f:
+            for event, element in ElementTree.iterparse(f, events=("start", "end")):
+                tag = element.tag.rsplit("}", 1)[-1]
+                if event == "start":
+                    depth += 1
+                    if depth == 2 and tag == "Topic":
+                        summary.guid = element.get("Guid", guid)
+                        summary.topic_status = element.get("TopicStatus")
+                        summary.topic_type = element.get("TopicType")
+                    continue
+                depth -= 1
+                if depth == 2 and tag in self.summary_elements:
+                    setattr(summary, self.summary_elements[tag], element.text)
+                elif depth == 1 and tag == "Topic":
+                    break
+        return summary
+
+    def get_topic_summaries(self):
+        """Return a dictionary of topic guids to their TopicSummary"""
+        return self.topic_index
+
+    def get_topics(self):
+        self.topics = {guid: self.get_topic(guid) for guid in self.topic_index}
+        return self.topics
+
+    def read_file(self, filename):
+        """Return the contents of a file in the archive, such as a snapshot
+
+        :param filename: The path of the file in the archive, such as
+            "<topic guid>/snapshot.png"
+        :type filename: str
+        :rtype: bytes
+        """
+        with self.open_file(filename) as f:
+            return f.read()
+
+    def open_file(self, filename):
+        return self.archive.open(self.members[normalise_path(filename)])
+
+    def close_project(self):
+        archive = getattr(self, "archive", None)
+        if archive:
+            archive.close()
+
+    def new_project(self):
+        raise ReadOnlyError("new_project")
+
+    def edit_project(self):
+        raise ReadOnlyError("edit_project")
+
+    def save_project(self, filepath):
+        raise ReadOnlyError("save_project")
+
+    def edit_version(self):
+        raise ReadOnlyError("edit_version")
+
+    def add_topic(self, topic=None):
+        raise ReadOnlyError("add_topic")
+
+    def edit_topic(self, topic):
+        raise ReadOnlyError("edit_topic")
+
+    def delete_topic(self, guid):
+        raise ReadOnlyError("delete_topic")
+
+    def add_comment(self, topic, comment=None):
+        raise ReadOnlyError("add_comment")
+
+    def edit_comment(self, comment, topic):
+        raise ReadOnlyError("edit_comment")
+
+    def delete_comment(self, guid, topic):
+        raise ReadOnlyError("delete_comment")
+
+    def add_viewpoint(self, topic, viewpoint=None):
+        raise ReadOnlyError("add_viewpoint")
+
+    def delete_viewpoint(self, guid, topic):
+        raise ReadOnlyError("delete_viewpoint")
+
+    def add_file(self, topic, header_file):
+        raise ReadOnlyError("add_file")
+
+    def delete_file(self, topic, index):
+        raise ReadOnlyError("delete_file")
+
+    def add_bim_snippet(self, topic, bim_snippet):
+        raise ReadOnlyError("add_bim_snippet")
+
+    def delete_bim_snippet(self, topic):
+        raise ReadOnlyError("delete_bim_snippet")
+
+    def add_document_reference(self, topic, document_reference):
+        raise ReadOnlyError("add_document_reference")
+
+    def delete_document_reference(self, topic, index):
+        raise ReadOnlyError("delete_document_reference")
+
+    def _has_file(self, filename):
+        return normalise_path(filename) in self.members
+
+    def _read_xml(self, filename, xsd):
+        # Markups are read by each of get_topic(), get_comments(), etc.
+        if self.last_read and self.last_read[0] == (filename, xsd):
+            return self.last_read[1]
+        with self.open_file(filename) as f:
+            data = self._parse_xml(f, xsd)
+        self.last_read = ((filename, xsd), data)
+        return data
+
+
+def normalise_path(filename):
+    return posixpath.normpath(filename.replace("\\", "/")).lstrip("/")
+
+
+def get_archive_version(filepath):
+    with zipfile.ZipFile(filepath) as archive:
+        for info in archive.infolist():
+            if normalise_path(info.filename) == "bcf.version":
+                with archive.open(info) as f:
+                    for event, element in ElementTree.iterparse(f):
+                        if element.tag.rsplit("}", 1)[-1] == "Version":
+                            return element.get("VersionId")
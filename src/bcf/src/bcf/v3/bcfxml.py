@@ -19,10 +19,13 @@
 
 import os
 import uuid
+import functools
 import shutil
 import zipfile
 import logging
 import tempfile
+import bcf.reader
+import bcf.writer
 import bcf.v3.data
 from datetime import datetime
 from xml.dom import minidom
@@ -33,6 +36,11 @@ from shutil import copyfile
 cwd = os.path.dirname(os.path.realpath(__file__))
 
 
+@functools.lru_cache(maxsize=None)
+def get_schema(xsd):
+    return XMLSchema(os.path.join(cwd, "xsd", xsd))
+
+
 @contextmanager
 def cd(newdir):
     prevdir = os.getcwd()
@@ -63,20 +71,19 @@ class BcfXml:
         self.edit_version()
 
     def get_project(self, filepath=None):
-        if os.path.isfile(os.path.join(self.filepath, "project.bcfp")):
+        if self._has_file("project.bcfp"):
             data = self._read_xml("project.bcfp", "project.xsd")
             self.project.project_id = data["Project"]["@ProjectId"]
             self.project.name = data["Project"].get("Name")
         return self.project
 
     def edit_project(self):
-        self.document = minidom.Document()
+        self.document = self._new_document()
         root = self._create_element(self.document, "ProjectInfo")
         project = self._create_element(root, "Project", {"ProjectId": self.project.project_id})
         if self.project.name:
             self._create_element(project, "Name", text=self.project.name)
-        with open(os.path.join(self.filepath, "project.bcfp"), "wb") as f:
-            f.write(self.document.toprettyxml(encoding="utf-8"))
+        self._write_document(self.document, "project.bcfp")
 
     def save_project(self, filepath):
         with cd(self.filepath):
@@ -92,10 +99,9 @@ class BcfXml:
         return self.version
 
     def edit_version(self):
-        self.document = minidom.Document()
+        self.document = self._new_document()
         root = self._create_element(self.document, "Version", {"VersionId": self.version})
-        with open(os.path.join(self.filepath, "bcf.version"), "wb") as f:
-            f.write(self.document.toprettyxml(encoding="utf-8"))
+        self._write_document(self.document, "bcf.version")
 
     def get_topics(self):
         self.topics = {}
@@ -134,7 +140,7 @@ class BcfXml:
                     if value in item:
                         setattr(header_file, key, item[value])
                 header.files.append(header_file)
-            self.topics[guid].header = header
+            self.get_topic(guid).header = header
             return header
 
     def get_topic(self, guid):
@@ -229,7 +235,7 @@ class BcfXml:
             topic.modified_date = datetime.utcnow().isoformat()
             topic.modified_author = self.author
 
-        self.document = minidom.Document()
+        self.document = self._new_document()
         root = self._create_element(self.document, "Markup")
         if topic.header:
             self.write_header(topic.header, root)
@@ -304,8 +310,7 @@ class BcfXml:
         if topic.viewpoints:
             viewpoint_el = self._create_element(topic_el, "Viewpoints")
             self.write_viewpoints(topic.viewpoints, viewpoint_el, topic)
-        with open(os.path.join(self.filepath, topic.guid, "markup.bcf"), "wb") as f:
-            f.write(self.document.toprettyxml(encoding="utf-8"))
+        self._write_document(self.document, topic.guid, "markup.bcf")
 
     def write_document_references(self, references, root):
         for reference in references:
@@ -398,7 +403,7 @@ class BcfXml:
             self.write_viewpoint(viewpoint, topic)
 
     def write_viewpoint(self, viewpoint, topic):
-        document = minidom.Document()
+        document = self._new_document()
         root = self._create_element(document, "VisualizationInfo", {"Guid": viewpoint.guid})
         self.write_viewpoint_components(viewpoint, root)
         self.write_viewpoint_orthogonal_camera(viewpoint, root)
@@ -406,8 +411,7 @@ class BcfXml:
         self.write_viewpoint_lines(viewpoint, root)
         self.write_viewpoint_clipping_planes(viewpoint, root)
         self.write_viewpoint_bitmaps(viewpoint, root)
-        with open(os.path.join(self.filepath, topic.guid, viewpoint.viewpoint), "wb") as f:
-            f.write(document.toprettyxml(encoding="utf-8"))
+        self._write_document(document, topic.guid, viewpoint.viewpoint)
 
     def write_viewpoint_components(self, viewpoint, parent):
         if not viewpoint.components:
@@ -645,9 +649,9 @@ class BcfXml:
 
     def get_comments(self, guid):
         comments = {}
-        if "Comments" not in data["Topics"]:
-            return comments
         data = self._read_xml(os.path.join(guid, "markup.bcf"), "markup.xsd")
+        if not data["Topic"].get("Comments"):
+            return comments
         for item in data["Topic"]["Comments"].get("Comment", []):
             comment = bcf.v3.data.Comment()
             mandatory_keys = {
@@ -670,18 +674,18 @@ class BcfXml:
                 viewpoint.guid = item["Viewpoint"]["@Guid"]
                 comment.viewpoint = viewpoint
             comments[comment.guid] = comment
-        self.topics[guid].comments = comments
+        self.get_topic(guid).comments = comments
         return comments
 
     def get_viewpoints(self, guid):
         viewpoints = {}
-        if "Viewpoints" not in data["Topic"]:
-            return viewpoints
         data = self._read_xml(os.path.join(guid, "markup.bcf"), "markup.xsd")
-        for item in data["Topic"]["Viewpoints"]:
+        if not data["Topic"].get("Viewpoints"):
+            return viewpoints
+        for item in data["Topic"]["Viewpoints"].get("ViewPoint", []):
             viewpoint = self.get_viewpoint(item, guid)
             viewpoints[viewpoint.guid] = viewpoint
-        self.topics[guid].viewpoints = viewpoints
+        self.get_topic(guid).viewpoints = viewpoints
         return viewpoints
 
     def get_viewpoint(self, data, topic_guid):
@@ -821,14 +825,25 @@ class BcfXml:
     def close_project(self):
         shutil.rmtree(self.filepath)
 
+    def _has_file(self, filename):
+        return os.path.isfile(os.path.join(self.filepath, filename))
+
     def _read_xml(self, filename, xsd):
-        schema = XMLSchema(os.path.join(cwd, "xsd", xsd))
-        filepath = os.path.join(self.filepath, filename)
-        (data, errors) = schema.to_dict(filepath, validation="lax")
+        return self._parse_xml(os.path.join(self.filepath, filename), xsd)
+
+    def _parse_xml(self, source, xsd):
+        (data, errors) = get_schema(xsd).to_dict(source, validation="lax")
         for error in errors:
             self.logger.error(error)
         return data
 
+    def _new_document(self):
+        return minidom.Document()
+
+    def _write_document(self, document, *path):
+        with open(os.path.join(self.filepath, *path), "wb") as f:
+            f.write(document.toprettyxml(encoding="utf-8"))
+
     def _create_element(self, parent, name, attributes={}, text=None):
         element = self.document.createElement(name)
         for key, value in attributes.items():
@@ -844,3 +859,49 @@ class BcfXml:
 
     def __del__(self):
         self.close_project()
+
+
+class BcfReader(bcf.reader.ArchiveReader, BcfXml):
+    """A read-only BcfXml which reads a BCF archive lazily without extracting it
+
+    Example::
+
+        bcfxml = BcfReader("clashes.bcf")
+        for guid, summary in bcfxml.get_topic_summaries().items():
+            print(summary.title, summary.topic_status)
+        viewpoints = bcfxml.get_viewpoints(guid)
+    """
+
+    def __init__(self, filepath):
+        super().__init__()
+        self.open_archive(filepath)
+        self.get_version()
+        self.get_project(filepath)
+
+
+class BcfWriter(bcf.writer.ArchiveWriter, BcfXml):
+    """A write-only BcfXml which streams topics into a new BCF archive
+
+    Example::
+
+        with BcfWriter("clashes.bcf", project_name="Clashes") as bcfxml:
+            for clash in clashes:
+                topic = bcf.v3.data.Topic()
+                viewpoint = bcf.v3.data.Viewpoint()
+                topic.viewpoints[viewpoint.guid] = viewpoint
+                bcfxml.add_topic(topic)
+
+    Use mode "a" to add topics to an existing archive written by a BcfWriter.
+    """
+
+    def __init__(self, filepath, project_name="New Project", mode="w"):
+        super().__init__()
+        self.project.project_id = str(uuid.uuid4())
+        self.project.name = project_name
+        self.open_archive(filepath, mode)
+        if self.archive and "bcf.version" not in self.written_files:
+            self.edit_project()
+            self.edit_version()
+
+    def create_topic(self):
+        return bcf.v3.data.Topic()
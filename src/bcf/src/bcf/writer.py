@@ -0,0 +1,240 @@
+# BCF - BCF Python library
+# Copyright (C) 2020, 2021 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of BCF.
+#
+# BCF is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# BCF is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with BCF.  If not, see <http://www.gnu.org/licenses/>.
+import os
+import uuid
+import zipfile
+import multiprocessing
+from xml.etree import ElementTree
+
+
+class Document:
+    def __init__(self):
+        self.root = None
+
+
+class WriteOnlyError(ValueError):
+    def __init__(self, method):
+        super().__init__(
+            f"{method}() is not supported as topics are written once, when they are added to a BcfWriter, "
+            "and cannot be read back or edited"
+        )
+
+
+class ArchiveWriter:
+    """Stream topics straight into a BCF archive
+
+    This is mixed into the BcfXml class of each BCF version. Each topic is
+    written once, complete with its comments and viewpoints, when it is
+    added, so no temporary files are created and only the topic being
+    written is held in memory. Documents are built with ElementTree rather
+    than minidom and are not pretty printed.
+
+    As members of a zip file cannot be rewritten, topics cannot be edited
+    after they are added. An existing archive may be reopened in "a" mode to
+    add more topics to it. Attach comments and viewpoints to a topic before
+    adding it, as add_comment(), add_viewpoint() and the other methods which
+    edit or read back topics raise a WriteOnlyError.
+    """
+
+    def open_archive(self, filepath, mode="w", compression=zipfile.ZIP_DEFLATED):
+        self.archive = zipfile.ZipFile(filepath, mode, compression) if filepath else None
+        self.written_files = set(self.archive.namelist()) if self.archive else set()
+        self.pending_files = None
+
+    def add_topic(self, topic=None):
+        topic = self.prepare_topic(topic)
+        for viewpoint in topic.viewpoints.values():
+            if viewpoint.snapshot and os.path.isfile(viewpoint.snapshot):
+                filename = viewpoint.guid + os.path.splitext(viewpoint.snapshot)[-1]
+                self._add_file((topic.guid, filename), source=viewpoint.snapshot)
+                viewpoint.snapshot = filename
+        for path, data in self.serialise_topic(topic):
+            self._add_file(path, data)
+        return topic
+
+    def add_topics(self, topics, num_processes=1, chunksize=64):
+        """Add many topics, optionally serialising them in worker processes
+
+        In parallel mode, viewpoints must not have snapshots.
+
+        :param topics: The topics to add
+        :type topics: list
+        :param num_processes: The number of worker processes, or None for one per CPU
+        :type num_processes: int
+        :param chunksize: The number of topics sent to a worker at a time
+        :type chunksize: int
+        :return: The added topics
+        :rtype: list
+        """
+        if num_processes == 1:
+            return [self.add_topic(topic) for topic in topics]
+        topics = [self.prepare_topic(topic) for topic in topics]
+        for topic in topics:
+            if any(viewpoint.snapshot for viewpoint in topic.viewpoints.values()):
+                raise ValueError("Snapshots are not supported when adding topics in parallel")
+        args = ((type(self), self.author, topic) for topic in topics)
+        with multiprocessing.Pool(num_processes) as pool:
+            for files in pool.imap(serialise_topic, args, chunksize):
+                for path, data in files:
+                    self._add_file(path, data)
+        return topics
+
+    def prepare_topic(self, topic):
+        if topic is None:
+            topic = self.create_topic()
+        if not topic.guid:
+            topic.guid = str(uuid.uuid4())
+        if not topic.title:
+            topic.title = "New Topic"
+        for comment in topic.comments.values():
+            if not comment.guid:
+                comment.guid = str(uuid.uuid4())
+        for viewpoint in topic.viewpoints.values():
+            if not viewpoint.guid:
+                viewpoint.guid = str(uuid.uuid4())
+            if not viewpoint.viewpoint:
+                viewpoint.viewpoint = f"{viewpoint.guid}.bcfv"
+        topic.comments = {comment.guid: comment for comment in topic.comments.values()}
+        topic.viewpoints = {viewpoint.guid: viewpoint for viewpoint in topic.viewpoints.values()}
+        return topic
+
+    def serialise_topic(self, topic):
+        """Return the markup and viewpoint files of a topic as (path, data) pairs"""
+        self.pending_files = []
+        try:
+            super().edit_topic(topic)
+            return self.pending_files
+        finally:
+            self.pending_files = None
+
+    def close(self):
+        if self.archive:
+            self.archive.close()
+            self.archive = None
+
+    def close_project(self):
+        if getattr(self, "archive", None):
+            self.close()
+
+    def save_project(self, filepath=None):
+        self.close()
+
+    def new_project(self):
+        raise WriteOnlyError("new_project")
+
+    def get_topics(self):
+        raise WriteOnlyError("get_topics")
+
+    def get_header(self, guid):
+        raise WriteOnlyError("get_header")
+
+    def get_topic(self, guid):
+        raise WriteOnlyError("get_topic")
+
+    def edit_topic(self, topic):
+        raise WriteOnlyError("edit_topic")
+
+    def delete_topic(self, guid):
+        raise WriteOnlyError("delete_topic")
+
+    def add_comment(self, topic, comment=None):
+        raise WriteOnlyError("add_comment")
+
+    def edit_comment(self, comment, topic):
+        raise WriteOnlyError("edit_comment")
+
+    def delete_comment(self, guid, topic):
+        raise WriteOnlyError("delete_comment")
+
+    def get_comments(self, guid):
+        raise WriteOnlyError("get_comments")
+
+    def add_viewpoint(self, topic, viewpoint=None):
+        raise WriteOnlyError("add_viewpoint")
+
+    def delete_viewpoint(self, guid, topic):
+        raise WriteOnlyError("delete_viewpoint")
+
+    def get_viewpoints(self, guid):
+        raise WriteOnlyError("get_viewpoints")
+
+    def add_file(self, topic, header_file):
+        raise WriteOnlyError("add_file")
+
+    def delete_file(self, topic, index):
+        raise WriteOnlyError("delete_file")
+
+    def add_bim_snippet(self, topic, bim_snippet):
+        raise WriteOnlyError("add_bim_snippet")
+
+    def delete_bim_snippet(self, topic):
+        raise WriteOnlyError("delete_bim_snippet")
+
+    def add_document_reference(self, topic, document_reference):
+        raise WriteOnlyError("add_document_reference")
+
+    def delete_document_reference(self, topic, index):
+        raise WriteOnlyError("delete_document_reference")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _new_document(self):
+        return Document()
+
+    def _write_document(self, document, *path):
+        data = ElementTree.tostring(document.root, encoding="utf-8", xml_declaration=True)
+        if self.pending_files is None:
+            self._add_file(path, data)
+        else:
+            self.pending_files.append((path, data))
+
+    def _add_file(self, path, data=None, source=None):
+        filename = "/".join(path)
+        if filename in self.written_files:
+            raise ValueError(f"{filename} was already written, topics cannot be edited after they are added")
+        self.written_files.add(filename)
+        if source is None:
+            self.archive.writestr(filename, data)
+        else:
+            self.archive.write(source, filename)
+
+    def _create_element(self, parent, name, attributes={}, text=None):
+        attrib = {}
+        for key, value in attributes.items():
+            if isinstance(value, bool):
+                attrib[key] = str(value).lower()
+            elif value:
+                attrib[key] = value
+        if isinstance(parent, Document):
+            element = parent.root = ElementTree.Element(name, attrib)
+        else:
+            element = ElementTree.SubElement(parent, name, attrib)
+        if text is not None:
+            element.text = str(text)
+        return element
+
+
+def serialise_topic(args):
+    writer_class, author, topic = args
+    writer = writer_class(None)
+    writer.author = author
+    return writer.serialise_topic(topic)
@@ -0,0 +1,141 @@
+import pytest
+import bcf.bcfxml
+import bcf.reader
+import bcf.v2.bcfxml
+import bcf.v2.data
+import bcf.v3.bcfxml
+import bcf.v3.data
+
+
+def create_archive(filepath, bcfxml_module, data):
+    bcfxml = bcfxml_module.BcfXml()
+    bcfxml.new_project()
+    bcfxml.project.name = "Project"
+    bcfxml.edit_project()
+    topics = []
+    for i in range(3):
+        topic = data.Topic()
+        topic.title = f"Topic {i}"
+        topic.topic_status = "Open"
+        topic.topic_type = "Clash"
+        topic.priority = "High"
+        topic = bcfxml.add_topic(topic)
+        comment = data.Comment()
+        comment.comment = f"Comment {i}"
+        bcfxml.add_comment(topic, comment)
+        viewpoint = data.Viewpoint()
+        viewpoint.perspective_camera = data.PerspectiveCamera()
+        viewpoint.perspective_camera.field_of_view = 60.0
+        bcfxml.add_viewpoint(topic, viewpoint)
+        topics.append(topic)
+    bcfxml.save_project(str(filepath))
+    return topics
+
+
+@pytest.fixture(params=[(bcf.v2.bcfxml, bcf.v2.data, "2.1"), (bcf.v3.bcfxml, bcf.v3.data, "3.0")], ids=["v2", "v3"])
+def archive(request, tmp_path):
+    bcfxml_module, data, version = request.param
+    filepath = tmp_path / "test.bcf"
+    topics = create_archive(filepath, bcfxml_module, data)
+    return filepath, bcfxml_module, version, topics
+
+
+class TestRead:
+    def test_reading_an_archive_of_each_version(self, archive):
+        filepath, bcfxml_module, version, topics = archive
+        bcfxml = bcf.bcfxml.read(filepath)
+        assert isinstance(bcfxml, bcfxml_module.BcfReader)
+        assert bcfxml.version == version
+        assert bcfxml.project.name == "Project"
+        bcfxml.close_project()
+
+    def test_getting_topic_summaries(self, archive):
+        filepath, bcfxml_module, version, topics = archive
+        bcfxml = bcf.bcfxml.read(filepath)
+        summaries = bcfxml.get_topic_summaries()
+        assert set(summaries) == {t.guid for t in topics}
+        for topic in topics:
+            summary = summaries[topic.guid]
+            assert summary.guid == topic.guid
+            assert summary.title == topic.title
+            assert summary.topic_status == "Open"
+            assert summary.topic_type == "Clash"
+            assert summary.priority == "High"
+            assert summary.creation_date == topic.creation_date
+        bcfxml.close_project()
+
+    def test_getting_the_same_topics_as_an_extracted_archive(self, archive):
+        filepath, bcfxml_module, version, topics = archive
+        bcfxml = bcf.bcfxml.read(filepath)
+        extracted = bcf.bcfxml.load(filepath)
+        extracted.get_project(filepath)
+        read_topics = bcfxml.get_topics()
+        extracted_topics = extracted.get_topics()
+        assert set(read_topics) == set(extracted_topics)
+        for guid, topic in read_topics.items():
+            assert vars(topic) == vars(extracted_topics[guid])
+            comments = bcfxml.get_comments(guid)
+            assert [c.comment for c in comments.values()] == [c.comment for c in extracted.get_comments(guid).values()]
+        bcfxml.close_project()
+
+    def test_viewpoints_are_only_parsed_on_demand(self, archive, monkeypatch):
+        filepath, bcfxml_module, version, topics = archive
+        bcfxml = bcf.bcfxml.read(filepath)
+        parsed = []
+        parse_xml = bcfxml._parse_xml
+
+        def record_parse_xml(source, xsd):
+            parsed.append(xsd)
+            return parse_xml(source, xsd)
+
+        monkeypatch.setattr(bcfxml, "_parse_xml", record_parse_xml)
+        bcfxml.get_topic_summaries()
+        assert parsed == []
+        guid = topics[0].guid
+        bcfxml.get_topic(guid)
+        assert "visinfo.xsd" not in parsed
+        viewpoints = bcfxml.get_viewpoints(guid)
+        assert parsed.count("visinfo.xsd") == 1
+        viewpoint = list(viewpoints.values())[0]
+        assert viewpoint.guid == list(topics[0].viewpoints)[0]
+        assert viewpoint.perspective_camera.field_of_view == 60.0
+        bcfxml.close_project()
+
+    def test_getting_comments_and_viewpoints_from_topic_summaries(self, archive):
+        filepath, bcfxml_module, version, topics = archive
+        for topic in topics:
+            bcfxml = bcf.bcfxml.read(filepath)
+            summaries = bcfxml.get_topic_summaries()
+            viewpoints = bcfxml.get_viewpoints(summaries[topic.guid].guid)
+            assert set(viewpoints) == set(topic.viewpoints)
+            assert list(viewpoints.values())[0].perspective_camera.field_of_view == 60.0
+            comments = bcfxml.get_comments(topic.guid)
+            assert [c.comment for c in comments.values()] == [c.comment for c in topic.comments.values()]
+            assert bcfxml.get_topic(topic.guid).viewpoints is viewpoints
+            assert bcfxml.get_topic(topic.guid).comments is comments
+            bcfxml.close_project()
+
+    def test_reading_a_file_from_the_archive(self, archive):
+        filepath, bcfxml_module, version, topics = archive
+        bcfxml = bcf.bcfxml.read(filepath)
+        viewpoint = list(topics[0].viewpoints.values())[0]
+        assert bcfxml.read_file(f"{topics[0].guid}/{viewpoint.viewpoint}").startswith(b"<?xml")
+        bcfxml.close_project()
+
+    @pytest.mark.parametrize(
+        "method, args",
+        [
+            ("save_project", ("copy.bcf",)),
+            ("add_topic", ()),
+            ("edit_topic", (None,)),
+            ("delete_topic", ("guid",)),
+            ("add_comment", (None,)),
+            ("add_viewpoint", (None,)),
+        ],
+    )
+    def test_archives_are_read_only(self, archive, method, args):
+        filepath, bcfxml_module, version, topics = archive
+        bcfxml = bcf.bcfxml.read(filepath)
+        with pytest.raises(bcf.reader.ReadOnlyError, match=f"{method}\\(\\) is not supported"):
+            getattr(bcfxml, method)(*args)
+        bcfxml.close_project()
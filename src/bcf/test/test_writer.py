@@ -0,0 +1,115 @@
+import pytest
+import bcf.bcfxml
+import bcf.writer
+import bcf.v2.bcfxml
+import bcf.v2.data
+import bcf.v3.bcfxml
+import bcf.v3.data
+
+
+def create_topics(data, total):
+    topics = []
+    for i in range(total):
+        topic = data.Topic()
+        topic.title = f"Topic {i}"
+        topic.topic_status = "Open"
+        topic.topic_type = "Clash"
+        comment = data.Comment()
+        comment.comment = f"Comment {i}"
+        comment.date = "2021-01-01T00:00:00"
+        comment.author = "john@doe.com"
+        topic.comments["comment"] = comment
+        viewpoint = data.Viewpoint()
+        viewpoint.perspective_camera = data.PerspectiveCamera()
+        viewpoint.perspective_camera.field_of_view = 60.0
+        topic.viewpoints["viewpoint"] = viewpoint
+        topics.append(topic)
+    return topics
+
+
+@pytest.fixture(params=[(bcf.v2.bcfxml, bcf.v2.data, "2.1"), (bcf.v3.bcfxml, bcf.v3.data, "3.0")], ids=["v2", "v3"])
+def version(request):
+    return request.param
+
+
+class TestBcfWriter:
+    def assert_archive(self, filepath, version, topics):
+        bcfxml_module, data, version_id = version
+        bcfxml = bcf.bcfxml.load(filepath)
+        assert isinstance(bcfxml, bcfxml_module.BcfXml)
+        assert bcfxml.get_version() == version_id
+        assert bcfxml.get_project(filepath).name == "Project"
+        loaded_topics = bcfxml.get_topics()
+        assert set(loaded_topics) == {t.guid for t in topics}
+        for topic in topics:
+            assert loaded_topics[topic.guid].title == topic.title
+            assert loaded_topics[topic.guid].topic_status == "Open"
+            comments = bcfxml.get_comments(topic.guid)
+            assert [c.comment for c in comments.values()] == [c.comment for c in topic.comments.values()]
+            viewpoints = bcfxml.get_viewpoints(topic.guid)
+            assert set(viewpoints) == set(topic.viewpoints)
+            assert list(viewpoints.values())[0].perspective_camera.field_of_view == 60.0
+
+    def test_adding_topics(self, version, tmp_path):
+        bcfxml_module, data, version_id = version
+        filepath = str(tmp_path / "test.bcf")
+        with bcfxml_module.BcfWriter(filepath, project_name="Project") as bcfxml:
+            topics = [bcfxml.add_topic(topic) for topic in create_topics(data, 3)]
+        self.assert_archive(filepath, version, topics)
+
+    def test_adding_topics_in_parallel(self, version, tmp_path):
+        bcfxml_module, data, version_id = version
+        filepath = str(tmp_path / "test.bcf")
+        with bcfxml_module.BcfWriter(filepath, project_name="Project") as bcfxml:
+            topics = bcfxml.add_topics(create_topics(data, 5), num_processes=2, chunksize=2)
+        self.assert_archive(filepath, version, topics)
+
+    def test_appending_topics_to_an_existing_archive(self, version, tmp_path):
+        bcfxml_module, data, version_id = version
+        filepath = str(tmp_path / "test.bcf")
+        with bcfxml_module.BcfWriter(filepath, project_name="Project") as bcfxml:
+            topics = [bcfxml.add_topic(topic) for topic in create_topics(data, 2)]
+        with bcfxml_module.BcfWriter(filepath, project_name="Other", mode="a") as bcfxml:
+            topics.extend(bcfxml.add_topic(topic) for topic in create_topics(data, 2))
+            with pytest.raises(ValueError, match="already written"):
+                bcfxml.add_topic(topics[0])
+        self.assert_archive(filepath, version, topics)
+
+    def test_appending_topics_to_a_new_archive(self, version, tmp_path):
+        bcfxml_module, data, version_id = version
+        filepath = str(tmp_path / "test.bcf")
+        with bcfxml_module.BcfWriter(filepath, project_name="Project", mode="a") as bcfxml:
+            topics = [bcfxml.add_topic(topic) for topic in create_topics(data, 2)]
+        self.assert_archive(filepath, version, topics)
+
+    def test_adding_topics_with_snapshots_in_parallel_is_not_supported(self, version, tmp_path):
+        bcfxml_module, data, version_id = version
+        topics = create_topics(data, 1)
+        list(topics[0].viewpoints.values())[0].snapshot = "snapshot.png"
+        with bcfxml_module.BcfWriter(str(tmp_path / "test.bcf")) as bcfxml:
+            with pytest.raises(ValueError):
+                bcfxml.add_topics(topics, num_processes=2)
+
+    def test_topics_cannot_be_added_twice(self, version, tmp_path):
+        bcfxml_module, data, version_id = version
+        with bcfxml_module.BcfWriter(str(tmp_path / "test.bcf")) as bcfxml:
+            topic = bcfxml.add_topic()
+            with pytest.raises(ValueError, match="already written"):
+                bcfxml.add_topic(topic)
+
+    @pytest.mark.parametrize(
+        "method, args",
+        [
+            ("edit_topic", (None,)),
+            ("delete_topic", ("guid",)),
+            ("add_comment", (None,)),
+            ("add_viewpoint", (None,)),
+            ("get_topics", ()),
+            ("get_viewpoints", ("guid",)),
+        ],
+    )
+    def test_topics_cannot_be_edited_or_read_back(self, version, tmp_path, method, args):
+        bcfxml_module, data, version_id = version
+        with bcfxml_module.BcfWriter(str(tmp_path / "test.bcf")) as bcfxml:
+            with pytest.raises(bcf.writer.WriteOnlyError, match=f"{method}\\(\\) is not supported"):
+                getattr(bcfxml, method)(*args)
@@ -19,6 +19,7 @@
 import hppfcl
 import numpy as np
 import ifcopenshell
+import ifcopenshell.util.shape
 
 
 class Collider:
@@ -105,10 +106,9 @@ class Collider:
         return hppfcl.Transform3f(mat[:3, :3], mat[:3, 3])
 
     def create_bvh(self, mesh):
-        v = mesh.verts
-        f = mesh.faces
-        mesh_verts = np.array([[v[i], v[i + 1], v[i + 2]] for i in range(0, len(v), 3)])
-        mesh_faces = [(int(f[i]), int(f[i + 1]), int(f[i + 2])) for i in range(0, len(f), 3)]
+        # The views are consumed before the iterator advances, so need not be copied
+        mesh_verts = ifcopenshell.util.shape.get_vertices(mesh, copy=False)
+        mesh_faces = ifcopenshell.util.shape.get_faces(mesh, copy=False).tolist()
 
         bvh = hppfcl.BVHModelOBB()
         bvh.beginModel(len(mesh_faces), len(mesh_verts))
@@ -121,45 +121,39 @@ class Clasher:
         import bcf.v2.bcfxml
 
         for i, clash_set in enumerate(self.clash_sets):
-            bcfxml = bcf.v2.bcfxml.BcfXml()
-            bcfxml.new_project()
-            bcfxml.project.name = clash_set["name"]
-            bcfxml.edit_project()
-            for key, clash in clash_set["clashes"].items():
-                topic = bcf.v2.data.Topic()
-                topic.title = "{}/{} and {}/{}".format(
-                    clash["a_ifc_class"], clash["a_name"], clash["b_ifc_class"], clash["b_name"]
-                )
-                topic = bcfxml.add_topic(topic)
-                viewpoint = bcf.v2.data.Viewpoint()
-                viewpoint.perspective_camera = bcf.v2.data.PerspectiveCamera()
-                position = np.array(clash["position"])
-                point = position + np.array((5, 5, 5))  # Dumb, but works (for now)!
-                viewpoint.perspective_camera.camera_view_point.x = point[0]
-                viewpoint.perspective_camera.camera_view_point.y = point[1]
-                viewpoint.perspective_camera.camera_view_point.z = point[2]
-                mat = self.get_track_to_matrix(point, position)
-                viewpoint.perspective_camera.camera_direction.x = mat[0][2] * -1
-                viewpoint.perspective_camera.camera_direction.y = mat[1][2] * -1
-                viewpoint.perspective_camera.camera_direction.z = mat[2][2] * -1
-                viewpoint.perspective_camera.camera_up_vector.x = mat[0][1]
-                viewpoint.perspective_camera.camera_up_vector.y = mat[1][1]
-                viewpoint.perspective_camera.camera_up_vector.z = mat[2][1]
-                viewpoint.components = bcf.v2.data.Components()
-                c1 = bcf.v2.data.Component()
-                c1.ifc_guid = clash["a_global_id"]
-                c2 = bcf.v2.data.Component()
-                c2.ifc_guid = clash["b_global_id"]
-                viewpoint.components.selection.append(c1)
-                viewpoint.components.selection.append(c2)
-                viewpoint.components.visibility = bcf.v2.data.ComponentVisibility()
-                viewpoint.components.visibility.default_visibility = True
-                viewpoint.snapshot = self.get_viewpoint_snapshot(viewpoint, mat)
-                bcfxml.add_viewpoint(topic, viewpoint)
-            if i == 0:
-                bcfxml.save_project(self.settings.output)
-            else:
-                bcfxml.save_project(self.settings.output + f".{i}")
+            output = self.settings.output if i == 0 else self.settings.output + f".{i}"
+            with bcf.v2.bcfxml.BcfWriter(output, project_name=clash_set["name"]) as bcfxml:
+                for key, clash in clash_set["clashes"].items():
+                    topic = bcf.v2.data.Topic()
+                    topic.title = "{}/{} and {}/{}".format(
+                        clash["a_ifc_class"], clash["a_name"], clash["b_ifc_class"], clash["b_name"]
+                    )
+                    viewpoint = bcf.v2.data.Viewpoint()
+                    viewpoint.perspective_camera = bcf.v2.data.PerspectiveCamera()
+                    position = np.array(clash["position"])
+                    point = position + np.array((5, 5, 5))  # Dumb, but works (for now)!
+                    viewpoint.perspective_camera.camera_view_point.x = point[0]
+                    viewpoint.perspective_camera.camera_view_point.y = point[1]
+                    viewpoint.perspective_camera.camera_view_point.z = point[2]
+                    mat = self.get_track_to_matrix(point, position)
+                    viewpoint.perspective_camera.camera_direction.x = mat[0][2] * -1
+                    viewpoint.perspective_camera.camera_direction.y = mat[1][2] * -1
+                    viewpoint.perspective_camera.camera_direction.z = mat[2][2] * -1
+                    viewpoint.perspective_camera.camera_up_vector.x = mat[0][1]
+                    viewpoint.perspective_camera.camera_up_vector.y = mat[1][1]
+                    viewpoint.perspective_camera.camera_up_vector.z = mat[2][1]
+                    viewpoint.components = bcf.v2.data.Components()
+                    c1 = bcf.v2.data.Component()
+                    c1.ifc_guid = clash["a_global_id"]
+                    c2 = bcf.v2.data.Component()
+                    c2.ifc_guid = clash["b_global_id"]
+                    viewpoint.components.selection.append(c1)
+                    viewpoint.components.selection.append(c2)
+                    viewpoint.components.visibility = bcf.v2.data.ComponentVisibility()
+                    viewpoint.components.visibility.default_visibility = True
+                    viewpoint.snapshot = self.get_viewpoint_snapshot(viewpoint, mat)
+                    topic.viewpoints[viewpoint.guid] = viewpoint
+                    bcfxml.add_topic(topic)
 
     def get_viewpoint_snapshot(self, viewpoint, mat):
         return None  # Possible to overload this function in a GUI application if used as a library
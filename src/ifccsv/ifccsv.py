@@ -24,8 +24,11 @@ import ifcopenshell
 import ifcopenshell.util.selector
 import ifcopenshell.util.element
 import ifcopenshell.util.schema
+import ifcopenshell.util.pset
 import csv
+import time
 import argparse
+import itertools
 
 
 class IfcAttributeSetter:
@@ -88,20 +91,146 @@ class IfcAttributeSetter:
     def set_pset_property(pset, name, value):
         for property in pset.HasProperties:
             if property.Name == name:
-                # In lieu of loading a map for data casting, we only have four
-                # options, which this ugly method will determine.
+                IfcAttributeSetter.set_property_value(property, value)
+
+    @staticmethod
+    def set_property_value(property, value):
+        # In lieu of loading a map for data casting, we only have four
+        # options, which this ugly method will determine.
+        try:
+            property.NominalValue.wrappedValue = str(value)
+        except:
+            try:
+                property.NominalValue.wrappedValue = float(value)
+            except:
                 try:
-                    property.NominalValue.wrappedValue = str(value)
+                    property.NominalValue.wrappedValue = int(value)
                 except:
-                    try:
-                        property.NominalValue.wrappedValue = float(value)
-                    except:
-                        try:
-                            property.NominalValue.wrappedValue = int(value)
-                        except:
-                            property.NominalValue.wrappedValue = (
-                                True if value.lower() in ["1", "t", "true", "yes", "y", "uh-huh"] else False
-                            )
+                    property.NominalValue.wrappedValue = to_boolean(value)
+
+
+def to_boolean(value):
+    return True if value.lower() in ["1", "t", "true", "yes", "y", "uh-huh"] else False
+
+
+class IfcPropertyIndex:
+    # Indexes elements by GlobalId and their properties and quantities by
+    # name, so that an import does not scan relationships for every cell.
+    converters = {"string": str, "real": float, "number": float, "integer": int, "boolean": to_boolean}
+
+    def __init__(self, ifc_file):
+        self.ifc_file = ifc_file
+        self.schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(ifc_file.schema)
+        try:
+            self.template = ifcopenshell.util.pset.get_template(ifc_file.schema)
+        except KeyError:
+            self.template = None
+        self.elements = {}
+        self.psets = {}
+        self.qtos = {}
+        self.measures = {}
+        self.measure_converters = {}
+        self.attributes = {}
+        self.build()
+
+    def build(self):
+        for element in self.ifc_file.by_type("IfcRoot"):
+            self.elements[element.GlobalId] = element
+        definitions = {}
+        for rel in self.ifc_file.by_type("IfcRelDefinesByProperties"):
+            definition = rel.RelatingPropertyDefinition
+            if definition.is_a("IfcElementQuantity"):
+                index, props = self.qtos, definition.Quantities
+            elif definition.is_a("IfcPropertySet"):
+                index, props = self.psets, definition.HasProperties
+            else:
+                continue
+            if definition.id() not in definitions:
+                definitions[definition.id()] = self.get_props_by_name(props)
+            for element in rel.RelatedObjects:
+                index.setdefault(element.id(), {}).setdefault(definition.Name, definitions[definition.id()])
+        for element in self.ifc_file.by_type("IfcTypeObject"):
+            for definition in element.HasPropertySets or []:
+                if definition.is_a("IfcPropertySet"):
+                    props = self.get_props_by_name(definition.HasProperties)
+                    self.psets.setdefault(element.id(), {}).setdefault(definition.Name, props)
+
+    def get_props_by_name(self, props):
+        results = {}
+        for prop in props or []:
+            results.setdefault(prop.Name, []).append(prop)
+        return results
+
+    def set_element_key(self, element, key, value):
+        if key == "type" and element.is_a() != value:
+            new_element = ifcopenshell.util.schema.reassign_class(self.ifc_file, element, value)
+            self.replace_element(element, new_element)
+            return new_element
+        attribute_key = (element.is_a(), key)
+        if attribute_key not in self.attributes:
+            self.attributes[attribute_key] = hasattr(element, key)
+        if self.attributes[attribute_key]:
+            setattr(element, key, value)
+            return element
+        if "." not in key:
+            return element
+        name, prop_name = key.split(".", 1)
+        if key[0:3] == "Qto":
+            qto = self.qtos.get(element.id(), {}).get(name)
+            if qto is not None:
+                for prop in qto.get(prop_name, []):
+                    self.set_quantity_value(prop, value)
+                return element
+        pset = self.psets.get(element.id(), {}).get(name)
+        if pset is not None:
+            for prop in pset.get(prop_name, []):
+                if prop.is_a("IfcPropertySingleValue"):
+                    self.set_property_value(name, prop_name, prop, value)
+        return element
+
+    def replace_element(self, element, new_element):
+        if element == new_element:
+            return
+        self.elements[new_element.GlobalId] = new_element
+        for index in (self.psets, self.qtos):
+            if element.id() in index:
+                index[new_element.id()] = index.pop(element.id())
+
+    def set_quantity_value(self, prop, value):
+        try:
+            setattr(prop, prop.is_a()[len("IfcQuantity") :] + "Value", float(value))
+        except ValueError:
+            print("The quantity {} could not be set to {}".format(prop.Name, value))
+
+    def set_property_value(self, pset_name, prop_name, prop, value):
+        if prop.NominalValue is None:
+            measure = self.get_measure(pset_name, prop_name) or "IfcLabel"
+            prop.NominalValue = self.ifc_file.create_entity(measure, self.get_converter(measure)(value))
+            return
+        try:
+            new_value = self.get_converter(prop.NominalValue.is_a())(value)
+            if prop.NominalValue.wrappedValue != new_value:
+                prop.NominalValue.wrappedValue = new_value
+        except:
+            IfcAttributeSetter.set_property_value(prop, value)
+
+    def get_measure(self, pset_name, prop_name):
+        key = (pset_name, prop_name)
+        if key not in self.measures:
+            self.measures[key] = None
+            pset_template = self.template.get_by_name(pset_name) if self.template else None
+            for prop_template in getattr(pset_template, "HasPropertyTemplates", None) or []:
+                if prop_template.Name == prop_name:
+                    self.measures[key] = prop_template.PrimaryMeasureType
+        return self.measures[key]
+
+    def get_converter(self, measure):
+        if measure not in self.measure_converters:
+            data_type = self.schema.declaration_by_name(measure)
+            while not isinstance(data_type, str) and hasattr(data_type, "declared_type"):
+                data_type = data_type.declared_type()
+            self.measure_converters[measure] = self.converters.get(data_type, str)
+        return self.measure_converters[measure]
 
 
 class IfcCsv:
@@ -138,6 +267,58 @@ class IfcCsv:
             for row in self.results:
                 writer.writerow(row)
 
+    def export_streamed(self, ifc_file, query):
+        # Like export, but wildcards are resolved once upfront, property
+        # values come from an index built in a single pass over the file and
+        # rows are written as they are produced instead of kept in results.
+        # The query is parsed here so that it also filters using the index.
+        self.ifc_file = ifc_file
+        pset_index = ifcopenshell.util.element.PsetIndex(ifc_file, should_inherit=False)
+        selector = ifcopenshell.util.selector.Selector()
+        elements = selector.parse(ifc_file, query, pset_index=pset_index)
+        self.attributes = self.get_indexed_attributes(pset_index)
+        header = ["GlobalId"]
+        header.extend(self.attributes)
+        rows = (self.get_row(selector, element) for element in elements)
+        if self.output.endswith(".parquet"):
+            self.write_parquet(header, rows)
+            return
+        with open(self.output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, delimiter=self.delimiter)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    def get_indexed_attributes(self, pset_index):
+        results = []
+        for attribute in self.attributes:
+            if "*" not in attribute:
+                results.append(attribute)
+                continue
+            pset_qto_name = attribute.split(".", 1)[0]
+            names = set()
+            for psets in pset_index.psets.values():
+                names.update(psets.get(pset_qto_name, ()))
+            results.extend("{}.{}".format(pset_qto_name, n) for n in sorted(names))
+        return results
+
+    def get_row(self, selector, element):
+        result = [getattr(element, "GlobalId", None)]
+        for attribute in self.attributes:
+            result.append(selector.get_element_value(element, attribute))
+        return result
+
+    def write_parquet(self, header, rows, batch_size=10000):
+        import pyarrow
+        import pyarrow.parquet
+
+        # Values are written as strings, like in a CSV
+        schema = pyarrow.schema([(name, pyarrow.string()) for name in header])
+        with pyarrow.parquet.ParquetWriter(self.output, schema) as writer:
+            for batch in iter(lambda: list(itertools.islice(rows, batch_size)), []):
+                columns = [[None if v is None else str(v) for v in column] for column in zip(*batch)]
+                arrays = [pyarrow.array(column, pyarrow.string()) for column in columns]
+                writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+
     def get_wildcard_attributes(self, attribute):
         results = set()
         pset_qto_name = attribute.split(".", 1)[0]
@@ -150,6 +331,32 @@ class IfcCsv:
                 results.update([p.Name for p in element.Quantities])
         return ["{}.{}".format(pset_qto_name, n) for n in results]
 
+    def import_indexed(self, ifc_file, batch_size=1000):
+        # Like Import, but elements and properties are looked up in an index
+        # built upfront and rows are applied in batches. Returns statistics.
+        start = time.perf_counter()
+        index = IfcPropertyIndex(ifc_file)
+        total_rows = 0
+        with open(self.output, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f, delimiter=self.delimiter)
+            headers = next(reader, [])
+            for batch in iter(lambda: list(itertools.islice(reader, batch_size)), []):
+                # Batching speeds up the removal of elements when their class is reassigned
+                ifc_file.batch()
+                try:
+                    for row in batch:
+                        element = index.elements.get(row[0])
+                        if element is None:
+                            print("The element with GUID {} was not found".format(row[0]))
+                            continue
+                        for header, value in zip(headers[1:], row[1:]):
+                            element = index.set_element_key(element, header, value)
+                finally:
+                    ifc_file.unbatch()
+                total_rows += len(batch)
+        duration = time.perf_counter() - start
+        return {"rows": total_rows, "seconds": duration, "rows_per_second": total_rows / duration if duration else 0}
+
     def Import(self, ifc_file):
         with open(self.output, newline="", encoding="utf-8") as f:
             reader = csv.reader(f, delimiter=self.delimiter)
@@ -177,20 +384,33 @@ if __name__ == "__main__":
     parser.add_argument("-a", "--arguments", nargs="+", help="Specify attributes that are part of the extract, using the IfcQuery syntax such as 'type', 'Name' or 'Pset_Foo.Bar'")
     parser.add_argument("--export", action="store_true", help="Export from IFC to CSV")
     parser.add_argument("--import", action="store_true", help="Import from CSV to IFC")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Export rows as they are produced, to Parquet if the CSV file ends with .parquet",
+    )
+    parser.add_argument("--indexed", action="store_true", help="Import using an index of elements and properties")
     args = parser.parse_args()
 
     if args.export:
         ifc_file = ifcopenshell.open(args.ifc)
-        selector = ifcopenshell.util.selector.Selector()
-        results = selector.parse(ifc_file, args.query)
         ifc_csv = IfcCsv()
         ifc_csv.output = args.csv
         ifc_csv.attributes = args.arguments if args.arguments else []
-        ifc_csv.selector = selector
-        ifc_csv.export(ifc_file, results)
+        if args.stream:
+            ifc_csv.export_streamed(ifc_file, args.query)
+        else:
+            selector = ifcopenshell.util.selector.Selector()
+            results = selector.parse(ifc_file, args.query)
+            ifc_csv.selector = selector
+            ifc_csv.export(ifc_file, results)
     elif getattr(args, "import"):
         ifc_csv = IfcCsv()
         ifc_csv.output = args.csv
         ifc_file = ifcopenshell.open(args.ifc)
-        ifc_csv.Import(ifc_file)
+        if args.indexed:
+            statistics = ifc_csv.import_indexed(ifc_file)
+            print("Imported {rows} rows in {seconds:.2f}s ({rows_per_second:.0f} rows/sec)".format(**statistics))
+        else:
+            ifc_csv.Import(ifc_file)
         ifc_file.write(args.ifc)
@@ -0,0 +1,192 @@
+import csv
+import pytest
+import ifcopenshell
+import ifcopenshell.api
+import ifcopenshell.util.selector
+import ifcopenshell.util.element
+import ifccsv
+from ifccsv import IfcCsv, IfcPropertyIndex, to_boolean
+
+
+def create_ifc_file():
+    ifc = ifcopenshell.api.run("project.create_file")
+    ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcProject")
+    for i, rating in enumerate(["A", "B", None]):
+        wall = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcWall", name="Wall {}".format(i))
+        if rating:
+            pset = ifcopenshell.api.run("pset.add_pset", ifc, product=wall, name="Test")
+            ifcopenshell.api.run("pset.edit_pset", ifc, pset=pset, properties={"Rating": rating, "Count": i})
+    ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcSlab", name="Slab")
+    return ifc
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    # Wildcard columns may be expanded in any order
+    return {row[0]: dict(zip(rows[0][1:], row[1:])) for row in rows[1:]}
+
+
+class TestExport:
+    @pytest.mark.parametrize("attributes", [["Name"], ["Name", "Test.Rating"], ["Name", "Test.*"]])
+    def test_that_a_streamed_export_matches_a_normal_export(self, tmp_path, attributes):
+        ifc = create_ifc_file()
+        query = ".IfcWall"
+
+        ifc_csv = IfcCsv()
+        ifc_csv.output = str(tmp_path / "normal.csv")
+        ifc_csv.attributes = attributes[:]
+        ifc_csv.selector = ifcopenshell.util.selector.Selector()
+        ifc_csv.export(ifc, ifc_csv.selector.parse(ifc, query))
+
+        streamed_csv = IfcCsv()
+        streamed_csv.output = str(tmp_path / "streamed.csv")
+        streamed_csv.attributes = attributes[:]
+        streamed_csv.export_streamed(ifc, query)
+
+        expected = read_csv(ifc_csv.output)
+        assert len(expected) == 3
+        assert read_csv(streamed_csv.output) == expected
+
+    def test_that_a_streamed_export_filters_by_property(self, tmp_path):
+        ifc = create_ifc_file()
+        ifc_csv = IfcCsv()
+        ifc_csv.output = str(tmp_path / "streamed.csv")
+        ifc_csv.attributes = ["Name"]
+        ifc_csv.export_streamed(ifc, '.IfcWall[Test.Rating = "A"]')
+        assert [r["Name"] for r in read_csv(ifc_csv.output).values()] == ["Wall 0"]
+
+
+class TestToBoolean:
+    @pytest.mark.parametrize("value", ["1", "t", "True", "YES", "y", "uh-huh"])
+    def test_truthy_values(self, value):
+        assert to_boolean(value) is True
+
+    @pytest.mark.parametrize("value", ["0", "f", "False", "no", "", "maybe"])
+    def test_falsy_values(self, value):
+        assert to_boolean(value) is False
+
+
+class TestIfcPropertyIndex:
+    def test_indexing_elements_properties_and_quantities(self):
+        ifc = create_ifc_file()
+        wall = ifc.by_type("IfcWall")[0]
+        qto = ifcopenshell.api.run("pset.add_qto", ifc, product=wall, name="Qto_WallBaseQuantities")
+        ifcopenshell.api.run("pset.edit_qto", ifc, qto=qto, properties={"Length": 1.0})
+        index = IfcPropertyIndex(ifc)
+        assert index.elements[wall.GlobalId] == wall
+        assert [p.Name for p in index.psets[wall.id()]["Test"]["Rating"]] == ["Rating"]
+        assert [p.Name for p in index.qtos[wall.id()]["Qto_WallBaseQuantities"]["Length"]] == ["Length"]
+        assert ifc.by_type("IfcWall")[2].id() not in index.psets
+
+    def test_indexing_type_properties(self):
+        ifc = create_ifc_file()
+        wall_type = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcWallType")
+        pset = ifcopenshell.api.run("pset.add_pset", ifc, product=wall_type, name="Test")
+        ifcopenshell.api.run("pset.edit_pset", ifc, pset=pset, properties={"Rating": "C"})
+        index = IfcPropertyIndex(ifc)
+        assert index.psets[wall_type.id()]["Test"]["Rating"][0].NominalValue.wrappedValue == "C"
+
+    def test_setting_an_attribute(self):
+        ifc = create_ifc_file()
+        wall = ifc.by_type("IfcWall")[0]
+        index = IfcPropertyIndex(ifc)
+        assert index.set_element_key(wall, "Name", "Foo") == wall
+        assert wall.Name == "Foo"
+
+    def test_setting_properties_using_their_existing_data_type(self):
+        ifc = create_ifc_file()
+        wall = ifc.by_type("IfcWall")[1]
+        index = IfcPropertyIndex(ifc)
+        index.set_element_key(wall, "Test.Rating", "C")
+        index.set_element_key(wall, "Test.Count", "42")
+        psets = ifcopenshell.util.element.get_psets(wall)
+        assert psets["Test"]["Rating"] == "C"
+        assert psets["Test"]["Count"] == 42
+
+    def test_setting_a_property_without_a_value_using_its_template_measure(self):
+        ifc = create_ifc_file()
+        wall = ifc.by_type("IfcWall")[0]
+        pset = ifcopenshell.api.run("pset.add_pset", ifc, product=wall, name="Pset_WallCommon")
+        prop = ifc.createIfcPropertySingleValue(Name="IsExternal")
+        pset.HasProperties = [prop]
+        index = IfcPropertyIndex(ifc)
+        index.set_element_key(wall, "Pset_WallCommon.IsExternal", "yes")
+        assert prop.NominalValue.is_a("IfcBoolean")
+        assert prop.NominalValue.wrappedValue is True
+
+    def test_setting_a_quantity(self):
+        ifc = create_ifc_file()
+        wall = ifc.by_type("IfcWall")[0]
+        qto = ifcopenshell.api.run("pset.add_qto", ifc, product=wall, name="Qto_WallBaseQuantities")
+        ifcopenshell.api.run("pset.edit_qto", ifc, qto=qto, properties={"Length": 1.0})
+        index = IfcPropertyIndex(ifc)
+        index.set_element_key(wall, "Qto_WallBaseQuantities.Length", "2.5")
+        assert ifcopenshell.util.element.get_psets(wall)["Qto_WallBaseQuantities"]["Length"] == 2.5
+
+    def test_reassigning_a_class_updates_the_index(self):
+        ifc = create_ifc_file()
+        wall = ifc.by_type("IfcWall")[0]
+        guid = wall.GlobalId
+        index = IfcPropertyIndex(ifc)
+        element = index.set_element_key(wall, "type", "IfcColumn")
+        assert element.is_a("IfcColumn")
+        assert index.elements[guid] == element
+        index.set_element_key(element, "Test.Rating", "C")
+        assert ifcopenshell.util.element.get_psets(element)["Test"]["Rating"] == "C"
+
+
+class TestImportIndexed:
+    def create_rows(self, ifc):
+        walls = ifc.by_type("IfcWall")
+        return [
+            ["GlobalId", "Name", "Test.Rating", "Test.Count"],
+            [walls[0].GlobalId, "Foo", "C", "3"],
+            [walls[1].GlobalId, "Bar", "D", "4"],
+            ["nonexistent", "Baz", "E", "5"],
+        ]
+
+    def test_importing_matches_a_normal_import(self, tmp_path):
+        results = []
+        for method in ("Import", "import_indexed"):
+            ifc = create_ifc_file()
+            ifc_csv = IfcCsv()
+            ifc_csv.output = str(tmp_path / "data.csv")
+            write_csv(ifc_csv.output, self.create_rows(ifc))
+            getattr(ifc_csv, method)(ifc)
+            results.append(
+                [(w.Name, ifcopenshell.util.element.get_psets(w).get("Test")) for w in ifc.by_type("IfcWall")]
+            )
+        assert results[0] == results[1]
+        assert results[1][0] == ("Foo", {"Rating": "C", "Count": 3})
+
+    def test_importing_in_batches_returns_statistics(self, tmp_path):
+        ifc = create_ifc_file()
+        ifc_csv = IfcCsv()
+        ifc_csv.output = str(tmp_path / "data.csv")
+        write_csv(ifc_csv.output, self.create_rows(ifc))
+        statistics = ifc_csv.import_indexed(ifc, batch_size=2)
+        assert statistics["rows"] == 3
+        assert [w.Name for w in ifc.by_type("IfcWall")] == ["Foo", "Bar", "Wall 2"]
+
+    def test_the_file_is_unbatched_when_an_import_fails(self, tmp_path, monkeypatch):
+        ifc = create_ifc_file()
+        ifc_csv = IfcCsv()
+        ifc_csv.output = str(tmp_path / "data.csv")
+        write_csv(ifc_csv.output, self.create_rows(ifc))
+        calls = []
+        unbatch = ifc.unbatch
+        monkeypatch.setattr(ifc, "unbatch", lambda: calls.append("unbatch") or unbatch())
+
+        def set_element_key(self, element, key, value):
+            raise ValueError(key)
+
+        monkeypatch.setattr(ifccsv.IfcPropertyIndex, "set_element_key", set_element_key)
+        with pytest.raises(ValueError):
+            ifc_csv.import_indexed(ifc)
+        assert calls == ["unbatch"]
@@ -0,0 +1,69 @@
+###############################################################################
+#                                                                             #
+# This file is part of IfcOpenShell.                                          #
+#                                                                             #
+# IfcOpenShell is free software: you can redistribute it and/or modify        #
+# it under the terms of the Lesser GNU General Public License as published by #
+# the Free Software Foundation, either version 3.0 of the License, or         #
+# (at your option) any later version.                                         #
+#                                                                             #
+# IfcOpenShell is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the                #
+# Lesser GNU General Public License for more details.                         #
+#                                                                             #
+# You should have received a copy of the Lesser GNU General Public License    #
+# along with this program. If not, see <http://www.gnu.org/licenses/>.        #
+#                                                                             #
+###############################################################################
+
+# Measures attribute reads per second over IfcProduct instances.
+#
+# Usage: python benchmark/attribute_access.py [model.ifc] [--size 1000000]
+#
+# If no model is given, a synthetic model of --size walls sharing a single
+# placement and representation is generated.
+
+import time
+import argparse
+import ifcopenshell
+
+ATTRIBUTES = ("Name", "ObjectPlacement", "Representation")
+
+
+def create_model(size):
+    f = ifcopenshell.file(schema="IFC4")
+    placement = f.createIfcLocalPlacement()
+    representation = f.createIfcProductDefinitionShape()
+    for i in range(size):
+        f.createIfcWall(
+            ifcopenshell.guid.new(), Name="Wall %d" % i, ObjectPlacement=placement, Representation=representation
+        )
+    return f
+
+
+def run(f, wrapper_cache):
+    f.set_wrapper_cache(wrapper_cache)
+    start = time.perf_counter()
+    products = f.by_type("IfcProduct")
+    reads = 0
+    for product in products:
+        for attribute in ATTRIBUTES:
+            getattr(product, attribute)
+            reads += 1
+    return reads, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark entity_instance attribute access")
+    parser.add_argument("model", nargs="?", help="IFC model to read, a synthetic model is used otherwise")
+    parser.add_argument("--size", type=int, default=1000000, help="Number of products in the synthetic model")
+    args = parser.parse_args()
+
+    f = ifcopenshell.open(args.model) if args.model else create_model(args.size)
+    print("Instances: %d" % len(f.wrapped_data.entity_names()))
+    for wrapper_cache in (False, True):
+        reads, duration = run(f, wrapper_cache)
+        print(
+            "Wrapper cache %-5s: %d reads in %.2fs, %.0f reads/sec" % (wrapper_cache, reads, duration, reads / duration)
+        )
@@ -0,0 +1,105 @@
+###############################################################################
+#                                                                             #
+# This file is part of IfcOpenShell.                                          #
+#                                                                             #
+# IfcOpenShell is free software: you can redistribute it and/or modify        #
+# it under the terms of the Lesser GNU General Public License as published by #
+# the Free Software Foundation, either version 3.0 of the License, or         #
+# (at your option) any later version.                                         #
+#                                                                             #
+# IfcOpenShell is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the                #
+# Lesser GNU General Public License for more details.                         #
+#                                                                             #
+# You should have received a copy of the Lesser GNU General Public License    #
+# along with this program. If not, see <http://www.gnu.org/licenses/>.        #
+#                                                                             #
+###############################################################################
+
+# Measures the number of topics per second written to a BCF archive by the
+# BcfXml class, which writes each topic to a temporary directory and zips it
+# on save, and by the streaming BcfWriter, serially and in worker processes.
+# Each topic has a comment and a viewpoint selecting two components.
+#
+# Usage: python benchmark/bcf_writer.py [--size 5000] [--version 2] [--processes 4]
+
+import os
+import time
+import uuid
+import argparse
+import tempfile
+import importlib
+
+
+def create_topic(data, i):
+    topic = data.Topic()
+    topic.title = "Clash %d" % i
+    topic.description = "IfcWall/Wall %d and IfcDuct/Duct %d" % (i, i)
+    comment = data.Comment()
+    comment.comment = "Found by a clash detection run"
+    comment.author = "benchmark@example.com"
+    topic.comments[None] = comment
+    viewpoint = data.Viewpoint()
+    viewpoint.perspective_camera = data.PerspectiveCamera()
+    viewpoint.perspective_camera.camera_view_point.x = float(i)
+    viewpoint.perspective_camera.camera_direction.x = -1.0
+    viewpoint.perspective_camera.camera_up_vector.z = 1.0
+    viewpoint.components = data.Components()
+    for n in range(2):
+        component = data.Component()
+        component.ifc_guid = str(uuid.uuid4()).replace("-", "")[:22]
+        viewpoint.components.selection.append(component)
+    viewpoint.components.visibility = data.ComponentVisibility()
+    viewpoint.components.visibility.default_visibility = True
+    topic.viewpoints[None] = viewpoint
+    return topic
+
+
+def write_bcfxml(bcfxml, data, topics, path):
+    writer = bcfxml.BcfXml()
+    writer.author = "benchmark@example.com"
+    writer.new_project()
+    for topic in topics:
+        comments = list(topic.comments.values())
+        viewpoints = list(topic.viewpoints.values())
+        topic.comments, topic.viewpoints = {}, {}
+        topic = writer.add_topic(topic)
+        for comment in comments:
+            writer.add_comment(topic, comment)
+        for viewpoint in viewpoints:
+            writer.add_viewpoint(topic, viewpoint)
+    writer.save_project(path)
+
+
+def write_streaming(bcfxml, data, topics, path, num_processes=1):
+    with bcfxml.BcfWriter(path) as writer:
+        writer.author = "benchmark@example.com"
+        writer.add_topics(topics, num_processes=num_processes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark writing BCF topics")
+    parser.add_argument("--size", type=int, default=5000, help="Number of topics")
+    parser.add_argument("--version", choices=["2", "3"], default="2", help="BCF major version")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="Worker processes of the parallel run")
+    args = parser.parse_args()
+
+    bcfxml = importlib.import_module(f"bcf.v{args.version}.bcfxml")
+    data = importlib.import_module(f"bcf.v{args.version}.data")
+    runs = [
+        ("BcfXml", write_bcfxml, {}),
+        ("BcfWriter", write_streaming, {}),
+        ("BcfWriter (%d processes)" % args.processes, write_streaming, {"num_processes": args.processes}),
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("%-28s %10s %12s %10s" % ("Writer", "Time", "Topics/s", "Size"))
+        for i, (name, write, kwargs) in enumerate(runs):
+            topics = [create_topic(data, n) for n in range(args.size)]
+            path = os.path.join(directory, "%d.bcf" % i)
+            start = time.perf_counter()
+            write(bcfxml, data, topics, path, **kwargs)
+            duration = time.perf_counter() - start
+            size = os.path.getsize(path) / 1024**2
+            print("%-28s %9.2fs %12.0f %8.1fMB" % (name, duration, args.size / duration, size))
@@ -0,0 +1,66 @@
+###############################################################################
+#                                                                             #
+# This file is part of IfcOpenShell.                                          #
+#                                                                             #
+# IfcOpenShell is free software: you can redistribute it and/or modify        #
+# it under the terms of the Lesser GNU General Public License as published by #
+# the Free Software Foundation, either version 3.0 of the License, or         #
+# (at your option) any later version.                                         #
+#                                                                             #
+# IfcOpenShell is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the                #
+# Lesser GNU General Public License for more details.                         #
+#                                                                             #
+# You should have received a copy of the Lesser GNU General Public License    #
+# along with this program. If not, see <http://www.gnu.org/licenses/>.        #
+#                                                                             #
+###############################################################################
+
+# Measures geometry iteration throughput with an increasing number of worker
+# processes, compared to a single in-process iterator.
+#
+# Usage: python benchmark/geometry_parallel.py model.ifc [--max-processes 8] [--ordered]
+
+import os
+import time
+import argparse
+import ifcopenshell
+import ifcopenshell.geom
+
+
+def consume(shapes):
+    count = 0
+    for shape in shapes:
+        len(shape.geometry.verts)
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark process-parallel geometry iteration")
+    parser.add_argument("model", help="IFC model to tessellate")
+    parser.add_argument("--max-processes", type=int, default=os.cpu_count(), help="Largest number of processes")
+    parser.add_argument("--ordered", action="store_true", help="Yield shapes in element order")
+    args = parser.parse_args()
+
+    settings = ifcopenshell.geom.settings()
+
+    start = time.perf_counter()
+    count = consume(ifcopenshell.geom.iterate(settings, ifcopenshell.open(args.model)))
+    duration = time.perf_counter() - start
+    print("iterate: %d shapes in %.2fs, %.1f shapes/sec" % (count, duration, count / duration))
+
+    num_processes = 1
+    while num_processes <= args.max_processes:
+        start = time.perf_counter()
+        shapes = ifcopenshell.geom.iterate_parallel(
+            settings, args.model, num_processes=num_processes, ordered=args.ordered
+        )
+        count = consume(shapes)
+        duration = time.perf_counter() - start
+        print(
+            "iterate_parallel, %2d processes: %d shapes in %.2fs, %.1f shapes/sec"
+            % (num_processes, count, duration, count / duration)
+        )
+        num_processes *= 2
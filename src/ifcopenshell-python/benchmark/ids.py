@@ -0,0 +1,108 @@
+###############################################################################
+#                                                                             #
+# This file is part of IfcOpenShell.                                          #
+#                                                                             #
+# IfcOpenShell is free software: you can redistribute it and/or modify        #
+# it under the terms of the Lesser GNU General Public License as published by #
+# the Free Software Foundation, either version 3.0 of the License, or         #
+# (at your option) any later version.                                         #
+#                                                                             #
+# IfcOpenShell is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the                #
+# Lesser GNU General Public License for more details.                         #
+#                                                                             #
+# You should have received a copy of the Lesser GNU General Public License    #
+# along with this program. If not, see <http://www.gnu.org/licenses/>.        #
+#                                                                             #
+###############################################################################
+
+# Measures IDS validation time of the element-major engine of ids.validate
+# against checking every specification against every IfcObject in turn.
+#
+# Usage: python benchmark/ids.py [--size 50000] [--specs 200] [--processes 0]
+#
+# A synthetic model of --size walls and slabs with a property set is validated
+# against --specs synthetic specifications, alternating between entities.
+
+import time
+import logging
+import argparse
+import ifcopenshell
+import ifcopenshell.api
+from ifcopenshell import ids
+
+ENTITIES = ("IfcWall", "IfcSlab", "IfcDoor", "IfcWindow")
+
+
+def create_model(size):
+    f = ifcopenshell.file(schema="IFC4")
+    for i in range(size):
+        ifc_class = ("IfcWall", "IfcSlab")[i % 2]
+        element = f.create_entity(ifc_class, ifcopenshell.guid.new(), Name="%s %d" % (ifc_class, i))
+        pset = ifcopenshell.api.run("pset.add_pset", f, product=element, name="Pset_Benchmark")
+        ifcopenshell.api.run("pset.edit_pset", f, pset=pset, properties={"Reference": "R%d" % (i % 10)})
+    return f
+
+
+def create_ids(num_specs):
+    ids_file = ids.ids()
+    for i in range(num_specs):
+        ids_file.specifications.append(
+            ids.specification.parse(
+                {
+                    "@name": "Specification %d" % i,
+                    "@necessity": "required",
+                    "applicability": {"entity": {"name": {"simpleValue": ENTITIES[i % len(ENTITIES)]}}},
+                    "requirements": {
+                        "property": {
+                            "@location": "any",
+                            "propertyset": {"simpleValue": "Pset_Benchmark"},
+                            "name": {"simpleValue": "Reference"},
+                            "value": {"simpleValue": "R%d" % (i % 10)},
+                        }
+                    },
+                }
+            )
+        )
+    return ids_file
+
+
+def run_specification_major(ids_file, f, logger):
+    start = time.perf_counter()
+    for spec in ids_file.specifications:
+        for element in f.by_type("IfcObject"):
+            spec(element, logger)
+    return time.perf_counter() - start
+
+
+def run_element_major(ids_file, f, logger, num_processes, filepath):
+    start = time.perf_counter()
+    ids_file.validate(filepath if num_processes else f, logger, num_processes=num_processes)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark IDS validation")
+    parser.add_argument("--size", type=int, default=50000, help="Number of elements in the synthetic model")
+    parser.add_argument("--specs", type=int, default=200, help="Number of synthetic specifications")
+    parser.add_argument(
+        "--processes", type=int, default=0, help="Number of worker processes for the element-major engine"
+    )
+    args = parser.parse_args()
+
+    f = create_model(args.size)
+    filepath = None
+    if args.processes:
+        filepath = "ids_benchmark.ifc"
+        f.write(filepath)
+    ids_file = create_ids(args.specs)
+
+    # Only failures are reported, as in a typical audit
+    logger = logging.getLogger("IDS_Benchmark")
+    logger.setLevel(logging.ERROR)
+    logger.propagate = False
+    logger.addHandler(logging.NullHandler())
+
+    print("Specification-major: %.2fs" % run_specification_major(ids_file, f, logger))
+    print("Element-major: %.2fs" % run_element_major(ids_file, f, logger, args.processes, filepath))
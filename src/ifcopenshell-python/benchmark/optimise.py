@@ -0,0 +1,83 @@
+###############################################################################
+#                                                                             #
+# This file is part of IfcOpenShell.                                          #
+#                                                                             #
+# IfcOpenShell is free software: you can redistribute it and/or modify        #
+# it under the terms of the Lesser GNU General Public License as published by #
+# the Free Software Foundation, either version 3.0 of the License, or         #
+# (at your option) any later version.                                         #
+#                                                                             #
+# IfcOpenShell is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the                #
+# Lesser GNU General Public License for more details.                         #
+#                                                                             #
+# You should have received a copy of the Lesser GNU General Public License    #
+# along with this program. If not, see <http://www.gnu.org/licenses/>.        #
+#                                                                             #
+###############################################################################
+
+# Measures the runtime and file size reduction of the ifcpatch Optimise recipe.
+#
+# Usage: python benchmark/optimise.py [--input model.ifc] [--size 20000] [--tolerance 0]
+#
+# Without --input, a synthetic model of --size polylines is created, where
+# every polyline has its own, but mostly coincident, points and directions, as
+# is common in exported geometry. Points are jittered by less than 1e-6 so
+# that --tolerance 1e-4 merges more of them.
+
+import os
+import time
+import random
+import logging
+import argparse
+import tempfile
+import ifcopenshell
+from ifcpatch.recipes import Optimise
+
+
+def create_model(size):
+    f = ifcopenshell.file(schema="IFC4")
+    for i in range(size):
+        points = []
+        for x, y in ((0.0, 0.0), (1.0, 0.0), (1.0, float(i % 100)), (0.0, float(i % 100))):
+            points.append(f.createIfcCartesianPoint((x + random.uniform(0, 1e-6) * (i % 2), y)))
+        f.createIfcPolyline(points)
+        f.createIfcAxis2Placement3D(
+            f.createIfcCartesianPoint((0.0, 0.0, 0.0)),
+            f.createIfcDirection((0.0, 0.0, 1.0)),
+            f.createIfcDirection((1.0, 0.0, 0.0)),
+        )
+    return f
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ifcpatch Optimise recipe")
+    parser.add_argument("--input", help="An IFC file to optimise instead of a synthetic model")
+    parser.add_argument("--size", type=int, default=20000, help="Number of polylines in the synthetic model")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="Tolerance to merge floating point values")
+    args = parser.parse_args()
+
+    f = ifcopenshell.open(args.input) if args.input else create_model(args.size)
+
+    logger = logging.getLogger("Optimise_Benchmark")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler())
+
+    start = time.perf_counter()
+    patcher = Optimise.Patcher(args.input, f, logger, args.tolerance)
+    patcher.patch()
+    duration = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        before = os.path.join(directory, "before.ifc")
+        after = os.path.join(directory, "after.ifc")
+        f.write(before)
+        patcher.file.write(after)
+        before_size, after_size = os.path.getsize(before), os.path.getsize(after)
+
+    print("Optimised in %.2fs (%.0f instances/s)" % (duration, len(patcher.instance_mapping) / duration))
+    print("Instances: %d -> %d" % (len(patcher.instance_mapping), len(patcher.hash_to_instance)))
+    print(
+        "File size: %d -> %d bytes (%.1f%% smaller)" % (before_size, after_size, 100 * (1 - after_size / before_size))
+    )
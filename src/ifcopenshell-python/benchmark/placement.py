@@ -0,0 +1,81 @@
+###############################################################################
+#                                                                             #
+# This file is part of IfcOpenShell.                                          #
+#                                                                             #
+# IfcOpenShell is free software: you can redistribute it and/or modify        #
+# it under the terms of the Lesser GNU General Public License as published by #
+# the Free Software Foundation, either version 3.0 of the License, or         #
+# (at your option) any later version.                                         #
+#                                                                             #
+# IfcOpenShell is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the                #
+# Lesser GNU General Public License for more details.                         #
+#                                                                             #
+# You should have received a copy of the Lesser GNU General Public License    #
+# along with this program. If not, see <http://www.gnu.org/licenses/>.        #
+#                                                                             #
+###############################################################################
+
+# Measures the time to compute the absolute matrices of all product placements
+# with the recursive get_local_placement() and with a PlacementResolver.
+#
+# Usage: python benchmark/placement.py [model.ifc] [--size 300000] [--storeys 40]
+#
+# If no model is given, a synthetic model of --size products is generated,
+# placed relative to --storeys storeys of a single building.
+
+import time
+import argparse
+import numpy as np
+import ifcopenshell
+import ifcopenshell.util.placement
+
+
+def create_placement(f, coordinates, placement_rel_to=None):
+    return f.createIfcLocalPlacement(
+        placement_rel_to, f.createIfcAxis2Placement3D(f.createIfcCartesianPoint(coordinates))
+    )
+
+
+def create_model(size, storeys):
+    f = ifcopenshell.file(schema="IFC4")
+    site = create_placement(f, (0.0, 0.0, 0.0))
+    building = create_placement(f, (10.0, 10.0, 0.0), site)
+    storey_placements = [create_placement(f, (0.0, 0.0, 3.0 * i), building) for i in range(storeys)]
+    for i in range(size):
+        f.createIfcWall(
+            ifcopenshell.guid.new(),
+            ObjectPlacement=create_placement(f, (float(i % 100), float(i // 100), 0.0), storey_placements[i % storeys]),
+        )
+    return f
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark placement resolution")
+    parser.add_argument("model", nargs="?", help="An IFC file to use instead of a synthetic model")
+    parser.add_argument("--size", type=int, default=300000, help="Number of products in the synthetic model")
+    parser.add_argument("--storeys", type=int, default=40, help="Number of storeys in the synthetic model")
+    args = parser.parse_args()
+
+    f = ifcopenshell.open(args.model) if args.model else create_model(args.size, args.storeys)
+    placements = [p.ObjectPlacement for p in f.by_type("IfcProduct") if p.ObjectPlacement]
+
+    start = time.perf_counter()
+    recursive = np.array([ifcopenshell.util.placement.get_local_placement(p) for p in placements])
+    recursive_duration = time.perf_counter() - start
+
+    resolver = ifcopenshell.util.placement.PlacementResolver(f)
+    start = time.perf_counter()
+    resolved = resolver.get_local_placements(placements)
+    resolver_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resolver.get_local_placements(placements)
+    cached_duration = time.perf_counter() - start
+
+    print("Placements: %d" % len(placements))
+    print("Recursive: %.2fs" % recursive_duration)
+    print("Resolver: %.2fs (%.1fx)" % (resolver_duration, recursive_duration / resolver_duration))
+    print("Resolver, cached: %.2fs (%.1fx)" % (cached_duration, recursive_duration / cached_duration))
+    print("Max difference: %g" % np.nanmax(np.abs(recursive - resolved)))
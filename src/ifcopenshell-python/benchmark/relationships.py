@@ -0,0 +1,75 @@
+###############################################################################
+#                                                                             #
+# This file is part of IfcOpenShell.                                          #
+#                                                                             #
+# IfcOpenShell is free software: you can redistribute it and/or modify        #
+# it under the terms of the Lesser GNU General Public License as published by #
+# the Free Software Foundation, either version 3.0 of the License, or         #
+# (at your option) any later version.                                         #
+#                                                                             #
+# IfcOpenShell is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the                #
+# Lesser GNU General Public License for more details.                         #
+#                                                                             #
+# You should have received a copy of the Lesser GNU General Public License    #
+# along with this program. If not, see <http://www.gnu.org/licenses/>.        #
+#                                                                             #
+###############################################################################
+
+# Measures the time to assign a growing number of products to a single
+# container, type, material and group, one API call per product and with a
+# single batch call, to show that batch assignment scales linearly.
+#
+# Usage: python benchmark/relationships.py [--sizes 1000 2000 4000 8000]
+
+import time
+import argparse
+import ifcopenshell
+import ifcopenshell.api
+
+
+def create_model(size):
+    f = ifcopenshell.api.run("project.create_file")
+    ifcopenshell.api.run("root.create_entity", f, ifc_class="IfcProject")
+    ifcopenshell.api.run("unit.assign_unit", f)
+    storey = ifcopenshell.api.run("root.create_entity", f, ifc_class="IfcBuildingStorey")
+    element_type = ifcopenshell.api.run("root.create_entity", f, ifc_class="IfcWallType")
+    material = ifcopenshell.api.run("material.add_material", f)
+    group = ifcopenshell.api.run("group.add_group", f)
+    walls = [ifcopenshell.api.run("root.create_entity", f, ifc_class="IfcWall") for i in range(size)]
+    return f, walls, {"storey": storey, "type": element_type, "material": material, "group": group}
+
+
+def assign_individually(f, walls, targets):
+    for wall in walls:
+        ifcopenshell.api.run("spatial.assign_container", f, product=wall, relating_structure=targets["storey"])
+        ifcopenshell.api.run("type.assign_type", f, related_object=wall, relating_type=targets["type"])
+        ifcopenshell.api.run("material.assign_material", f, product=wall, material=targets["material"])
+        ifcopenshell.api.run("group.assign_group", f, product=wall, group=targets["group"])
+
+
+def assign_in_batch(f, walls, targets):
+    ifcopenshell.api.run("spatial.assign_container", f, products=walls, relating_structure=targets["storey"])
+    ifcopenshell.api.run("type.assign_type", f, related_objects=walls, relating_type=targets["type"])
+    ifcopenshell.api.run("material.assign_material", f, products=walls, material=targets["material"])
+    ifcopenshell.api.run("group.assign_group", f, products=walls, group=targets["group"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batch relationship assignment")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 4000, 8000], help="Numbers of products")
+    args = parser.parse_args()
+
+    print("%10s %12s %12s %12s %12s" % ("Products", "Individual", "per product", "Batch", "per product"))
+    for size in args.sizes:
+        durations = []
+        for assign in (assign_individually, assign_in_batch):
+            f, walls, targets = create_model(size)
+            start = time.perf_counter()
+            assign(f, walls, targets)
+            durations.append(time.perf_counter() - start)
+        print(
+            "%10d %11.2fs %10.1fus %11.2fs %10.1fus"
+            % (size, durations[0], durations[0] / size * 1e6, durations[1], durations[1] / size * 1e6)
+        )
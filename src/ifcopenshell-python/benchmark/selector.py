@@ -0,0 +1,76 @@
+###############################################################################
+#                                                                             #
+# This file is part of IfcOpenShell.                                          #
+#                                                                             #
+# IfcOpenShell is free software: you can redistribute it and/or modify        #
+# it under the terms of the Lesser GNU General Public License as published by #
+# the Free Software Foundation, either version 3.0 of the License, or         #
+# (at your option) any later version.                                         #
+#                                                                             #
+# IfcOpenShell is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the                #
+# Lesser GNU General Public License for more details.                         #
+#                                                                             #
+# You should have received a copy of the Lesser GNU General Public License    #
+# along with this program. If not, see <http://www.gnu.org/licenses/>.        #
+#                                                                             #
+###############################################################################
+
+# Measures selector queries per second, with and without cached query plans.
+#
+# Usage: python benchmark/selector.py [model.ifc] [--size 10000] [--repeat 100]
+#
+# If no model is given, a synthetic model of --size walls with a property set
+# is generated.
+
+import time
+import argparse
+import ifcopenshell
+import ifcopenshell.api
+import ifcopenshell.util.selector
+
+QUERIES = (
+    ".IfcWall",
+    ".IfcWall[Name]",
+    '.IfcWall[Name *= "1"]',
+    '.IfcWall[Pset_WallCommon.IsExternal = "True"] | .IfcSlab',
+    '(.IfcWall & .IfcWall[Name *= "2"]) | .IfcDoor',
+)
+
+
+def create_model(size):
+    f = ifcopenshell.file(schema="IFC4")
+    for i in range(size):
+        wall = f.createIfcWall(ifcopenshell.guid.new(), Name="Wall %d" % i)
+        pset = ifcopenshell.api.run("pset.add_pset", f, product=wall, name="Pset_WallCommon")
+        ifcopenshell.api.run("pset.edit_pset", f, pset=pset, properties={"IsExternal": bool(i % 2)})
+    return f
+
+
+def run(f, repeat, cached):
+    selector = ifcopenshell.util.selector.Selector()
+    queries = 0
+    start = time.perf_counter()
+    for i in range(repeat):
+        if not cached:
+            ifcopenshell.util.selector.compile_query.cache_clear()
+        for query in QUERIES:
+            selector.parse(f, query)
+            queries += 1
+    return queries, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark selector queries")
+    parser.add_argument("model", nargs="?", help="IFC model to query, a synthetic model is used otherwise")
+    parser.add_argument("--size", type=int, default=10000, help="Number of walls in the synthetic model")
+    parser.add_argument("--repeat", type=int, default=100, help="Number of times each query is run")
+    args = parser.parse_args()
+
+    f = ifcopenshell.open(args.model) if args.model else create_model(args.size)
+    for cached in (False, True):
+        queries, duration = run(f, args.repeat, cached)
+        print(
+            "Cached plans %-5s: %d queries in %.2fs, %.1f queries/sec" % (cached, queries, duration, queries / duration)
+        )
@@ -0,0 +1,81 @@
+###############################################################################
+#                                                                             #
+# This file is part of IfcOpenShell.                                          #
+#                                                                             #
+# IfcOpenShell is free software: you can redistribute it and/or modify        #
+# it under the terms of the Lesser GNU General Public License as published by #
+# the Free Software Foundation, either version 3.0 of the License, or         #
+# (at your option) any later version.                                         #
+#                                                                             #
+# IfcOpenShell is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the                #
+# Lesser GNU General Public License for more details.                         #
+#                                                                             #
+# You should have received a copy of the Lesser GNU General Public License    #
+# along with this program. If not, see <http://www.gnu.org/licenses/>.        #
+#                                                                             #
+###############################################################################
+
+# Compares bulk edits with and without an undo transaction.
+#
+# Usage: python benchmark/transaction.py [--size 10000]
+#
+# Creates --size walls with a small placement and representation subgraph,
+# edits their names and removes them with remove_deep.
+
+import time
+import argparse
+import ifcopenshell
+import ifcopenshell.util.element
+
+
+def create_walls(f, size):
+    walls = []
+    for i in range(size):
+        point = f.createIfcCartesianPoint((float(i), 0.0, 0.0))
+        placement = f.createIfcLocalPlacement(RelativePlacement=f.createIfcAxis2Placement3D(point))
+        polyline = f.createIfcPolyline([f.createIfcCartesianPoint((0.0, 0.0)), f.createIfcCartesianPoint((1.0, 0.0))])
+        representation = f.createIfcShapeRepresentation(Items=[polyline])
+        shape = f.createIfcProductDefinitionShape(Representations=[representation])
+        walls.append(f.createIfcWall(ifcopenshell.guid.new(), ObjectPlacement=placement, Representation=shape))
+    return walls
+
+
+def run(size, use_transaction):
+    f = ifcopenshell.file(schema="IFC4")
+    timings = []
+    start = time.perf_counter()
+    if use_transaction:
+        f.begin_transaction()
+    walls = create_walls(f, size)
+    timings.append(time.perf_counter() - start)
+    for i, wall in enumerate(walls):
+        wall.Name = "Wall %d" % i
+    timings.append(time.perf_counter() - sum(timings) - start)
+    for wall in walls:
+        ifcopenshell.util.element.remove_deep(f, wall)
+    timings.append(time.perf_counter() - sum(timings) - start)
+    journal_size = f.transaction.size if use_transaction else 0
+    if use_transaction:
+        f.end_transaction()
+        undo_start = time.perf_counter()
+        f.undo()
+        timings.append(time.perf_counter() - undo_start)
+    return timings, journal_size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark undo bookkeeping for bulk edits")
+    parser.add_argument("--size", type=int, default=10000, help="Number of walls to create, edit and remove")
+    args = parser.parse_args()
+
+    for use_transaction in (False, True):
+        timings, journal_size = run(args.size, use_transaction)
+        print("Transaction %s" % ("enabled" if use_transaction else "disabled"))
+        print("  create:      %.2fs" % timings[0])
+        print("  edit:        %.2fs" % timings[1])
+        print("  remove_deep: %.2fs" % timings[2])
+        if use_transaction:
+            print("  undo:        %.2fs" % timings[3])
+            print("  journal:     %.1f KiB" % (journal_size / 1024.0))
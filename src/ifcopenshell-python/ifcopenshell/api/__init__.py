@@ -1,5 +1,6 @@
 import json
 import numpy
+import datetime
 import importlib
 import ifcopenshell
 import ifcopenshell.api
@@ -7,6 +8,9 @@ import ifcopenshell.api
 
 pre_listeners = {}
 post_listeners = {}
+vcs_listeners = {}
+vcs_state = {"depth": 0}
+usecase_classes = {}
 
 
 def run(usecase_path, ifc_file=None, should_run_listeners=True, **settings):
@@ -14,46 +18,76 @@ def run(usecase_path, ifc_file=None, should_run_listeners=True, **settings):
         for listener in pre_listeners.get(usecase_path, {}).values():
             listener(usecase_path, ifc_file, settings)
 
-    def serialise_entity_instance(entity):
-        return {"cast_type": "entity_instance", "value": entity.id(), "Name": getattr(entity, "Name", None)}
-
-    vcs_settings = settings.copy()
-    for key, value in settings.items():
-        if isinstance(value, ifcopenshell.entity_instance):
-            vcs_settings[key] = serialise_entity_instance(value)
-        elif isinstance(value, numpy.ndarray):
-            vcs_settings[key] = {"cast_type": "ndarray", "value": value.tolist()}
-        elif isinstance(value, list) and value and isinstance(value[0], ifcopenshell.entity_instance):
-            vcs_settings[key] = [serialise_entity_instance(i) for i in value]
-    if "add_representation" in usecase_path:
-        pass
-        # print(usecase_path, "{ ... settings too complex right now ... }")
-    elif "owner." in usecase_path:
-        pass
-    else:
-        pass
-        # print(vcs_settings)
-        # try:
-        #    print(usecase_path, json.dumps(vcs_settings))
-        # except:
-        #    print(usecase_path, vcs_settings)
-
-    importlib.import_module(f"ifcopenshell.api.{usecase_path}")
-    module, usecase = usecase_path.split(".")
-    usecase_class = getattr(getattr(getattr(ifcopenshell.api, module), usecase), "Usecase")
-
-    if ifc_file:
-        result = usecase_class(ifc_file, **settings).execute()
-    else:
-        result = usecase_class(**settings).execute()
+    # Serialising settings is only worth it if someone is listening, and only
+    # top level calls are serialised as nested calls are implied by them.
+    vcs_settings = None
+    is_vcs_tracked = bool(vcs_listeners)
+    if is_vcs_tracked:
+        if should_run_listeners and not vcs_state["depth"]:
+            vcs_settings = serialise_settings(settings)
+        vcs_state["depth"] += 1
+
+    usecase_class = usecase_classes.get(usecase_path)
+    if usecase_class is None:
+        usecase_class = usecase_classes[usecase_path] = get_usecase_class(usecase_path)
+
+    try:
+        if ifc_file:
+            result = usecase_class(ifc_file, **settings).execute()
+        else:
+            result = usecase_class(**settings).execute()
+    finally:
+        if is_vcs_tracked:
+            vcs_state["depth"] -= 1
 
     if should_run_listeners:
         for listener in post_listeners.get(usecase_path, {}).values():
             listener(usecase_path, ifc_file, settings)
+        if vcs_settings is not None:
+            for listener in list(vcs_listeners.values()):
+                listener(usecase_path, ifc_file, vcs_settings, result)
 
     return result
 
 
+def get_usecase_class(usecase_path):
+    return importlib.import_module(f"ifcopenshell.api.{usecase_path}").Usecase
+
+
+def serialise_entity_instance(entity):
+    return {
+        "cast_type": "entity_instance",
+        "value": entity.id(),
+        "type": entity.is_a(),
+        "Name": getattr(entity, "Name", None),
+        "GlobalId": getattr(entity, "GlobalId", None),
+    }
+
+
+def serialise_settings(settings):
+    return {key: serialise_value(value) for key, value in settings.items()}
+
+
+def serialise_value(value):
+    if isinstance(value, ifcopenshell.entity_instance):
+        return serialise_entity_instance(value)
+    elif isinstance(value, numpy.ndarray):
+        return {"cast_type": "ndarray", "value": value.tolist()}
+    elif isinstance(value, numpy.generic):
+        return value.item()
+    elif isinstance(value, (list, tuple, set)):
+        return [serialise_value(v) for v in value]
+    elif isinstance(value, dict):
+        return {k: serialise_value(v) for k, v in value.items()}
+    elif isinstance(value, datetime.datetime):
+        return {"cast_type": "datetime", "value": value.isoformat()}
+    elif isinstance(value, datetime.date):
+        return {"cast_type": "date", "value": value.isoformat()}
+    elif value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return {"cast_type": "unsupported", "value": repr(value)}
+
+
 def add_pre_listener(usecase_path, name, callback):
     """Add a pre listener
 
@@ -94,9 +128,32 @@ def remove_post_listener(usecase_path, name, callback):
     post_listeners.get(usecase_path, {}).pop(name, None)
 
 
+def add_vcs_listener(name, callback):
+    """Add a listener to the serialised settings of every API call
+
+    Settings are only serialised while at least one such listener is
+    registered. The callback is called after the usecase has run with the
+    usecase path, the file, the serialised settings and the result. Only top
+    level calls are passed on, not calls made by other usecases.
+
+    :param name: string, name of listener
+    :param callback: callback function
+    """
+    vcs_listeners[name] = callback
+
+
+def remove_vcs_listener(name):
+    """Remove a listener to the serialised settings of every API call
+
+    :param name: string, name of listener
+    """
+    vcs_listeners.pop(name, None)
+
+
 def remove_all_listeners():
     pre_listeners.clear()
     post_listeners.clear()
+    vcs_listeners.clear()
 
 
 def extract_docs(module, usecase):
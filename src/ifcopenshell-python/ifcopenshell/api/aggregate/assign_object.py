@@ -7,21 +7,21 @@ class Usecase:
         self.file = file
         self.settings = {
             "product": None,
+            "products": None,
             "relating_object": None,
         }
         for key, value in settings.items():
             self.settings[key] = value
 
     def execute(self):
+        if self.settings["products"] is not None:
+            return self.execute_batch()
+
         decomposes = None
         if self.settings["product"].Decomposes:
             decomposes = self.settings["product"].Decomposes[0]
 
-        is_decomposed_by = None
-        for rel in self.settings["relating_object"].IsDecomposedBy:
-            if rel.is_a("IfcRelAggregates"):
-                is_decomposed_by = rel
-                break
+        is_decomposed_by = self.get_is_decomposed_by()
 
         if decomposes and decomposes == is_decomposed_by:
             return
@@ -51,3 +51,48 @@ class Usecase:
                 }
             )
         return is_decomposed_by
+
+    def execute_batch(self):
+        # Products are grouped by their previous decomposition so that every
+        # relationship is rewritten once, rather than once per product.
+        is_decomposed_by = self.get_is_decomposed_by()
+
+        products = []
+        old_rels = {}
+        for product in dict.fromkeys(self.settings["products"]):
+            if product.Decomposes:
+                if product.Decomposes[0] == is_decomposed_by:
+                    continue
+                old_rels.setdefault(product.Decomposes[0], set()).add(product)
+            products.append(product)
+
+        if not products:
+            return is_decomposed_by
+
+        for old_rel, removed_products in old_rels.items():
+            related_objects = [o for o in old_rel.RelatedObjects if o not in removed_products]
+            if related_objects:
+                old_rel.RelatedObjects = related_objects
+                ifcopenshell.api.run("owner.update_owner_history", self.file, **{"element": old_rel})
+            else:
+                self.file.remove(old_rel)
+
+        if is_decomposed_by:
+            is_decomposed_by.RelatedObjects = list(is_decomposed_by.RelatedObjects) + products
+            ifcopenshell.api.run("owner.update_owner_history", self.file, **{"element": is_decomposed_by})
+        else:
+            is_decomposed_by = self.file.create_entity(
+                "IfcRelAggregates",
+                **{
+                    "GlobalId": ifcopenshell.guid.new(),
+                    "OwnerHistory": ifcopenshell.api.run("owner.create_owner_history", self.file),
+                    "RelatedObjects": products,
+                    "RelatingObject": self.settings["relating_object"],
+                }
+            )
+        return is_decomposed_by
+
+    def get_is_decomposed_by(self):
+        for rel in self.settings["relating_object"].IsDecomposedBy:
+            if rel.is_a("IfcRelAggregates"):
+                return rel
@@ -7,14 +7,67 @@ import ifcopenshell.util.representation
 class Usecase:
     def __init__(self, file, **settings):
         self.file = file
-        self.settings = {"product": None, "type": "IfcMaterial", "material": None}
+        self.settings = {"product": None, "products": None, "type": "IfcMaterial", "material": None}
         for key, value in settings.items():
             self.settings[key] = value
 
     def execute(self):
+        if self.settings["products"] is not None:
+            return self.execute_batch()
         material = ifcopenshell.util.element.get_material(self.settings["product"])
         if material:
             ifcopenshell.api.run("material.unassign_material", self.file, product=self.settings["product"])
+        return self.assign_material()
+
+    def execute_batch(self):
+        # Existing associations are rewritten once per relationship rather
+        # than once per product. A material is shared by a single association
+        # of all products. Like individual assignments, material sets and
+        # usages are created for each product, so a list of associations is
+        # returned for those.
+        products = list(dict.fromkeys(self.settings["products"]))
+        if self.settings["type"] == "IfcMaterial":
+            rel = self.get_rel_associates_material(self.settings["material"])
+            if rel:
+                assigned_products = set(rel.RelatedObjects)
+                products = [p for p in products if p not in assigned_products]
+            if not products:
+                return rel
+
+        self.unassign_materials(products)
+
+        if self.settings["type"] == "IfcMaterial":
+            rel = self.get_rel_associates_material(self.settings["material"])
+            if not rel:
+                return self.create_material_association(self.settings["material"], products)
+            rel.RelatedObjects = list(rel.RelatedObjects) + products
+            return rel
+        rels = []
+        for product in products:
+            self.settings["product"] = product
+            rels.append(self.assign_material())
+        return rels
+
+    def unassign_materials(self, products):
+        old_rels = {}
+        for product in products:
+            if product.is_a("IfcTypeObject"):
+                if ifcopenshell.util.element.get_material(product):
+                    ifcopenshell.api.run("material.unassign_material", self.file, product=product)
+                continue
+            for rel in product.HasAssociations:
+                if rel.is_a("IfcRelAssociatesMaterial"):
+                    old_rels.setdefault(rel, set()).add(product)
+        for rel, removed_products in old_rels.items():
+            related_objects = [o for o in rel.RelatedObjects if o not in removed_products]
+            if related_objects:
+                rel.RelatedObjects = related_objects
+                continue
+            if rel.RelatingMaterial.is_a() in ["IfcMaterialLayerSetUsage", "IfcMaterialProfileSetUsage"]:
+                self.file.remove(rel.RelatingMaterial)
+            self.file.remove(rel)
+
+    def assign_material(self):
         if self.settings["type"] == "IfcMaterial":
             return self.assign_ifc_material()
         elif self.settings["type"] == "IfcMaterialConstituentSet":
@@ -95,12 +148,12 @@ class Usecase:
         rel.RelatedObjects = related_objects
         return rel
 
-    def create_material_association(self, relating_material):
+    def create_material_association(self, relating_material, related_objects=None):
         return self.file.create_entity(
             "IfcRelAssociatesMaterial",
             **{
                 "GlobalId": ifcopenshell.guid.new(),
-                "RelatedObjects": [self.settings["product"]],
+                "RelatedObjects": related_objects or [self.settings["product"]],
                 "RelatingMaterial": relating_material,
             }
         )
@@ -33,13 +33,6 @@ class Usecase:
         )
 
     def get_user(self):
-        for element in self.file.by_type("IfcPersonAndOrganization"):
-            if (
-                element.ThePerson == self.settings["person"]
-                and element.TheOrganization == self.settings["organisation"]
-            ):
-                return element
-        return self.file.create_entity(
-            "IfcPersonAndOrganization",
-            **{"ThePerson": self.settings["person"], "TheOrganization": self.settings["organisation"]},
+        return ifcopenshell.api.owner.settings.get_person_and_organisation(
+            self.file, self.settings["person"], self.settings["organisation"]
         )
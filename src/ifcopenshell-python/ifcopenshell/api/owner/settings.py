@@ -1,5 +1,9 @@
+import weakref
+
 # Note: it is the intent for you to override these with your own functions
-users = {}
+# Users are cached per file as a mapping of person and organisation ids to the
+# id of their IfcPersonAndOrganization, and are verified on every lookup.
+users = weakref.WeakKeyDictionary()
 
 
 def get_person(ifc):
@@ -22,13 +26,37 @@ def get_user(ifc):
     organisation = get_organisation(ifc)
     if not person or not organisation:
         return
-    key = f"{person.id()}-{organisation.id()}"
-    user = users.get(key)
-    if not user:
-        for element in ifc.by_type("IfcPersonAndOrganization"):
-            if element.ThePerson == person and element.TheOrganization == organisation:
-                users[key] = element
-                user = element
-        if not user:
-            return ifc.create_entity("IfcPersonAndOrganization", ThePerson=person, TheOrganization=organisation)
+    return get_person_and_organisation(ifc, person, organisation)
+
+
+def get_person_and_organisation(ifc, person, organisation):
+    key = (person.id() if person else None, organisation.id() if organisation else None)
+    file_users = users.setdefault(ifc, {})
+    user_id = file_users.get(key)
+    if user_id is not None:
+        try:
+            user = ifc.by_id(user_id)
+            if (
+                user.is_a("IfcPersonAndOrganization")
+                and user.ThePerson == person
+                and user.TheOrganization == organisation
+            ):
+                return user
+        except RuntimeError:
+            pass
+        del file_users[key]
+    for element in ifc.by_type("IfcPersonAndOrganization"):
+        if element.ThePerson == person and element.TheOrganization == organisation:
+            file_users[key] = element.id()
+            return element
+    user = ifc.create_entity("IfcPersonAndOrganization", ThePerson=person, TheOrganization=organisation)
+    file_users[key] = user.id()
     return user
+
+
+def clear_cache(ifc=None):
+    """Forget cached users, either of a single file or of all files"""
+    if ifc is None:
+        users.clear()
+    else:
+        users.pop(ifc, None)
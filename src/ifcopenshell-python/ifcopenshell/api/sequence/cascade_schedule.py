@@ -12,6 +12,7 @@ class Usecase:
 
     def execute(self):
         self.calendar_cache = {}
+        self.working_day_indices = {}
         self.cascade_task(self.settings["task"], is_first_task=True)
 
     def cascade_task(self, task, is_first_task=False):
@@ -148,11 +149,22 @@ class Usecase:
             self.calendar_cache[task.id()] = ifcopenshell.util.sequence.derive_calendar(task)
         return self.calendar_cache[task.id()]
 
+    def get_working_day_index(self, calendar, start):
+        # Indices are shared by all cascaded tasks which use the same calendar
+        if calendar.id() not in self.working_day_indices:
+            self.working_day_indices[calendar.id()] = ifcopenshell.util.sequence.WorkingDayIndex(calendar, start=start)
+        return self.working_day_indices[calendar.id()]
+
     def offset_date(self, date, days, duration_type, calendar):
-        return datetime.datetime.combine(
-            ifcopenshell.util.sequence.get_finish_date(date, datetime.timedelta(days=days), duration_type, calendar),
-            datetime.datetime.min.time(),
-        )
+        if calendar:
+            finish = self.get_working_day_index(calendar, date).get_finish_date(
+                date, datetime.timedelta(days=days), duration_type
+            )
+        else:
+            finish = ifcopenshell.util.sequence.get_finish_date(
+                date, datetime.timedelta(days=days), duration_type, calendar
+            )
+        return datetime.datetime.combine(finish, datetime.datetime.min.time())
 
     def get_task_time_attribute(self, task, attribute):
         if task.TaskTime:
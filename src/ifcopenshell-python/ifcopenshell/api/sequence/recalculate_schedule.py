@@ -1,51 +1,208 @@
+import weakref
 import datetime
 import networkx as nx
 import ifcopenshell.api
 import ifcopenshell.util.date
 import ifcopenshell.util.sequence
 
+# Schedule networks kept between incremental recalculations, by file and work schedule id
+networks = weakref.WeakKeyDictionary()
+
+# Usecases which change the duration or sequences of the tasks in their settings
+task_usecases = (
+    "sequence.edit_task_time",
+    "sequence.assign_sequence",
+    "sequence.unassign_sequence",
+    "sequence.edit_sequence",
+    "sequence.assign_lag_time",
+    "sequence.unassign_lag_time",
+    "sequence.edit_lag_time",
+)
+
+# Usecases which change the structure of schedules or their calendars
+structure_usecases = (
+    "sequence.add_task",
+    "sequence.remove_task",
+    "sequence.add_task_time",
+    "sequence.add_work_time",
+    "sequence.edit_work_time",
+    "sequence.remove_work_time",
+    "sequence.assign_recurrence_pattern",
+    "sequence.edit_recurrence_pattern",
+    "sequence.unassign_recurrence_pattern",
+    "sequence.edit_work_calendar",
+    "sequence.remove_work_calendar",
+    "control.assign_control",
+    "control.unassign_control",
+    "nest.assign_object",
+    "nest.unassign_object",
+)
+
+
+class ScheduleNetwork:
+    def __init__(self, g, start_dates, working_day_indices):
+        self.g = g
+        self.start_dates = start_dates
+        self.working_day_indices = working_day_indices
+        self.dirty_tasks = set()
+        self.is_valid = True
+        self.is_updating = False
+
+
+def get_edited_tasks(usecase_path, ifc_file, settings):
+    if usecase_path == "sequence.edit_task_time":
+        return [e for e in ifc_file.get_inverse(settings["task_time"]) if e.is_a("IfcTask")]
+    elif usecase_path in ("sequence.assign_sequence", "sequence.unassign_sequence"):
+        return [settings["relating_process"], settings["related_process"]]
+    elif usecase_path == "sequence.edit_lag_time":
+        rels = [e for e in ifc_file.get_inverse(settings["lag_time"]) if e.is_a("IfcRelSequence")]
+        return [t for rel in rels for t in (rel.RelatingProcess, rel.RelatedProcess)]
+    rel = settings["rel_sequence"]
+    return [rel.RelatingProcess, rel.RelatedProcess]
+
+
+def on_task_usecase(usecase_path, ifc_file, settings):
+    schedule_networks = networks.get(ifc_file)
+    if not schedule_networks:
+        return
+    task_ids = [t.id() for t in get_edited_tasks(usecase_path, ifc_file, settings)]
+    for network in schedule_networks.values():
+        if not network.is_updating:
+            network.dirty_tasks.update(task_ids)
+
+
+def on_structure_usecase(usecase_path, ifc_file, settings):
+    for network in networks.get(ifc_file, {}).values():
+        network.is_valid = False
+
+
+def add_listeners():
+    for usecase_path in task_usecases:
+        ifcopenshell.api.add_post_listener(usecase_path, "recalculate_schedule", on_task_usecase)
+    for usecase_path in structure_usecases:
+        ifcopenshell.api.add_post_listener(usecase_path, "recalculate_schedule", on_structure_usecase)
+
 
 class Usecase:
+    sequence_type_map = {
+        None: "FS",
+        "START_START": "SS",
+        "START_FINISH": "SF",
+        "FINISH_START": "FS",
+        "FINISH_FINISH": "FF",
+        "USERDEFINED": "FS",
+        "NOTDEFINED": "FS",
+    }
+
     def __init__(self, file, **settings):
         self.file = file
-        self.settings = {"work_schedule": None}
+        self.settings = {"work_schedule": None, "is_incremental": False}
         for key, value in settings.items():
             self.settings[key] = value
 
     def execute(self):
         # The method implemented is the same as shown here:
         # https://www.youtube.com/watch?v=qTErIV6OqLg
-        self.start_dates = []
-        self.build_network_graph()
-
-        self.pending_nodes = set(self.g.nodes)
-        while self.pending_nodes:
-            remaining_nodes = set()
-            for pending_node in self.pending_nodes:
-                if not self.forward_pass(pending_node):
-                    remaining_nodes.add(pending_node)
-            self.pending_nodes = remaining_nodes
-
-        self.pending_nodes = set(self.g.nodes)
-        while self.pending_nodes:
-            remaining_nodes = set()
-            for pending_node in self.pending_nodes:
-                if not self.backward_pass(pending_node):
-                    remaining_nodes.add(pending_node)
-            self.pending_nodes = remaining_nodes
-
-        self.update_task_times()
+        # Nodes are calculated once each in topological order. Incremental
+        # recalculations reuse the network of the previous calculation and
+        # only recalculate the tasks edited through the API since then, and
+        # the tasks whose dates depend on them.
+        network = None
+        if self.settings["is_incremental"]:
+            # Listeners may have been removed since the last run, such as by remove_all_listeners
+            add_listeners()
+            network = networks.get(self.file, {}).get(self.settings["work_schedule"].id())
+
+        if network is not None and network.is_valid:
+            self.g = network.g
+            self.start_dates = network.start_dates
+            self.working_day_indices = network.working_day_indices
+            affected_nodes = self.update_network_graph(network.dirty_tasks)
+        else:
+            self.start_dates = {}
+            self.working_day_indices = {}
+            self.build_network_graph()
+            affected_nodes = None
+            if self.settings["is_incremental"]:
+                network = ScheduleNetwork(self.g, self.start_dates, self.working_day_indices)
+                networks.setdefault(self.file, {})[self.settings["work_schedule"].id()] = network
+
+        changed_nodes = self.calculate(affected_nodes)
+
+        if network is None:
+            self.update_task_times(changed_nodes)
+            return
+        network.dirty_tasks = set()
+        network.is_updating = True
+        try:
+            self.update_task_times(changed_nodes)
+        finally:
+            network.is_updating = False
+
+    def update_network_graph(self, task_ids):
+        """Re-read the nodes of edited tasks and return the nodes to recalculate
+
+        The nodes to recalculate are the edited tasks and their successors
+        before and after the edit, including the finish node, as their
+        predecessors have changed.
+        """
+        self.edges = []
+        task_ids = [t for t in task_ids if t in self.g]
+        affected_nodes = set(task_ids)
+        for task_id in task_ids:
+            affected_nodes.update(self.g.successors(task_id))
+            task = self.file.by_id(task_id)
+            self.g.remove_edges_from(list(self.g.in_edges(task_id)))
+            if self.g.has_edge(task_id, "finish"):
+                self.g.remove_edge(task_id, "finish")
+            self.start_dates.pop(task_id, None)
+            self.add_node(task)
+        self.g.add_edges_from(self.edges)
+        for task_id in task_ids:
+            affected_nodes.update(self.g.successors(task_id))
+        return affected_nodes
+
+    def calculate(self, affected_nodes=None):
+        """Run the forward and backward passes and return the nodes whose dates changed
+
+        :param affected_nodes: The nodes to recalculate along with everything
+            depending on them, or None to recalculate all nodes
+        """
+        order = list(nx.topological_sort(self.g))
+        changed_nodes = set()
+        forward_nodes = backward_nodes = None
+        if affected_nodes is not None:
+            forward_nodes = set(affected_nodes) | {"start"}
+            backward_nodes = set(affected_nodes)
+
+        for node in order:
+            if forward_nodes is not None and node not in forward_nodes:
+                continue
+            data = self.g.nodes[node]
+            previous = (data.pop("early_start", None), data.pop("early_finish", None))
+            self.forward_pass(node)
+            if (data["early_start"], data["early_finish"]) != previous:
+                changed_nodes.add(node)
+                if forward_nodes is not None:
+                    forward_nodes.update(self.g.successors(node))
+                    # Free floats depend on the early dates of successors
+                    backward_nodes.add(node)
+                    backward_nodes.update(self.g.predecessors(node))
+
+        late_keys = ("late_start", "late_finish", "total_float", "free_float")
+        for node in reversed(order):
+            if backward_nodes is not None and node not in backward_nodes:
+                continue
+            data = self.g.nodes[node]
+            previous = tuple(data.pop(key, None) for key in late_keys)
+            self.backward_pass(node)
+            if tuple(data[key] for key in late_keys) != previous:
+                changed_nodes.add(node)
+                if backward_nodes is not None:
+                    backward_nodes.update(self.g.predecessors(node))
+        return changed_nodes
 
     def build_network_graph(self):
-        self.sequence_type_map = {
-            None: "FS",
-            "START_START": "SS",
-            "START_FINISH": "SF",
-            "FINISH_START": "FS",
-            "FINISH_FINISH": "FF",
-            "USERDEFINED": "FS",
-            "NOTDEFINED": "FS",
-        }
         self.g = nx.DiGraph()
         self.edges = []
         self.g.add_node("start", duration=0, duration_type="ELAPSEDTIME", calendar=None)
@@ -83,9 +240,11 @@ class Usecase:
                     rel.RelatingProcess.id(),
                     rel.RelatedProcess.id(),
                     {
-                        "lag_time": 0
-                        if not rel.TimeLag
-                        else ifcopenshell.util.date.ifc2datetime(rel.TimeLag.LagValue.wrappedValue).days,
+                        "lag_time": (
+                            0
+                            if not rel.TimeLag
+                            else ifcopenshell.util.date.ifc2datetime(rel.TimeLag.LagValue.wrappedValue).days
+                        ),
                         "type": self.sequence_type_map[rel.SequenceType],
                     },
                 )
@@ -100,12 +259,12 @@ class Usecase:
         ):
             self.edges.append(("start", task.id(), {"lag_time": 0, "type": "FS"}))
             if task.TaskTime and task.TaskTime.ScheduleStart:
-                self.start_dates.append(ifcopenshell.util.date.ifc2datetime(task.TaskTime.ScheduleStart))
+                self.start_dates[task.id()] = ifcopenshell.util.date.ifc2datetime(task.TaskTime.ScheduleStart)
         if not successor_types or ("FINISH_START" not in successor_types and "FINISH_FINISH" not in successor_types):
             self.edges.append((task.id(), "finish", {"lag_time": 0, "type": "FS"}))
 
-    def update_task_times(self):
-        for ifc_definition_id in self.g.nodes:
+    def update_task_times(self, nodes):
+        for ifc_definition_id in nodes:
             data = self.g.nodes[ifc_definition_id]
             if not data["duration"]:
                 continue
@@ -124,18 +283,34 @@ class Usecase:
                 },
             )
 
+    def get_working_day_index(self, calendar):
+        # Indices are shared by all tasks of the schedule which use the same calendar
+        if calendar.id() not in self.working_day_indices:
+            start = min(self.start_dates.values()) if self.start_dates else None
+            self.working_day_indices[calendar.id()] = ifcopenshell.util.sequence.WorkingDayIndex(calendar, start=start)
+        return self.working_day_indices[calendar.id()]
+
     def offset_date(self, date, days, node):
+        if node["calendar"]:
+            return self.get_working_day_index(node["calendar"]).get_finish_date(
+                date, datetime.timedelta(days=days), node["duration_type"]
+            )
         return ifcopenshell.util.sequence.get_finish_date(
             date, datetime.timedelta(days=days), node["duration_type"], node["calendar"]
         )
 
+    def count_working_days(self, start, finish, calendar):
+        if calendar:
+            return self.get_working_day_index(calendar).count_working_days(start, finish)
+        return ifcopenshell.util.sequence.count_working_days(start, finish, calendar)
+
     def forward_pass(self, node):
         successors = self.g.successors(node)
         predecessors = list(self.g.predecessors(node))
         data = self.g.nodes[node]
 
         if node == "start":
-            data["early_start"] = min(self.start_dates)
+            data["early_start"] = min(self.start_dates.values())
         else:
             finishes = []
             starts = []
@@ -290,9 +465,7 @@ class Usecase:
 
         if data["duration_type"] == "WORKTIME":
             data["total_float"] = datetime.timedelta(
-                days=ifcopenshell.util.sequence.count_working_days(
-                    data["early_finish"], data["late_finish"], data["calendar"]
-                )
+                days=self.count_working_days(data["early_finish"], data["late_finish"], data["calendar"])
             )
         else:
             data["total_float"] = data["late_finish"] - data["early_finish"]
@@ -313,8 +486,6 @@ class Usecase:
             )
         if predecessor_data["duration_type"] == "WORKTIME":
             return datetime.timedelta(
-                days=ifcopenshell.util.sequence.count_working_days(
-                    predecessor_date, min_successor_date, predecessor_data["calendar"]
-                )
+                days=self.count_working_days(predecessor_date, min_successor_date, predecessor_data["calendar"])
             )
         return min_successor_date - predecessor_date
@@ -8,12 +8,16 @@ class Usecase:
         self.file = file
         self.settings = {
             "product": None,
+            "products": None,
             "relating_structure": None,
         }
         for key, value in settings.items():
             self.settings[key] = value
 
     def execute(self):
+        if self.settings["products"] is not None:
+            return self.execute_batch()
+
         contained_in_structure = self.settings["product"].ContainedInStructure
         contains_elements = self.settings["relating_structure"].ContainsElements
 
@@ -45,11 +49,59 @@ class Usecase:
                 }
             )
 
-        if getattr(self.settings["product"], "ObjectPlacement", None):
+        self.update_placement(self.settings["product"])
+
+    def execute_batch(self):
+        # Products are grouped by their previous containment so that every
+        # relationship is rewritten once, rather than once per product.
+        contains_elements = self.settings["relating_structure"].ContainsElements
+        rel = contains_elements[0] if contains_elements else None
+
+        products = []
+        old_rels = {}
+        for product in dict.fromkeys(self.settings["products"]):
+            contained_in_structure = product.ContainedInStructure
+            if contained_in_structure:
+                if contained_in_structure[0] == rel:
+                    continue
+                old_rels.setdefault(contained_in_structure[0], set()).add(product)
+            products.append(product)
+
+        if not products:
+            return rel
+
+        for old_rel, removed_products in old_rels.items():
+            related_elements = [e for e in old_rel.RelatedElements if e not in removed_products]
+            if related_elements:
+                old_rel.RelatedElements = related_elements
+                ifcopenshell.api.run("owner.update_owner_history", self.file, **{"element": old_rel})
+            else:
+                self.file.remove(old_rel)
+
+        if rel:
+            rel.RelatedElements = list(rel.RelatedElements) + products
+            ifcopenshell.api.run("owner.update_owner_history", self.file, **{"element": rel})
+        else:
+            rel = self.file.create_entity(
+                "IfcRelContainedInSpatialStructure",
+                **{
+                    "GlobalId": ifcopenshell.guid.new(),
+                    "OwnerHistory": ifcopenshell.api.run("owner.create_owner_history", self.file),
+                    "RelatedElements": products,
+                    "RelatingStructure": self.settings["relating_structure"],
+                }
+            )
+
+        for product in products:
+            self.update_placement(product)
+        return rel
+
+    def update_placement(self, product):
+        if getattr(product, "ObjectPlacement", None):
             ifcopenshell.api.run(
                 "geometry.edit_object_placement",
                 self.file,
-                product=self.settings["product"],
-                matrix=ifcopenshell.util.placement.get_local_placement(self.settings["product"].ObjectPlacement),
+                product=product,
+                matrix=ifcopenshell.util.placement.get_local_placement(product.ObjectPlacement),
                 is_si=False,
             )
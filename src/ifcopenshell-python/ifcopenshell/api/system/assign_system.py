@@ -7,24 +7,32 @@ class Usecase:
         self.file = file
         self.settings = {
             "product": None,
+            "products": None,
             "system": None,
         }
         for key, value in settings.items():
             self.settings[key] = value
 
     def execute(self):
+        if self.settings["products"] is not None:
+            products = list(dict.fromkeys(self.settings["products"]))
+        else:
+            products = [self.settings["product"]]
+        if not products:
+            return
+
         if not self.settings["system"].IsGroupedBy:
             return self.file.create_entity(
                 "IfcRelAssignsToGroup",
                 **{
                     "GlobalId": ifcopenshell.guid.new(),
                     "OwnerHistory": ifcopenshell.api.run("owner.create_owner_history", self.file),
-                    "RelatedObjects": [self.settings["product"]],
+                    "RelatedObjects": products,
                     "RelatingGroup": self.settings["system"],
                 }
             )
         rel = self.settings["system"].IsGroupedBy[0]
         related_objects = set(rel.RelatedObjects) or set()
-        related_objects.add(self.settings["product"])
+        related_objects.update(products)
         rel.RelatedObjects = list(related_objects)
         ifcopenshell.api.run("owner.update_owner_history", self.file, **{"element": rel})
@@ -8,23 +8,18 @@ class Usecase:
         self.file = file
         self.settings = {
             "related_object": None,
+            "related_objects": None,
             "relating_type": None,
         }
         for key, value in settings.items():
             self.settings[key] = value
 
     def execute(self):
-        if self.file.schema == "IFC2X3":
-            is_typed_by = None
-            is_defined_by = self.settings["related_object"].IsDefinedBy
-            for rel in is_defined_by:
-                if rel.is_a("IfcRelDefinesByType"):
-                    is_typed_by = [rel]
-                    break
-            types = self.settings["relating_type"].ObjectTypeOf
-        else:
-            is_typed_by = self.settings["related_object"].IsTypedBy
-            types = self.settings["relating_type"].Types
+        if self.settings["related_objects"] is not None:
+            return self.execute_batch()
+
+        is_typed_by = self.get_is_typed_by(self.settings["related_object"])
+        types = self.get_types()
 
         if types and is_typed_by == types:
             return
@@ -54,21 +49,80 @@ class Usecase:
                 }
             )
 
-        self.map_representations()
-        self.map_material_usages()
+        self.map_representations(self.settings["related_object"])
+        self.map_material_usages(self.settings["related_object"])
+
+    def execute_batch(self):
+        # Objects are grouped by their previous type relationship so that
+        # every relationship is rewritten once, rather than once per object.
+        types = self.get_types()
+        rel = types[0] if types else None
+
+        related_objects = []
+        old_rels = {}
+        for related_object in dict.fromkeys(self.settings["related_objects"]):
+            is_typed_by = self.get_is_typed_by(related_object)
+            if is_typed_by:
+                if is_typed_by[0] == rel:
+                    continue
+                old_rels.setdefault(is_typed_by[0], set()).add(related_object)
+            related_objects.append(related_object)
+
+        if not related_objects:
+            return rel
+
+        for old_rel, removed_objects in old_rels.items():
+            remaining_objects = [o for o in old_rel.RelatedObjects if o not in removed_objects]
+            if remaining_objects:
+                old_rel.RelatedObjects = remaining_objects
+                ifcopenshell.api.run("owner.update_owner_history", self.file, **{"element": old_rel})
+            else:
+                self.file.remove(old_rel)
+
+        if rel:
+            rel.RelatedObjects = list(rel.RelatedObjects) + related_objects
+            ifcopenshell.api.run("owner.update_owner_history", self.file, **{"element": rel})
+        else:
+            rel = self.file.create_entity(
+                "IfcRelDefinesByType",
+                **{
+                    "GlobalId": ifcopenshell.guid.new(),
+                    "OwnerHistory": ifcopenshell.api.run("owner.create_owner_history", self.file),
+                    "RelatedObjects": related_objects,
+                    "RelatingType": self.settings["relating_type"],
+                }
+            )
+
+        for related_object in related_objects:
+            self.map_representations(related_object)
+            self.map_material_usages(related_object)
+        return rel
+
+    def get_is_typed_by(self, related_object):
+        if self.file.schema == "IFC2X3":
+            for rel in related_object.IsDefinedBy:
+                if rel.is_a("IfcRelDefinesByType"):
+                    return [rel]
+            return None
+        return related_object.IsTypedBy
+
+    def get_types(self):
+        if self.file.schema == "IFC2X3":
+            return self.settings["relating_type"].ObjectTypeOf
+        return self.settings["relating_type"].Types
 
-    def map_representations(self):
+    def map_representations(self, related_object):
         if not self.settings["relating_type"].RepresentationMaps:
             return
         representations = []
-        if self.settings["related_object"].Representation:
-            representations = self.settings["related_object"].Representation.Representations
+        if related_object.Representation:
+            representations = related_object.Representation.Representations
         for representation in representations:
             # TODO: check if this is right? Surely this can be a single usecase?
             ifcopenshell.api.run(
                 "geometry.unassign_representation",
                 self.file,
-                **{"product": self.settings["related_object"], "representation": representation}
+                **{"product": related_object, "representation": representation}
             )
             ifcopenshell.api.run("geometry.remove_representation", self.file, **{"representation": representation})
         for representation_map in self.settings["relating_type"].RepresentationMaps:
@@ -79,10 +133,10 @@ class Usecase:
             ifcopenshell.api.run(
                 "geometry.assign_representation",
                 self.file,
-                **{"product": self.settings["related_object"], "representation": mapped_representation}
+                **{"product": related_object, "representation": mapped_representation}
             )
 
-    def map_material_usages(self):
+    def map_material_usages(self, related_object):
         type_material = ifcopenshell.util.element.get_material(self.settings["relating_type"])
         if not type_material:
             return
@@ -90,13 +144,13 @@ class Usecase:
             ifcopenshell.api.run(
                 "material.assign_material",
                 self.file,
-                product=self.settings["related_object"],
+                product=related_object,
                 type="IfcMaterialLayerSetUsage",
             )
         elif type_material.is_a("IfcMaterialProfileSet"):
             ifcopenshell.api.run(
                 "material.assign_material",
                 self.file,
-                product=self.settings["related_object"],
+                product=related_object,
                 type="IfcMaterialProfileSetUsage",
             )
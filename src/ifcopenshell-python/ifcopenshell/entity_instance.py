@@ -33,6 +33,36 @@ except ImportError as e:
     logging = type("logger", (object,), {"exception": staticmethod(lambda s: print(s))})
 
 
+INVALID, FORWARD, INVERSE = range(3)
+
+# Maps "<schema>.<entity>" to a dictionary of attribute name to a tuple of
+# (attribute category, attribute index). Populated for a whole schema the
+# first time an instance of that schema is accessed.
+attribute_lookup = {}
+
+
+def build_attribute_lookup(schema_name):
+    schema = ifcopenshell_wrapper.schema_by_name(schema_name)
+    for declaration in schema.entities():
+        attributes = {}
+        for index, attribute in enumerate(declaration.all_attributes()):
+            attributes[attribute.name()] = (FORWARD, index)
+        for attribute in declaration.all_inverse_attributes():
+            attributes[attribute.name()] = (INVERSE, None)
+        attribute_lookup["%s.%s" % (schema_name, declaration.name())] = attributes
+    for declaration in schema.type_declarations():
+        attribute_lookup["%s.%s" % (schema_name, declaration.name())] = {"wrappedValue": (FORWARD, 0)}
+
+
+def get_attribute_lookup(wrapped_data):
+    key = wrapped_data.is_a(True)
+    try:
+        return attribute_lookup[key]
+    except KeyError:
+        build_attribute_lookup(key.split(".")[0])
+        return attribute_lookup.setdefault(key, {})
+
+
 class entity_instance(object):
     """This is the base Python class for all IFC objects.
 
@@ -48,6 +78,8 @@ class entity_instance(object):
         >>> #423=IfcProductDefinitionShape($,$,(#409,#421))
     """
 
+    __slots__ = ("wrapped_data",)
+
     def __init__(self, e, file=None):
         if isinstance(e, tuple):
             e = ifcopenshell_wrapper.new_IfcBaseClass(*e)
@@ -55,12 +87,9 @@ class entity_instance(object):
         self.wrapped_data.file = file
 
     def __getattr__(self, name):
-        INVALID, FORWARD, INVERSE = range(3)
-        attr_cat = self.wrapped_data.get_attribute_category(name)
+        attr_cat, attr_idx = get_attribute_lookup(self.wrapped_data).get(name, (INVALID, None))
         if attr_cat == FORWARD:
-            return entity_instance.wrap_value(
-                self.wrapped_data.get_argument(self.wrapped_data.get_argument_index(name)), self.wrapped_data.file
-            )
+            return entity_instance.wrap_value(self.wrapped_data.get_argument(attr_idx), self.wrapped_data.file)
         elif attr_cat == INVERSE:
             return entity_instance.wrap_value(self.wrapped_data.get_inverse(name), self.wrapped_data.file)
         else:
@@ -77,10 +106,31 @@ class entity_instance(object):
         else:
             return value
 
+    @staticmethod
+    def wrap_instance(e, file):
+        """Wrap a native instance, reusing a previous wrapper if the file has a wrapper cache
+
+        :param e: The native instance
+        :type e: ifcopenshell.ifcopenshell_wrapper.entity_instance
+        :param file: The file the instance belongs to, if any
+        :type file: ifcopenshell.file.file
+        :rtype: ifcopenshell.entity_instance.entity_instance
+        """
+        cache = getattr(file, "wrapper_cache", None)
+        if cache is None:
+            return entity_instance(e, file)
+        id = e.id()
+        if not id:
+            return entity_instance(e, file)
+        inst = cache.get(id)
+        if inst is None:
+            inst = cache[id] = entity_instance(e, file)
+        return inst
+
     @staticmethod
     def wrap_value(v, file):
         def wrap(e):
-            return entity_instance(e, file)
+            return entity_instance.wrap_instance(e, file)
 
         def is_instance(e):
             return isinstance(e, ifcopenshell_wrapper.entity_instance)
@@ -117,7 +167,9 @@ class entity_instance(object):
         return self.wrapped_data.get_argument_name(attr_idx)
 
     def __setattr__(self, key, value):
-        index = self.wrapped_data.get_argument_index(key)
+        attr_cat, index = get_attribute_lookup(self.wrapped_data).get(key, (INVALID, None))
+        if attr_cat != FORWARD:
+            index = self.wrapped_data.get_argument_index(key)
         self[index] = value
 
     def __getitem__(self, key):
@@ -21,8 +21,10 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import marshal
 import numbers
 import functools
+import itertools
 import ifcopenshell.util.element
 
 from . import ifcopenshell_wrapper
@@ -37,137 +39,173 @@ except NameError:
 
 
 class Transaction:
+    """Journal of changes made to a file, used to undo and redo them.
+
+    Each operation is stored as a marshalled tuple of STEP ids, attribute
+    indices and packed attribute values rather than as nested dictionaries.
+    Entity references are packed as (Ellipsis, id) and non-entity instances
+    such as IfcLabel as (Ellipsis, type, value). Created elements only store
+    their id, their attributes are captured when the creation is rolled back.
+
+    Inverses of deleted elements are captured lazily in batch mode, where the
+    file only removes references to deleted elements on unbatch(). Outside of
+    batch mode references are removed immediately, so inverses have to be
+    captured before every deletion.
+    """
+
+    CREATE, EDIT, DELETE, BATCH_DELETE = range(4)
+
     def __init__(self, ifc_file):
         self.file = ifc_file
         self.operations = []
+        self.size = 0
         self.is_batched = False
         self.batch_delete_index = 0
-        self.batch_delete_ids = set()
-        self.batch_inverses = []
+        self.batch_delete_ids = {}
 
     def serialise_entity_instance(self, element):
-        info = element.get_info()
-        for key, value in info.items():
-            info[key] = self.serialise_value(element, value)
-        return info
+        return tuple(self.serialise_value(element, element[i]) for i in range(len(element)))
 
     def serialise_value(self, element, value):
         return element.walk(
             lambda v: isinstance(v, entity_instance),
-            lambda v: {"id": v.id()} if v.id() else {"type": v.is_a(), "value": v.wrappedValue},
+            lambda v: (Ellipsis, v.id()) if v.id() else (Ellipsis, v.is_a(), v.wrappedValue),
             value,
         )
 
     def unserialise_value(self, element, value):
-        return element.walk(
-            lambda v: isinstance(v, dict),
-            lambda v: self.file.by_id(v["id"]) if v.get("id") else self.file.create_entity(v["type"], v["value"]),
-            value,
-        )
+        if isinstance(value, tuple):
+            if value and value[0] is Ellipsis:
+                if len(value) == 2:
+                    return self.file.by_id(value[1])
+                return self.file.create_entity(value[1], value[2])
+            return tuple(self.unserialise_value(element, v) for v in value)
+        return value
+
+    def create_entity_instance(self, id, type, attributes):
+        e = self.file.create_entity(type, id=id)
+        for index, value in enumerate(attributes):
+            if value is None:
+                continue
+            try:
+                e[index] = self.unserialise_value(e, value)
+            except:
+                # Catch discrepancy where IfcOpenShell creates but doesn't allow editing of invalid values
+                pass
+        return e
+
+    def restore_inverses(self, inverses):
+        for inverse_id, index, value in inverses:
+            inverse = self.file.by_id(inverse_id)
+            inverse[index] = self.unserialise_value(inverse, value)
+
+    def append(self, operation):
+        packed = marshal.dumps(operation)
+        self.size += len(packed)
+        self.operations.append(packed)
 
     def batch(self):
         self.is_batched = True
         self.batch_delete_index = len(self.operations)
-        self.batch_delete_ids = set()
-        self.batch_inverses = []
+        self.batch_delete_ids = {}
 
     def unbatch(self):
-        for inverses in self.batch_inverses:
-            if inverses:
-                self.operations.insert(self.batch_delete_index, {"action": "batch_delete", "inverses": inverses})
+        # Deleted elements still exist until the file is unbatched, so their
+        # inverses are only captured now. References between deleted elements
+        # are left untouched by the file and are restored with the elements.
+        inverses = []
+        for element_id in self.batch_delete_ids:
+            element = self.file.by_id(element_id)
+            inverses.extend(self.get_element_inverses(element, exclude=self.batch_delete_ids))
+        if inverses:
+            packed = marshal.dumps((Transaction.BATCH_DELETE, tuple(inverses)))
+            self.size += len(packed)
+            self.operations.insert(self.batch_delete_index, packed)
         self.is_batched = False
         self.batch_delete_index = 0
-        self.batch_delete_ids = set()
-        self.batch_inverses = []
+        self.batch_delete_ids = {}
 
     def store_create(self, element):
         if element.id():
-            self.operations.append({"action": "create", "value": self.serialise_entity_instance(element)})
+            self.append((Transaction.CREATE, element.id(), element.is_a(), None))
 
     def store_edit(self, element, index, value):
-        self.operations.append(
-            {
-                "action": "edit",
-                "id": element.id(),
-                "index": index,
-                "old": self.serialise_value(element, element[index]),
-                "new": self.serialise_value(element, value),
-            }
+        self.append(
+            (
+                Transaction.EDIT,
+                element.id(),
+                index,
+                self.serialise_value(element, element[index]),
+                self.serialise_value(element, value),
+            )
         )
 
     def store_delete(self, element):
-        inverses = {}
+        inverses = ()
         if self.is_batched:
-            if element.id() not in self.batch_delete_ids:
-                self.batch_inverses.append(self.get_element_inverses(element))
-            self.batch_delete_ids.add(element.id())
+            self.batch_delete_ids[element.id()] = None
         else:
             inverses = self.get_element_inverses(element)
-        self.operations.append(
-            {"action": "delete", "inverses": inverses, "value": self.serialise_entity_instance(element)}
+        self.append(
+            (Transaction.DELETE, element.id(), element.is_a(), self.serialise_entity_instance(element), inverses)
         )
 
-    def get_element_inverses(self, element):
-        inverses = {}
+    def get_element_inverses(self, element, exclude=()):
+        inverses = []
         for inverse in self.file.get_inverse(element):
-            inverse_references = []
-            for i, attribute in enumerate(inverse):
+            if inverse.id() in exclude:
+                continue
+            for i in range(len(inverse)):
+                attribute = inverse[i]
                 if ifcopenshell.util.element.has_element_reference(attribute, element):
-                    inverse_references.append((i, self.serialise_value(inverse, attribute)))
-            inverses[inverse.id()] = inverse_references
-        return inverses
+                    inverses.append((inverse.id(), i, self.serialise_value(inverse, attribute)))
+        return tuple(inverses)
 
     def rollback(self):
-        for operation in self.operations[::-1]:
-            if operation["action"] == "create":
-                element = self.file.by_id(operation["value"]["id"])
+        # Changes made while replaying the journal are not journaled themselves
+        transaction, self.file.transaction = self.file.transaction, None
+        for i in range(len(self.operations) - 1, -1, -1):
+            operation = marshal.loads(self.operations[i])
+            action = operation[0]
+            if action == Transaction.CREATE:
+                element = self.file.by_id(operation[1])
+                # Attributes are only captured now, as they are needed to redo the creation
+                packed = marshal.dumps(operation[:3] + (self.serialise_entity_instance(element),))
+                self.size += len(packed) - len(self.operations[i])
+                self.operations[i] = packed
                 if hasattr(element, "GlobalId") and element.GlobalId is None:
                     # hack, otherwise ifcopenshell gets upset
                     element.GlobalId = "x"
                 self.file.remove(element)
-            elif operation["action"] == "edit":
-                element = self.file.by_id(operation["id"])
+            elif action == Transaction.EDIT:
+                element = self.file.by_id(operation[1])
                 try:
-                    element[operation["index"]] = self.unserialise_value(element, operation["old"])
+                    element[operation[2]] = self.unserialise_value(element, operation[3])
                 except:
                     # Catch discrepancy where IfcOpenShell creates but doesn't allow editing of invalid values
                     pass
-            elif operation["action"] == "delete":
-                e = self.file.create_entity(operation["value"]["type"], id=operation["value"]["id"])
-                for k, v in operation["value"].items():
-                    try:
-                        setattr(e, k, self.unserialise_value(e, v))
-                    except:
-                        # Catch discrepancy where IfcOpenShell creates but doesn't allow editing of invalid values
-                        pass
-                for inverse_id, data in operation["inverses"].items():
-                    inverse = self.file.by_id(inverse_id)
-                    for index, value in data:
-                        inverse[index] = self.unserialise_value(inverse, value)
-            elif operation["action"] == "batch_delete":
-                for inverse_id, data in operation["inverses"].items():
-                    inverse = self.file.by_id(inverse_id)
-                    for index, value in data:
-                        inverse[index] = self.unserialise_value(inverse, value)
+            elif action == Transaction.DELETE:
+                self.create_entity_instance(*operation[1:4])
+                self.restore_inverses(operation[4])
+            elif action == Transaction.BATCH_DELETE:
+                self.restore_inverses(operation[1])
+        self.file.transaction = transaction
 
     def commit(self):
-        for operation in self.operations:
-            if operation["action"] == "create":
-                e = self.file.create_entity(operation["value"]["type"], id=operation["value"]["id"])
-                for k, v in operation["value"].items():
-                    try:
-                        setattr(e, k, self.unserialise_value(e, v))
-                    except:
-                        # Catch discrepancy where IfcOpenShell creates but doesn't allow editing of invalid values
-                        pass
-            elif operation["action"] == "edit":
-                element = self.file.by_id(operation["id"])
-                element[operation["index"]] = self.unserialise_value(element, operation["new"])
-            elif operation["action"] == "delete":
-                element = self.file.by_id(operation["value"]["id"])
-                self.file.remove(element)
-            elif operation["action"] == "batch_delete":
+        transaction, self.file.transaction = self.file.transaction, None
+        for packed in self.operations:
+            operation = marshal.loads(packed)
+            action = operation[0]
+            if action == Transaction.CREATE:
+                self.create_entity_instance(*operation[1:4])
+            elif action == Transaction.EDIT:
+                element = self.file.by_id(operation[1])
+                element[operation[2]] = self.unserialise_value(element, operation[4])
+            elif action == Transaction.DELETE:
+                self.file.remove(self.file.by_id(operation[1]))
+            elif action == Transaction.BATCH_DELETE:
                 pass
+        self.file.transaction = transaction
 
 
 class file(object):
@@ -195,14 +233,49 @@ class file(object):
             args = map(ifcopenshell_wrapper.schema_by_name, args)
             self.wrapped_data = ifcopenshell_wrapper.file(*args)
         self.history_size = 64
+        self.history_memory_limit = None
         self.history = []
         self.future = []
         self.transaction = None
+        self.wrapper_cache = None
+
+    def set_wrapper_cache(self, enabled=True):
+        """Reuse a single entity_instance wrapper per STEP id.
+
+        When enabled, repeatedly accessing the same instance, for example via
+        by_type() or by following references, returns the same Python object
+        rather than allocating a new wrapper each time.
+
+        :param enabled: Whether or not to cache wrappers
+        :type enabled: bool
+        :rtype: None
+        """
+        self.wrapper_cache = {} if enabled else None
 
     def set_history_size(self, size):
         self.history_size = size
+        self.trim_history()
+
+    def set_history_memory_limit(self, limit):
+        """Limit the memory used by the undo history.
+
+        The oldest transactions are discarded once the total size of their
+        journals exceeds the limit.
+
+        :param limit: The maximum size in bytes, or None for no limit
+        :type limit: None|int
+        :rtype: None
+        """
+        self.history_memory_limit = limit
+        self.trim_history()
+
+    def trim_history(self):
         while len(self.history) > self.history_size:
             self.history.pop(0)
+        if self.history_memory_limit is not None:
+            size = sum(t.size for t in self.history)
+            while self.history and size > self.history_memory_limit:
+                size -= self.history.pop(0).size
 
     def begin_transaction(self):
         self.transaction = Transaction(self)
@@ -210,8 +283,7 @@ class file(object):
     def end_transaction(self):
         if self.transaction:
             self.history.append(self.transaction)
-            if len(self.history) > self.history_size:
-                self.history.pop(0)
+            self.trim_history()
             self.future = []
             self.transaction = None
 
@@ -290,6 +362,9 @@ class file(object):
         # the owner.
         e.wrapped_data.this.disown()
 
+        if self.wrapper_cache is not None:
+            self.wrapper_cache[e.id()] = e
+
         if self.transaction:
             self.transaction.store_create(e)
 
@@ -303,9 +378,11 @@ class file(object):
 
     def __getitem__(self, key):
         if isinstance(key, numbers.Integral):
-            return entity_instance(self.wrapped_data.by_id(key), self)
+            if self.wrapper_cache is not None and key in self.wrapper_cache:
+                return self.wrapper_cache[key]
+            return entity_instance.wrap_instance(self.wrapped_data.by_id(key), self)
         elif isinstance(key, basestring):
-            return entity_instance(self.wrapped_data.by_guid(str(key)), self)
+            return entity_instance.wrap_instance(self.wrapped_data.by_guid(str(key)), self)
 
     def by_id(self, id):
         """Return an IFC entity instance filtered by IFC ID.
@@ -334,7 +411,9 @@ class file(object):
         if self.transaction:
             max_id = self.wrapped_data.getMaxId()
         inst.wrapped_data.this.disown()
-        result = entity_instance(self.wrapped_data.add(inst.wrapped_data, -1 if _id is None else _id), self)
+        result = entity_instance.wrap_instance(
+            self.wrapped_data.add(inst.wrapped_data, -1 if _id is None else _id), self
+        )
         if self.transaction:
             added_elements = [e for e in self.traverse(result) if e.id() > max_id]
             [self.transaction.store_create(e) for e in reversed(added_elements)]
@@ -353,8 +432,77 @@ class file(object):
         :rtype: list
         """
         if include_subtypes:
-            return [entity_instance(e, self) for e in self.wrapped_data.by_type(type)]
-        return [entity_instance(e, self) for e in self.wrapped_data.by_type_excl_subtypes(type)]
+            return [entity_instance.wrap_instance(e, self) for e in self.wrapped_data.by_type(type)]
+        return [entity_instance.wrap_instance(e, self) for e in self.wrapped_data.by_type_excl_subtypes(type)]
+
+    def iter_by_type(self, type, include_subtypes=True, chunk_size=None):
+        """Lazily yield IFC objects filtered by IFC Type, wrapped with the entity_instance class.
+
+        Unlike by_type(), only the STEP ids of the matching instances are
+        retrieved upfront and instances are wrapped one at a time as they are
+        consumed, so that large files can be processed in bounded memory.
+
+        :param type: The case insensitive type of IFC class to return.
+        :type type: string
+        :param include_subtypes: Whether or not to return subtypes of the IFC class
+        :type include_subtypes: bool
+        :param chunk_size: If specified, yield lists of at most this many instances
+        :type chunk_size: None|int
+        :returns: A generator of ifcopenshell.entity_instance.entity_instance objects, or lists thereof
+        :rtype: generator
+
+        Example::
+
+            ifc_file = ifcopenshell.open(file_path)
+            for walls in ifc_file.iter_by_type("IfcWall", chunk_size=1000):
+                print(len(walls))
+        """
+        ids = self.wrapped_data.by_type_ids(type, include_subtypes)
+        return self.chunk((self[id] for id in ids), chunk_size)
+
+    def get_attributes(self, type, attributes, include_subtypes=True):
+        """Return attribute values of all instances of an IFC class as columns.
+
+        All values are read in a single native call, which is considerably
+        faster than accessing attributes on each wrapped entity_instance.
+        Columns are converted based on the attribute type: entity instance
+        references become int64 arrays of ids (0 for null), reals become
+        float64 arrays (nan for null), strings and enumerations become object
+        arrays and aggregates remain Python lists of tuples.
+
+        :param type: The case insensitive type of IFC class to read.
+        :type type: string
+        :param attributes: The names of the attributes to read
+        :type attributes: list
+        :param include_subtypes: Whether or not to include subtypes of the IFC class
+        :type include_subtypes: bool
+        :returns: A dictionary of "id" and each attribute name to its column
+        :rtype: dict
+
+        Example::
+
+            ifc_file = ifcopenshell.open(file_path)
+            columns = ifc_file.get_attributes("IfcWall", ["GlobalId", "Name", "ObjectPlacement"])
+            print(columns["id"], columns["Name"], columns["ObjectPlacement"])
+            >>> [122 156] ['Wall A' 'Wall B'] [101 101]
+        """
+        import numpy as np
+
+        ids, types, columns = ifcopenshell_wrapper.get_attributes_cpp(
+            self.wrapped_data, type, list(attributes), include_subtypes
+        )
+        results = {"id": np.array(ids, dtype=np.int64)}
+        for name, attr_type, column in zip(attributes, types, columns):
+            if attr_type == "ENTITY INSTANCE" and all(isinstance(v, numbers.Integral) or v is None for v in column):
+                column = np.array([0 if v is None else v for v in column], dtype=np.int64)
+            elif attr_type == "DOUBLE":
+                column = np.array(column, dtype=np.float64)
+            elif attr_type in ("INT", "BOOL") and None not in column:
+                column = np.array(column, dtype=np.int64 if attr_type == "INT" else bool)
+            elif not attr_type.startswith("AGGREGATE"):
+                column = np.array(column, dtype=object)
+            results[name] = column
+        return results
 
     def traverse(self, inst, max_levels=None, breadth_first=False):
         """Get a list of all referenced instances for a particular instance including itself
@@ -376,7 +524,35 @@ class file(object):
         else:
             fn = self.wrapped_data.traverse
 
-        return [entity_instance(e, self) for e in fn(inst.wrapped_data, max_levels)]
+        return [entity_instance.wrap_instance(e, self) for e in fn(inst.wrapped_data, max_levels)]
+
+    def iter_traverse(self, inst, max_levels=None, breadth_first=False, chunk_size=None):
+        """Lazily yield all referenced instances for a particular instance including itself
+
+        The traversal itself is performed natively, but instances are only
+        wrapped with the entity_instance class as they are consumed.
+
+        :param inst: The entity instance to get all sub instances
+        :type inst: ifcopenshell.entity_instance.entity_instance
+        :param max_levels: How far deep to recursively fetch sub instances. None or -1 means infinite.
+        :type max_levels: None|int
+        :param breadth_first: Whether to use breadth-first search, the default is depth-first.
+        :type max_levels: bool
+        :param chunk_size: If specified, yield lists of at most this many instances
+        :type chunk_size: None|int
+        :returns: A generator of ifcopenshell.entity_instance.entity_instance objects, or lists thereof
+        :rtype: generator
+        """
+        if max_levels is None:
+            max_levels = -1
+
+        if breadth_first:
+            fn = self.wrapped_data.traverse_breadth_first
+        else:
+            fn = self.wrapped_data.traverse
+
+        instances = fn(inst.wrapped_data, max_levels)
+        return self.chunk((entity_instance.wrap_instance(e, self) for e in instances), chunk_size)
 
     def get_inverse(self, inst):
         """Return a list of entities that reference this entity
@@ -386,7 +562,7 @@ class file(object):
         :returns: A list of ifcopenshell.entity_instance.entity_instance objects
         :rtype: list
         """
-        return [entity_instance(e, self) for e in self.wrapped_data.get_inverse(inst.wrapped_data)]
+        return [entity_instance.wrap_instance(e, self) for e in self.wrapped_data.get_inverse(inst.wrapped_data)]
 
     def remove(self, inst):
         """Deletes an IFC object in the file.
@@ -401,6 +577,8 @@ class file(object):
         """
         if self.transaction:
             self.transaction.store_delete(inst)
+        if self.wrapper_cache is not None:
+            self.wrapper_cache.pop(inst.id(), None)
         return self.wrapped_data.remove(inst.wrapped_data)
 
     def batch(self):
@@ -418,6 +596,21 @@ class file(object):
     def __iter__(self):
         return iter(self[id] for id in self.wrapped_data.entity_names())
 
+    @staticmethod
+    def chunk(iterable, chunk_size):
+        """Group an iterable of instances into lists of at most chunk_size
+
+        :param iterable: The instances to group
+        :type iterable: iterable
+        :param chunk_size: The maximum size of each list, or None to not group at all
+        :type chunk_size: None|int
+        :rtype: generator
+        """
+        iterator = iter(iterable)
+        if not chunk_size:
+            return iterator
+        return iter(lambda: list(itertools.islice(iterator, chunk_size)), [])
+
     @staticmethod
     def from_string(s):
         return file(ifcopenshell_wrapper.read(s))
@@ -46,3 +46,5 @@ if has_occ:
     from . import occ_utils as utils
 
 from .main import *
+from .cache import geometry_cache
+from .parallel import iterate_parallel
@@ -0,0 +1,209 @@
+###############################################################################
+#                                                                             #
+# This file is part of IfcOpenShell.                                          #
+#                                                                             #
+# IfcOpenShell is free software: you can redistribute it and/or modify        #
+# it under the terms of the Lesser GNU General Public License as published by #
+# the Free Software Foundation, either version 3.0 of the License, or         #
+# (at your option) any later version.                                         #
+#                                                                             #
+# IfcOpenShell is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the                #
+# Lesser GNU General Public License for more details.                         #
+#                                                                             #
+# You should have received a copy of the Lesser GNU General Public License    #
+# along with this program. If not, see <http://www.gnu.org/licenses/>.        #
+#                                                                             #
+###############################################################################
+
+import re
+import time
+import array
+import pickle
+import sqlite3
+import hashlib
+
+from types import SimpleNamespace
+
+from .. import ifcopenshell_wrapper
+
+
+class geometry_cache:
+    """Persistent, content-addressed cache of triangulated product geometry.
+
+    Entries are keyed by a hash of the iterator settings and of the instances
+    that determine the geometry of a product: its representation (including
+    styles), placement, openings and material. Instance ids are normalised
+    before hashing, so a renumbered but otherwise unchanged model still hits
+    the cache. When the total size of the entries exceeds max_size, the least
+    recently used entries are evicted.
+
+    Example::
+
+        cache = ifcopenshell.geom.geometry_cache("geometry.sqlite", max_size=2 * 1024**3)
+        for shape in ifcopenshell.geom.iterate(settings, ifc_file, cache=cache):
+            print(shape.guid, len(shape.geometry.verts))
+        print(cache.hits, cache.misses)
+    """
+
+    reference = re.compile(r"#(\d+)")
+
+    def __init__(self, path, max_size=None):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS shapes (key TEXT PRIMARY KEY, data BLOB, size INTEGER, accessed REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS shapes_accessed ON shapes (accessed)")
+        self.digests = {}
+        # The total size of the entries is kept up to date on every add() so
+        # that eviction does not need to scan the table.
+        self.size = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM shapes").fetchone()[0]
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def get_settings_key(self, settings):
+        return "%s %r" % (ifcopenshell_wrapper.version(), settings)
+
+    def get_digest(self, ifc_file, root):
+        if root.id() in self.digests:
+            return self.digests[root.id()]
+        instances = ifc_file.traverse(root)
+        for inst in list(instances):
+            if inst.is_a("IfcRepresentationItem"):
+                for styled_item in getattr(inst, "StyledByItem", ()):
+                    instances.extend(ifc_file.traverse(styled_item))
+        positions = {}
+        for inst in instances:
+            positions.setdefault(inst.id(), len(positions))
+        renumber = lambda m: "#%d" % positions.get(int(m.group(1)), -1)
+        h = hashlib.sha1()
+        for inst in instances:
+            h.update(self.reference.sub(renumber, repr(inst)).encode("utf-8"))
+        digest = self.digests[root.id()] = h.hexdigest()
+        return digest
+
+    def get_roots(self, product):
+        yield product.Representation
+        yield product.ObjectPlacement
+        for rel in getattr(product, "HasOpenings", ()):
+            yield rel.RelatedOpeningElement.Representation
+            yield rel.RelatedOpeningElement.ObjectPlacement
+        for rel in getattr(product, "HasAssociations", ()):
+            if rel.is_a("IfcRelAssociatesMaterial"):
+                yield rel.RelatingMaterial
+
+    def get_key(self, settings_key, product):
+        """Return the cache key of a product's geometry
+
+        :param settings_key: The value of get_settings_key() for the iterator settings
+        :type settings_key: string
+        :param product: The product to compute the key of
+        :type product: ifcopenshell.entity_instance.entity_instance
+        :rtype: string
+        """
+        ifc_file = product.wrapped_data.file
+        h = hashlib.sha1(settings_key.encode("utf-8"))
+        for root in self.get_roots(product):
+            h.update(b"$" if root is None else self.get_digest(ifc_file, root).encode("ascii"))
+        return h.hexdigest()
+
+    def get(self, key):
+        """Return the cached shape of a key, or None if it is not cached.
+
+        Products for which the iterator did not produce any geometry are
+        cached as well and are returned as False.
+        """
+        row = self.db.execute("SELECT data FROM shapes WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.db.execute("UPDATE shapes SET accessed = ? WHERE key = ?", (time.time(), key))
+        return self.unpack(row[0]) if row[0] else False
+
+    def add(self, key, shape):
+        """Store the shape produced for a key, or None if none was produced"""
+        data = self.pack(shape) if shape is not None else b""
+        row = self.db.execute("SELECT size FROM shapes WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self.size -= row[0]
+        self.db.execute(
+            "INSERT OR REPLACE INTO shapes VALUES (?, ?, ?, ?)", (key, sqlite3.Binary(data), len(data), time.time())
+        )
+        self.size += len(data)
+        self.evict()
+
+    def evict(self, batch_size=64):
+        """Remove the least recently used entries until the cache fits in max_size"""
+        if self.max_size is None:
+            return
+        while self.size > self.max_size:
+            rows = self.db.execute("SELECT key, size FROM shapes ORDER BY accessed LIMIT ?", (batch_size,)).fetchall()
+            if not rows:
+                self.size = 0
+                break
+            for key, entry_size in rows:
+                self.db.execute("DELETE FROM shapes WHERE key = ?", (key,))
+                self.size -= entry_size
+                if self.size <= self.max_size:
+                    break
+
+    @staticmethod
+    def pack(shape):
+        geometry = shape.geometry
+        return pickle.dumps(
+            {
+                "id": geometry.id,
+                "verts": array.array("d", geometry.verts).tobytes(),
+                "normals": array.array("d", geometry.normals).tobytes(),
+                "faces": array.array("i", geometry.faces).tobytes(),
+                "edges": array.array("i", geometry.edges).tobytes(),
+                "material_ids": array.array("i", geometry.material_ids).tobytes(),
+                "materials": [
+                    {
+                        "name": m.name,
+                        "has_diffuse": m.has_diffuse,
+                        "has_specular": m.has_specular,
+                        "has_transparency": m.has_transparency,
+                        "has_specularity": m.has_specularity,
+                        "diffuse": m.diffuse if m.has_diffuse else None,
+                        "specular": m.specular if m.has_specular else None,
+                        "transparency": m.transparency if m.has_transparency else None,
+                        "specularity": m.specularity if m.has_specularity else None,
+                    }
+                    for m in geometry.materials
+                ],
+                "matrix": tuple(shape.transformation.matrix.data),
+                "context": shape.context,
+                "parent_id": shape.parent_id,
+                "unique_id": shape.unique_id,
+            },
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+    @staticmethod
+    def unpack(data):
+        data = pickle.loads(data)
+        unpack_array = lambda typecode, b: tuple(array.array(typecode, b))
+        geometry = SimpleNamespace(
+            id=data["id"],
+            verts=unpack_array("d", data["verts"]),
+            normals=unpack_array("d", data["normals"]),
+            faces=unpack_array("i", data["faces"]),
+            edges=unpack_array("i", data["edges"]),
+            material_ids=unpack_array("i", data["material_ids"]),
+            materials=tuple(SimpleNamespace(**m) for m in data["materials"]),
+        )
+        return SimpleNamespace(
+            geometry=geometry,
+            transformation=SimpleNamespace(matrix=SimpleNamespace(data=data["matrix"])),
+            context=data["context"],
+            parent_id=data["parent_id"],
+            unique_id=data["unique_id"],
+        )
@@ -211,7 +211,11 @@ def create_shape(settings, inst, repr=None):
     )
 
 
-def iterate(settings, file_or_filename, num_threads=1, include=None, exclude=None):
+def iterate(settings, file_or_filename, num_threads=1, include=None, exclude=None, cache=None):
+    if cache is not None:
+        for shape in iterate_cached(settings, file_or_filename, num_threads, include, exclude, cache):
+            yield shape
+        return
     it = iterator(settings, file_or_filename, num_threads, include, exclude)
     if it.initialize():
         while True:
@@ -220,6 +224,62 @@ def iterate(settings, file_or_filename, num_threads=1, include=None, exclude=Non
                 break
 
 
+def iterate_cached(settings, file_or_filename, num_threads, include, exclude, cache):
+    """Iterate over shapes, only tessellating products not found in a geometry_cache
+
+    Cached shapes are yielded first, after which the native iterator is run
+    for the remaining products and its results are added to the cache.
+    Cached shapes are plain Python objects with the same attributes as the
+    triangulation elements returned by the native iterator.
+    """
+    if settings.get(settings.USE_BREP_DATA) or settings.get(settings.DISABLE_TRIANGULATION):
+        raise ValueError("A geometry cache can only be used for triangulated geometry")
+
+    if isinstance(file_or_filename, file):
+        ifc_file = file_or_filename
+    else:
+        import ifcopenshell
+
+        ifc_file = ifcopenshell.open(file_or_filename)
+
+    if include is not None:
+        products = list(include)
+    else:
+        products = ifc_file.by_type("IfcProduct")
+    if exclude is not None:
+        excluded = set(exclude)
+        products = [p for p in products if p not in excluded]
+
+    settings_key = cache.get_settings_key(settings)
+    cache.digests.clear()
+    keys = {}
+    for product in products:
+        if product.Representation is None:
+            continue
+        key = cache.get_key(settings_key, product)
+        shape = cache.get(key)
+        if shape is None:
+            keys[product.GlobalId] = (key, product)
+        elif shape:
+            shape.id = product.id()
+            shape.guid = product.GlobalId
+            shape.name = product.Name or ""
+            shape.type = product.is_a()
+            shape.product = product.wrapped_data
+            yield shape
+
+    if keys:
+        for shape in iterate(settings, ifc_file, num_threads, include=[p for k, p in keys.values()]):
+            key = keys.pop(shape.guid, None)
+            if key is not None:
+                cache.add(key[0], shape)
+            yield shape
+        # Products the iterator did not produce geometry for are cached too
+        for key, product in keys.values():
+            cache.add(key, None)
+    cache.db.commit()
+
+
 def make_shape_function(fn):
     def entity_instance_or_none(e):
         return None if e is None else entity_instance(e)
@@ -0,0 +1,211 @@
+###############################################################################
+#                                                                             #
+# This file is part of IfcOpenShell.                                          #
+#                                                                             #
+# IfcOpenShell is free software: you can redistribute it and/or modify        #
+# it under the terms of the Lesser GNU General Public License as published by #
+# the Free Software Foundation, either version 3.0 of the License, or         #
+# (at your option) any later version.                                         #
+#                                                                             #
+# IfcOpenShell is distributed in the hope that it will be useful,             #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of              #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the                #
+# Lesser GNU General Public License for more details.                         #
+#                                                                             #
+# You should have received a copy of the Lesser GNU General Public License    #
+# along with this program. If not, see <http://www.gnu.org/licenses/>.        #
+#                                                                             #
+###############################################################################
+
+import os
+import numbers
+import traceback
+import multiprocessing
+
+from queue import Empty
+from types import SimpleNamespace
+
+from . import main
+
+DONE, ERROR = "done", "error"
+# Seconds to wait for a result before checking whether the workers are still alive
+POLL_INTERVAL = 1.0
+
+
+def get_settings_values(settings):
+    values = {}
+    for name in dir(settings):
+        if name.isupper() and name not in {"NUM_SETTINGS", "USE_PYTHON_OPENCASCADE"}:
+            if isinstance(getattr(settings, name), numbers.Integral):
+                values[name] = settings.get(getattr(settings, name))
+    return values
+
+
+def serialise_shape(shape):
+    """Copy a triangulation element into a picklable object with NumPy buffers"""
+    import ifcopenshell.util.shape
+
+    geometry = shape.geometry
+    return SimpleNamespace(
+        id=shape.id,
+        guid=shape.guid,
+        name=shape.name,
+        type=shape.type,
+        context=shape.context,
+        parent_id=shape.parent_id,
+        unique_id=shape.unique_id,
+        transformation=SimpleNamespace(matrix=SimpleNamespace(data=tuple(shape.transformation.matrix.data))),
+        geometry=SimpleNamespace(
+            id=geometry.id,
+            verts=ifcopenshell.util.shape.get_vertices(geometry, copy=True).ravel(),
+            normals=ifcopenshell.util.shape.get_normals(geometry, copy=True).ravel(),
+            faces=ifcopenshell.util.shape.get_faces(geometry, copy=True).ravel(),
+            edges=ifcopenshell.util.shape.get_edges(geometry, copy=True).ravel(),
+            material_ids=ifcopenshell.util.shape.get_material_ids(geometry, copy=True),
+            materials=tuple(
+                SimpleNamespace(
+                    name=m.name,
+                    has_diffuse=m.has_diffuse,
+                    has_specular=m.has_specular,
+                    has_transparency=m.has_transparency,
+                    has_specularity=m.has_specularity,
+                    diffuse=m.diffuse if m.has_diffuse else None,
+                    specular=m.specular if m.has_specular else None,
+                    transparency=m.transparency if m.has_transparency else None,
+                    specularity=m.specularity if m.has_specularity else None,
+                )
+                for m in geometry.materials
+            ),
+        ),
+    )
+
+
+def process_shard(shard_index, filename, settings_values, guids, num_threads, queue):
+    import ifcopenshell
+
+    try:
+        ifc_file = ifcopenshell.open(filename)
+        indices = {}
+        products = []
+        for index, guid in guids:
+            indices[guid] = index
+            products.append(ifc_file.by_guid(guid))
+        if products:
+            settings = main.settings(**settings_values)
+            for shape in main.iterate(settings, ifc_file, num_threads, include=products):
+                queue.put((indices.get(shape.guid), serialise_shape(shape)))
+        queue.put((DONE, shard_index))
+    except Exception:
+        queue.put((ERROR, traceback.format_exc()))
+
+
+def iterate_parallel(
+    settings, filename, num_processes=None, include=None, exclude=None, ordered=False, num_threads=1, queue_size=256
+):
+    """Iterate over shapes using a pool of worker processes.
+
+    Products are sharded round-robin across the workers, each of which opens
+    the file and runs its own iterator restricted to its shard. Shapes are
+    streamed back to this process as plain Python objects with the same
+    attributes as triangulation elements, where geometry buffers are flat
+    NumPy arrays.
+
+    :param settings: The iterator settings, only triangulation is supported
+    :type settings: ifcopenshell.geom.settings
+    :param filename: The path to the IFC file, which is opened in every worker
+    :type filename: string
+    :param num_processes: The number of worker processes, defaults to the number of CPUs
+    :type num_processes: None|int
+    :param include: The products to process, defaults to all products with a representation
+    :type include: None|list
+    :param exclude: Products to exclude
+    :type exclude: None|list
+    :param ordered: Whether to yield shapes in the order of the products rather than in order of completion
+    :type ordered: bool
+    :param num_threads: The number of native threads used by the iterator of each worker
+    :type num_threads: int
+    :param queue_size: The maximum number of shapes waiting to be consumed, which bounds memory use
+    :type queue_size: int
+    :returns: A generator of shapes
+    :rtype: generator
+
+    Example::
+
+        settings = ifcopenshell.geom.settings()
+        for shape in ifcopenshell.geom.iterate_parallel(settings, "model.ifc", num_processes=8):
+            verts = shape.geometry.verts.reshape(-1, 3)
+    """
+    import ifcopenshell
+
+    if settings.get(settings.USE_BREP_DATA) or settings.get(settings.DISABLE_TRIANGULATION):
+        raise ValueError("Parallel iteration only supports triangulated geometry")
+
+    filename = os.path.abspath(filename)
+    if include is not None:
+        guids = [p.GlobalId for p in include]
+    else:
+        ifc_file = ifcopenshell.open(filename)
+        guids = [p.GlobalId for p in ifc_file.by_type("IfcProduct") if p.Representation]
+        del ifc_file
+    if exclude is not None:
+        excluded = set(p.GlobalId for p in exclude)
+        guids = [g for g in guids if g not in excluded]
+
+    num_processes = num_processes or os.cpu_count() or 1
+    indexed_guids = list(enumerate(guids))
+    shards = [indexed_guids[i::num_processes] for i in range(num_processes)]
+    settings_values = get_settings_values(settings)
+
+    context = multiprocessing.get_context()
+    queue = context.Queue(queue_size)
+    processes = [
+        context.Process(target=process_shard, args=(i, filename, settings_values, shard, num_threads, queue))
+        for i, shard in enumerate(shards)
+    ]
+    for process in processes:
+        process.start()
+
+    pending = {}
+    finished_shards = set()
+    exited_shards = set()
+    next_index = 0
+    try:
+        while len(finished_shards) < len(processes):
+            try:
+                index, value = queue.get(timeout=POLL_INTERVAL)
+            except Empty:
+                # A worker killed by a signal, such as a segmentation fault in
+                # the geometry kernel or the OOM killer, never reports back.
+                for i, process in enumerate(processes):
+                    if i in finished_shards or process.exitcode is None:
+                        continue
+                    if process.exitcode != 0 or i in exited_shards:
+                        raise RuntimeError(
+                            "Geometry worker %d exited unexpectedly with code %d" % (i, process.exitcode)
+                        )
+                    # Give results sent just before a clean exit a chance to arrive
+                    exited_shards.add(i)
+                continue
+            if index == ERROR:
+                raise RuntimeError("Geometry worker failed:\n%s" % value)
+            elif index == DONE:
+                finished_shards.add(value)
+            elif not ordered or index is None:
+                yield value
+            else:
+                pending[index] = value
+
+            if ordered:
+                # Products are sharded round-robin, so a missing product of a
+                # finished shard was not produced by the iterator.
+                while next_index < len(guids):
+                    if next_index in pending:
+                        yield pending.pop(next_index)
+                    elif next_index % num_processes not in finished_shards:
+                        break
+                    next_index += 1
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
@@ -18,21 +18,23 @@
 
 import os
 import re
+import json
+import array
 import logging
 import numpy as np
 from datetime import date
 
+import ifcopenshell
 import ifcopenshell.util.element
 import ifcopenshell.util.placement
 
-from bcf.v2.bcfxml import BcfXml
+from bcf.v2.bcfxml import BcfWriter
 from bcf.v2 import data as bcf
 
 from xmlschema import XMLSchema
 from xmlschema import etree_tostring
 from xmlschema.validators import identities
 
-
 cwd = os.path.dirname(os.path.realpath(__file__))
 ids_schema = XMLSchema(os.path.join(cwd, "ids.xsd"))  # source: "http://standards.buildingsmart.org/IDS/ids_04.xsd"
 
@@ -183,14 +185,29 @@ class ids:
         ids_file.specifications = [specification.parse(s) for s in ids_content["specification"]]
         return ids_file
 
-    def validate(self, ifc_file, logger=None):
+    def validate(self, ifc_file, logger=None, num_processes=None, sink=None):
         """Use to validate IFC model against IDS specifications.
 
-        :param ifc_file: path to ifc file
-        :type ifc_file: str
+        Specifications are grouped by their entity facet, so that only
+        candidate elements are checked, and all specifications applying to an
+        element are checked at once, sharing the properties, classifications
+        and materials read from the element. Sentences are only formatted for
+        results which the logger reports.
+
+        :param ifc_file: IFC file or path to ifc file
+        :type ifc_file: ifcopenshell.file|str
         :param logger: Logging object with handlers, defaults to None
         :type logger: logging, optional
+        :param num_processes: Number of worker processes to check elements in, which requires ifc_file to be a path, defaults to None
+        :type num_processes: int, optional
+        :param sink: Receives the results instead of the logger, such as a CountSink, JsonLinesSink, ColumnarSink or BcfSink, defaults to None
+        :type sink: ResultSink, optional
         """
+        filepath = None
+        if isinstance(ifc_file, str):
+            filepath = ifc_file
+            ifc_file = ifcopenshell.open(filepath)
+
         if not isinstance(logger, logging.Logger):
             logger = logging.getLogger("IDS_Logger")
             logging.basicConfig(level=logging.INFO, format="%(message)s")
@@ -210,24 +227,45 @@ class ids:
                 else:
                     logger.error("IFC version not recognized")
 
-        # Consider other way around: for elem, for spec so we can see if an element pass all IDSes?
-        for spec in self.specifications:
-            self.ifc_applicable = 0
-            self.ifc_passed = 0
-            for elem in ifc_file.by_type("IfcObject"):
-                apply, comply = spec(elem, logger)
-                if apply:
-                    self.ifc_applicable += 1
-                if comply:
-                    self.ifc_passed += 1
-            if self.ifc_applicable == 0:
+        if sink is not None:
+            report_passed, report_failed = sink.report_passed, sink.report_failed
+            sink.start(self, ifc_file)
+        else:
+            report_passed = logger.isEnabledFor(logging.INFO)
+            report_failed = logger.isEnabledFor(logging.ERROR)
+        if num_processes and filepath:
+            results = self.check_parallel(filepath, num_processes, report_passed, report_failed)
+        else:
+            results = self.check_elements(ifc_file, self.get_candidates(ifc_file), report_passed, report_failed)
+
+        applicable = [0] * len(self.specifications)
+        passed = [0] * len(self.specifications)
+        for spec_index, element_id, success, sentence in results:
+            applicable[spec_index] += 1
+            if success:
+                passed[spec_index] += 1
+            if sink is not None:
+                sink.add(spec_index, element_id, success, sentence)
+            elif sentence is not None:
+                inst = ifc_file.by_id(element_id)
+                result = {"guid": inst.GlobalId, "result": success, "sentence": sentence, "ifc_element": inst}
+                if success:
+                    logger.info(result)
+                else:
+                    logger.error(result)
+
+        if sink is not None:
+            sink.finish(applicable, passed)
+
+        for spec, spec_applicable, spec_passed in zip(self.specifications, applicable, passed):
+            if spec_applicable == 0:
                 if spec.necessity == "required":
                     logger.error("No applicable elements found. Minimum 1 applicable element required.")
                 else:
                     logger.debug("No applicable elements found. None required.")
 
             try:
-                percentage = self.ifc_passed / self.ifc_applicable * 100
+                percentage = spec_passed / spec_applicable * 100
             except ZeroDivisionError:
                 percentage = 0
 
@@ -235,14 +273,119 @@ class ids:
                 "Out of %s IFC elements, %s were applicable and %s of them passed (%s)."
                 % (
                     len(ifc_file.by_type("IfcProduct")),
-                    self.ifc_applicable,
-                    self.ifc_passed,
+                    spec_applicable,
+                    spec_passed,
                     str(percentage) + "%",
                 )
             )
+        if self.specifications:
+            # Kept for compatibility, these were the counts of the last specification
+            self.ifc_applicable, self.ifc_passed = applicable[-1], passed[-1]
         for h in logger.handlers:
             h.flush()
 
+    def get_candidates(self, ifc_file):
+        """Group specifications by the elements they could apply to.
+
+        :param ifc_file: IFC file
+        :type ifc_file: ifcopenshell.file
+        :return: Indices of the specifications per candidate element id
+        :rtype: dict
+        """
+        candidates = {}
+        for spec_index, spec in enumerate(self.specifications):
+            for element in spec.get_candidates(ifc_file):
+                candidates.setdefault(element.id(), []).append(spec_index)
+        return candidates
+
+    def check_elements(self, ifc_file, candidates, report_passed=True, report_failed=True, element_ids=None):
+        """Check candidate elements against their specifications, element by element.
+
+        :param ifc_file: IFC file
+        :type ifc_file: ifcopenshell.file
+        :param candidates: Indices of the specifications per element id, see get_candidates()
+        :type candidates: dict
+        :param report_passed: Whether to format a sentence for passing elements, defaults to True
+        :type report_passed: bool, optional
+        :param report_failed: Whether to format a sentence for failing elements, defaults to True
+        :type report_failed: bool, optional
+        :param element_ids: Only check these candidates, defaults to all candidates in order of their ids
+        :type element_ids: list, optional
+        :return: Tuples of specification index, element id, success and sentence (or None) of applicable elements
+        :rtype: generator
+        """
+        for element_id in sorted(candidates) if element_ids is None else element_ids:
+            inst = ifc_file.by_id(element_id)
+            facts = element_facts(inst)
+            for spec_index in candidates[element_id]:
+                spec = self.specifications[spec_index]
+                applicable, valid = spec.check(inst, facts)
+                if not applicable:
+                    continue
+                sentence = None
+                if report_passed if valid else report_failed:
+                    sentence = spec.get_sentence(inst, valid)
+                yield spec_index, element_id, bool(valid), sentence
+
+    def check_parallel(self, filepath, num_processes, report_passed=True, report_failed=True, chunk_size=256):
+        """Like check_elements(), in a pool of worker processes which each open the file.
+
+        Workers check small chunks of candidates at a time and the results of
+        each chunk are yielded as soon as it is checked, in the same order as
+        check_elements(), so only a few chunks of results are held in memory.
+
+        :param filepath: Path to the ifc file
+        :type filepath: str
+        :param num_processes: Number of worker processes
+        :type num_processes: int
+        :param chunk_size: Number of candidate elements checked by a worker at a time, defaults to 256
+        :type chunk_size: int, optional
+        :return: Results like check_elements()
+        :rtype: generator
+        """
+        import multiprocessing
+
+        initargs = (self, os.path.abspath(filepath), report_passed, report_failed)
+        with multiprocessing.Pool(num_processes, init_check_worker, initargs) as pool:
+            num_candidates = pool.apply(count_candidates)
+            chunks = ((start, start + chunk_size) for start in range(0, num_candidates, chunk_size))
+            for results in pool.imap(check_chunk, chunks):
+                yield from results
+
+
+check_worker_state = {}
+
+
+def init_check_worker(ids_file, filepath, report_passed, report_failed):
+    ifc_file = ifcopenshell.open(filepath)
+    candidates = ids_file.get_candidates(ifc_file)
+    check_worker_state.update(
+        ids_file=ids_file,
+        ifc_file=ifc_file,
+        candidates=candidates,
+        element_ids=sorted(candidates),
+        report_passed=report_passed,
+        report_failed=report_failed,
+    )
+
+
+def count_candidates():
+    return len(check_worker_state["element_ids"])
+
+
+def check_chunk(args):
+    start, stop = args
+    state = check_worker_state
+    return list(
+        state["ids_file"].check_elements(
+            state["ifc_file"],
+            state["candidates"],
+            state["report_passed"],
+            state["report_failed"],
+            state["element_ids"][start:stop],
+        )
+    )
+
 
 class specification:
     """Represents the XML <specification> node and its two children <applicability> and <requirements>"""
@@ -333,61 +476,89 @@ class specification:
         else:
             self.requirements = boolean_and([facet])
 
-    def __call__(self, inst, logger):
+    def __call__(self, inst, logger, facts=None):
         """When specification is called on an ifc instance, it validates against applicability and requirements.
 
         :param inst: IFC entity element
         :type inst: IFC entity
         :param logger: Logging object
         :type logger: logging
+        :param facts: Data already read from the element, defaults to None
+        :type facts: element_facts, optional
         :return: results of validation on applicability and requirements
         :rtype: [bool,bool]
         """
-        if self.applicability(inst, logger):
-
-            valid = self.requirements(inst, logger)
-
-            if valid:
-                logger.info(
-                    {
-                        "guid": inst.GlobalId,
-                        "result": valid.success,
-                        "sentence": str(self)
-                        + ".\n"
-                        + inst.is_a()
-                        + " '"
-                        + str(inst.Name)
-                        + "' (#"
-                        + str(inst.id())
-                        + ") has "
-                        + str(valid)
-                        + " so is compliant",
-                        "ifc_element": inst,
-                    }
-                )
-                return True, True
-            else:
-                # BUG "has does not have"
-                logger.error(
-                    {
-                        "guid": inst.GlobalId,
-                        "result": valid.success,
-                        "sentence": str(self)
-                        + ".\n"
-                        + inst.is_a()
-                        + " '"
-                        + str(inst.Name)
-                        + "' (#"
-                        + str(inst.id())
-                        + ") has "
-                        + str(valid)
-                        + " so is not compliant",
-                        "ifc_element": inst,
-                    }
-                )
-                return True, False
-        else:
+        applicable, valid = self.check(inst, facts)
+        if not applicable:
             return False, False
+        if valid:
+            if not isinstance(logger, logging.Logger) or logger.isEnabledFor(logging.INFO):
+                logger.info(self.get_result(inst, valid))
+            return True, True
+        else:
+            if not isinstance(logger, logging.Logger) or logger.isEnabledFor(logging.ERROR):
+                logger.error(self.get_result(inst, valid))
+            return True, False
+
+    def check(self, inst, facts=None):
+        """Validate an ifc instance against applicability and requirements without reporting.
+
+        :param inst: IFC entity element
+        :type inst: IFC entity
+        :param facts: Data already read from the element, defaults to None
+        :type facts: element_facts, optional
+        :return: Whether the specification applies, and the evaluation of the requirements if so
+        :rtype: [bool,facet_evaluation]
+        """
+        if facts is None:
+            facts = element_facts(inst)
+        if not self.applicability(inst, None, facts):
+            return False, None
+        return True, self.requirements(inst, None, facts)
+
+    def get_candidates(self, ifc_file):
+        """Select the elements the specification could apply to using its entity facet.
+
+        :param ifc_file: IFC file
+        :type ifc_file: ifcopenshell.file
+        :return: Candidate elements
+        :rtype: list
+        """
+        for term in getattr(self.applicability, "terms", ()):
+            if isinstance(term, entity) and isinstance(term.name, str):
+                try:
+                    return [e for e in ifc_file.by_type(term.name) if e.is_a("IfcObject")]
+                except RuntimeError:
+                    break  # Not an entity of the schema of the file, leave it to the facet
+        return ifc_file.by_type("IfcObject")
+
+    def get_sentence(self, inst, valid):
+        """Describe the result of validating an instance in a human readable sentence.
+
+        :param inst: IFC entity element
+        :type inst: IFC entity
+        :param valid: Evaluation of the requirements
+        :type valid: facet_evaluation
+        :return: sentence
+        :rtype: str
+        """
+        # BUG "has does not have"
+        return "%s.\n%s '%s' (#%s) has %s so is %s" % (
+            self,
+            inst.is_a(),
+            inst.Name,
+            inst.id(),
+            valid,
+            "compliant" if valid else "not compliant",
+        )
+
+    def get_result(self, inst, valid):
+        return {
+            "guid": inst.GlobalId,
+            "result": valid.success,
+            "sentence": self.get_sentence(inst, valid),
+            "ifc_element": inst,
+        }
 
     def __str__(self):
         """Represent the specification in human readible sentence.
@@ -399,7 +570,10 @@ class specification:
 
 
 class facet_evaluation:
-    """The evaluation of a facet with data from IFC. Converts to bool and has a human readable string format."""
+    """The evaluation of a facet with data from IFC. Converts to bool and has a human readable string format.
+
+    The string may be given as a function, so that it is only formatted when needed.
+    """
 
     def __init__(self, success, str):
         self.success = success
@@ -409,9 +583,44 @@ class facet_evaluation:
         return self.success
 
     def __str__(self):
+        if callable(self.str):
+            self.str = self.str()
         return self.str
 
 
+class element_facts:
+    """The data read from an IFC element to evaluate facets, which is read
+    once on first use and then shared by all facets and specifications."""
+
+    def __init__(self, inst):
+        self.inst = inst
+
+    def __getattr__(self, k):
+        if k.startswith("_") or k.startswith("get_"):
+            raise AttributeError(k)
+        v = getattr(self, "get_" + k)()
+        setattr(self, k, v)
+        return v
+
+    def get_element_type(self):
+        return ifcopenshell.util.element.get_type(self.inst)
+
+    def get_attributes(self):
+        return {k.lower(): v for k, v in self.inst.get_info().items()}
+
+    def get_psets(self):
+        return ifcopenshell.util.element.get_psets(self.inst)
+
+    def get_type_psets(self):
+        return ifcopenshell.util.element.get_psets(self.element_type) if self.element_type else {}
+
+    def get_associations(self):
+        return self.inst.HasAssociations
+
+    def get_type_associations(self):
+        return self.element_type.HasAssociations if self.element_type else ()
+
+
 class meta_facet(type):
     """A metaclass for automatically registering facets in a map to be instantiated based on XML tagnames."""
 
@@ -444,6 +653,8 @@ class facet(metaclass=meta_facet):
             self.location = "any"
 
     def __getattr__(self, k):
+        if k.startswith("__"):
+            raise AttributeError(k)
         if k in self.node:
             v = self.node[k]
             # BUG list of dictionaries should not happen
@@ -506,27 +717,30 @@ class entity(facet):
             print(e)
         return fac_dict
 
-    def __call__(self, inst, logger):
+    def __call__(self, inst, logger, facts=None):
         """Validate an ifc instance against that entity facet.
 
         :param inst: IFC entity element
         :type inst: IFC entity
         :param logger: Logging object
         :type logger: logging
+        :param facts: Data already read from the element, defaults to None
+        :type facts: element_facts, optional
         :return: result of the validation as bool and message
         :rtype: facet_evaluation(bool, str)
         """
 
         # @nb with inheritance
         if self.predefinedtype and hasattr(inst, "PredefinedType"):
-            self.message = "an entity name '%(name)s' of predefined type '%(predefinedtype)s'"
+            message = self.message = "an entity name '%(name)s' of predefined type '%(predefinedtype)s'"
+            predefinedtype = inst.PredefinedType
             return facet_evaluation(
-                inst.is_a(self.name) and inst.PredefinedType == self.predefinedtype,
-                self.message % {"name": inst.is_a(), "predefinedtype": inst.PredefinedType},
+                inst.is_a(self.name) and predefinedtype == self.predefinedtype,
+                lambda: message % {"name": inst.is_a(), "predefinedtype": predefinedtype},
             )
         else:
-            self.message = "an entity name '%(name)s'"
-            return facet_evaluation(inst.is_a(self.name), self.message % {"name": inst.is_a()})
+            message = self.message = "an entity name '%(name)s'"
+            return facet_evaluation(inst.is_a(self.name), lambda: message % {"name": inst.is_a()})
 
 
 class classification(facet):
@@ -571,22 +785,23 @@ class classification(facet):
         }
         return fac_dict
 
-    def __call__(self, inst, logger):
+    def __call__(self, inst, logger, facts=None):
         """Validate an ifc instance against that classification facet.
 
         :param inst: IFC entity element
         :type inst: IFC entity
         :param logger: Logging object
         :type logger: logging
+        :param facts: Data already read from the element, defaults to None
+        :type facts: element_facts, optional
         :return: result of the validation as bool and message
         :rtype: facet_evaluation(bool, str)
         """
 
-        instance_classiciations = inst.HasAssociations
-        if ifcopenshell.util.element.get_type(inst):
-            type_classifications = ifcopenshell.util.element.get_type(inst).HasAssociations
-        else:
-            type_classifications = ()
+        if facts is None:
+            facts = element_facts(inst)
+        instance_classiciations = facts.associations
+        type_classifications = facts.type_associations
 
         if self.location == "instance" and instance_classiciations:
             associations = instance_classiciations
@@ -606,20 +821,20 @@ class classification(facet):
                 elif hasattr(cref, "Identification"):  # IFC4
                     refs.append((cref.ReferencedSource.Name, cref.Identification))
 
-        self.location_msg = location[self.location]
+        location_msg = self.location_msg = location[self.location]
 
         if refs:
             return facet_evaluation(
                 (self.system, self.value) in refs,
-                self.message
+                lambda: self.message
                 % {
                     "system": refs[0][0],
                     "value": "'" + refs[0][1] + "'",
-                    "location": self.location_msg,
+                    "location": location_msg,
                 },  # what if not first item of refs?
             )
         else:
-            return facet_evaluation(False, "does not have %sclassification reference" % self.location_msg)
+            return facet_evaluation(False, lambda: "does not have %sclassification reference" % location_msg)
 
 
 class property(facet):
@@ -671,29 +886,29 @@ class property(facet):
         }
         return fac_dict
 
-    def __call__(self, inst, logger):
+    def __call__(self, inst, logger, facts=None):
         """Validate an ifc instance against that property facet.
 
         :param inst: IFC entity element
         :type inst: IFC entity
         :param logger: Logging object
         :type logger: logging
+        :param facts: Data already read from the element, defaults to None
+        :type facts: element_facts, optional
         :return: result of the validation as bool and message
         :rtype: facet_evaluation(bool, str)
         """
 
         self.location = self.node["@location"]
+        if facts is None:
+            facts = element_facts(inst)
 
         if self.propertyset == "attribute":
-            val = {k.lower(): v for k, v in inst.get_info().items()}.get(self.name, None)
+            val = facts.attributes.get(self.name, None)
         else:
             # TODO sometimes AttributeError: 'str' object has no attribute 'wrappedValue'
-            instance_props = ifcopenshell.util.element.get_psets(inst)
-
-            if ifcopenshell.util.element.get_type(inst):
-                type_props = ifcopenshell.util.element.get_psets(ifcopenshell.util.element.get_type(inst))
-            else:
-                type_props = {}
+            instance_props = facts.psets
+            type_props = facts.type_psets
 
             if self.location == "instance":
                 props = instance_props
@@ -711,12 +926,12 @@ class property(facet):
         di = {"name": self.name, "propertyset": self.propertyset, "value": "'%s'" % val, "location": self.location_msg}
 
         if val is not None:
-            msg = self.message % di
+            msg = self.message
         else:
             if pset:
-                msg = "does not have %(location)sproperty '%(name)s' in a set '%(propertyset)s'" % di
+                msg = "does not have %(location)sproperty '%(name)s' in a set '%(propertyset)s'"
             else:
-                msg = "does not have %(location)sset '%(propertyset)s'" % di
+                msg = "does not have %(location)sset '%(propertyset)s'"
 
         # TODO implement data type comparison
         # xs:string
@@ -729,7 +944,7 @@ class property(facet):
         # xs:dateTime 	YYYY-MM-DDThh:mm:ss
         # xs:duration	PnYnMnDTnHnMnS
 
-        return facet_evaluation(val == self.value, msg)
+        return facet_evaluation(val == self.value, lambda: msg % di)
 
 
 class material(facet):
@@ -772,28 +987,25 @@ class material(facet):
         }
         return fac_dict
 
-    def __call__(self, inst, logger):
+    def __call__(self, inst, logger, facts=None):
         """Validate an ifc instance against that material facet.
 
         :param inst: IFC entity element
         :type inst: IFC entity
         :param logger: Logging object
         :type logger: logging
+        :param facts: Data already read from the element, defaults to None
+        :type facts: element_facts, optional
         :return: result of the validation as bool and message
         :rtype: facet_evaluation(bool, str)
         """
 
         self.location = self.node["@location"]
+        if facts is None:
+            facts = element_facts(inst)
 
-        instance_material_rel = [rel for rel in inst.HasAssociations if rel.is_a("IfcRelAssociatesMaterial")]
-        if ifcopenshell.util.element.get_type(inst):
-            type_material_rel = [
-                rel
-                for rel in ifcopenshell.util.element.get_type(inst).HasAssociations
-                if rel.is_a("IfcRelAssociatesMaterial")
-            ]
-        else:
-            type_material_rel = []
+        instance_material_rel = [rel for rel in facts.associations if rel.is_a("IfcRelAssociatesMaterial")]
+        type_material_rel = [rel for rel in facts.type_associations if rel.is_a("IfcRelAssociatesMaterial")]
 
         if self.location == "instance":
             material_relations = list(instance_material_rel)
@@ -828,11 +1040,11 @@ class material(facet):
         if not materials:
             materials.append("UNDEFINED")
 
-        self.location_msg = location[self.location]
+        location_msg = self.location_msg = location[self.location]
 
         return facet_evaluation(
             self.value in materials,
-            self.message % {"value": "'/'".join(materials), "location": self.location_msg},
+            lambda: self.message % {"value": "'/'".join(materials), "location": location_msg},
         )
 
 
@@ -864,7 +1076,7 @@ class boolean_logic:
     def __call__(self, *args):
         eval = [t(*args) for t in self.terms]
         join = [" and ", " or "][self.fold == any]
-        return facet_evaluation(self.fold(eval), join.join(map(str, eval)))
+        return facet_evaluation(self.fold(eval), lambda: join.join(map(str, eval)))
 
     def __str__(self):
         return [" and ", " or "][self.fold == any].join(map(str, self.terms))
@@ -1107,12 +1319,11 @@ class BcfHandler(logging.StreamHandler):
             self.setLevel(logging.INFO)
         else:
             self.setLevel(logging.ERROR)
-        self.bcf = BcfXml()
-        self.bcf.author = author
-        self.bcf.new_project()
-        self.bcf.project.name = project_name
+        self.project_name = project_name
+        self.author = author
         self.filepath = filepath
-        self.bcf.edit_project()
+        self.bcf = None
+        self.is_saved = False
 
     def emit(self, log_content):
         """Triggered on each use of logging with the BCF handler enabled.
@@ -1120,15 +1331,22 @@ class BcfHandler(logging.StreamHandler):
         :param log_content: default logger message
         :type log_content: string|dict
         """
+        self.add_result(log_content.msg)
+
+    def add_result(self, result):
+        """Add a topic for a validation result.
+
+        :param result: Result with the keys guid, sentence and ifc_element, see specification.get_result()
+        :type result: dict
+        """
         topic = bcf.Topic()
-        topic.title = log_content.msg["sentence"].split(".\n")[1]
-        topic.description = log_content.msg["sentence"].split(".\n")[0]
-        self.bcf.add_topic(topic)
+        topic.title = result["sentence"].split(".\n")[1]
+        topic.description = result["sentence"].split(".\n")[0]
         try:  # Add viewpoint and link to ifc object
             viewpoint = bcf.Viewpoint()
             viewpoint.perspective_camera = bcf.PerspectiveCamera()
-            ifc_elem = log_content.msg["ifc_element"]
-            # ifc_elem = ifc_file.by_guid(log_content.msg["guid"])
+            ifc_elem = result["ifc_element"]
+            # ifc_elem = ifc_file.by_guid(result["guid"])
             target_position = np.array(ifcopenshell.util.placement.get_local_placement(ifc_elem.ObjectPlacement))
             target_position = target_position[:, 3][0:3]
             camera_position = target_position + np.array((5, 5, 5))
@@ -1158,22 +1376,215 @@ class BcfHandler(logging.StreamHandler):
             viewpoint.perspective_camera.camera_up_vector.z = mat[2][1]
             viewpoint.components = bcf.Components()
             c = bcf.Component()
-            c.ifc_guid = log_content.msg["guid"]
+            c.ifc_guid = result["guid"]
             viewpoint.components.selection.append(c)
             viewpoint.components.visibility = bcf.ComponentVisibility()
             viewpoint.components.visibility.default_visibility = True
             viewpoint.snapshot = None
-            self.bcf.add_viewpoint(topic, viewpoint)
+            topic.viewpoints[viewpoint.guid] = viewpoint
         except:
             pass
+        self.get_writer().add_topic(topic)
+
+    def get_writer(self):
+        """Returns the BCF writer, opening the report file if it is not open yet.
+
+        Topics are streamed into the report as they are added, so the report is
+        only complete once it is flushed. Topics added after a flush are
+        appended to the saved report.
+        """
+        if self.bcf is None:
+            if not self.filepath:
+                self.filepath = os.getcwd() + r"\IDS_report.bcfzip"
+            if not (self.filepath.endswith(".bcf") or self.filepath.endswith(".bcfzip")):
+                self.filepath = self.filepath + r"\IDS_report.bcfzip"
+            mode = "a" if self.is_saved else "w"
+            self.bcf = BcfWriter(self.filepath, project_name=self.project_name, mode=mode)
+            self.bcf.author = self.author
+        return self.bcf
 
     def flush(self):
         """Saves the BCF report to file. Triggered at the end of the validation process."""
-        if not self.filepath:
-            self.filepath = os.getcwd() + r"\IDS_report.bcfzip"
-        if not (self.filepath.endswith(".bcf") or self.filepath.endswith(".bcfzip")):
-            self.filepath = self.filepath + r"\IDS_report.bcfzip"
-        self.bcf.save_project(self.filepath)
+        if self.is_saved and self.bcf is None:
+            return
+        self.get_writer().close()
+        self.bcf = None
+        self.is_saved = True
+
+
+class ResultSink:
+    """Base class of structured result sinks, an alternative to logging handlers.
+
+    A sink passed to ids.validate receives every applicable element as a
+    call to add(), without going through logging. Sentences are only
+    formatted for the results selected by report_passed and report_failed.
+    """
+
+    report_passed = False
+    report_failed = False
+
+    def start(self, ids_file, ifc_file):
+        """Triggered before validation.
+
+        :param ids_file: The IDS being validated against
+        :type ids_file: ids
+        :param ifc_file: IFC file
+        :type ifc_file: ifcopenshell.file
+        """
+        self.ids_file = ids_file
+        self.ifc_file = ifc_file
+
+    def add(self, spec_index, element_id, success, sentence):
+        """Triggered for every element a specification applies to.
+
+        :param spec_index: Index of the specification in ids_file.specifications
+        :type spec_index: int
+        :param element_id: STEP id of the element
+        :type element_id: int
+        :param success: Whether the element complies with the specification
+        :type success: bool
+        :param sentence: Description of the result, or None if it was not requested
+        :type sentence: str
+        """
+        pass
+
+    def finish(self, applicable, passed):
+        """Triggered after validation with the counts of every specification.
+
+        :param applicable: Number of applicable elements per specification
+        :type applicable: list
+        :param passed: Number of compliant elements per specification
+        :type passed: list
+        """
+        self.applicable = applicable
+        self.passed = passed
+
+
+class CountSink(ResultSink):
+    """Only counts applicable and compliant elements per specification.
+
+    Example::
+
+        sink = CountSink()
+        ids_file.validate(ifc_file, sink=sink)
+        for name, applicable, passed in sink.counts:
+            print(name, applicable, passed)
+    """
+
+    def finish(self, applicable, passed):
+        super().finish(applicable, passed)
+        self.counts = [(s.name, a, p) for s, a, p in zip(self.ids_file.specifications, applicable, passed)]
+
+
+class JsonLinesSink(ResultSink):
+    """Writes a line of JSON per result as soon as it is available.
+
+    :param filepath: Path to write to, compressed with gzip if it ends with .gz, defaults to None
+    :type filepath: str, optional
+    :param stream: Text stream to write to instead of a file, defaults to None
+    :type stream: file, optional
+    :param report_valid: True if you want to list all the compliant cases as well, defaults to False
+    :type report_valid: bool, optional
+    """
+
+    report_failed = True
+
+    def __init__(self, filepath=None, stream=None, report_valid=False):
+        self.filepath = filepath
+        self.stream = stream
+        self.report_passed = report_valid
+
+    def start(self, ids_file, ifc_file):
+        super().start(ids_file, ifc_file)
+        if self.filepath:
+            if self.filepath.endswith(".gz"):
+                import gzip
+
+                self.stream = gzip.open(self.filepath, "wt", encoding="utf-8")
+            else:
+                self.stream = open(self.filepath, "w", encoding="utf-8")
+
+    def add(self, spec_index, element_id, success, sentence):
+        if sentence is None:
+            return
+        inst = self.ifc_file.by_id(element_id)
+        result = {
+            "specification": self.ids_file.specifications[spec_index].name,
+            "guid": inst.GlobalId,
+            "id": element_id,
+            "result": success,
+            "sentence": sentence,
+        }
+        self.stream.write(json.dumps(result) + "\n")
+
+    def finish(self, applicable, passed):
+        super().finish(applicable, passed)
+        if self.filepath:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+class ColumnarSink(ResultSink):
+    """Stores the specification, element id and result of every applicable
+    element in compact arrays, which are saved in a compressed NumPy .npz file.
+
+    :param filepath: Path to save the summary to
+    :type filepath: str
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+
+    def start(self, ids_file, ifc_file):
+        super().start(ids_file, ifc_file)
+        self.specifications = array.array("i")
+        self.element_ids = array.array("q")
+        self.results = array.array("b")
+
+    def add(self, spec_index, element_id, success, sentence):
+        self.specifications.append(spec_index)
+        self.element_ids.append(element_id)
+        self.results.append(success)
+
+    def finish(self, applicable, passed):
+        super().finish(applicable, passed)
+        np.savez_compressed(
+            self.filepath,
+            names=np.array([s.name for s in self.ids_file.specifications]),
+            applicable=np.array(applicable, dtype=np.int64),
+            passed=np.array(passed, dtype=np.int64),
+            specification=np.frombuffer(self.specifications, dtype=np.int32),
+            id=np.frombuffer(self.element_ids, dtype=np.int64),
+            result=np.frombuffer(self.results, dtype=np.int8).astype(bool),
+        )
+
+
+class BcfSink(ResultSink):
+    """Creates a BCF report of the failing elements only.
+
+    :param project_name: defaults to "IDS Project"
+    :type project_name: str, optional
+    :param author: Email of the person creating the BCF report, defaults to "your@email.com"
+    :type author: str, optional
+    :param filepath: Path to save the BCF report, defaults to None
+    :type filepath: str, optional
+    """
+
+    report_failed = True
+
+    def __init__(self, project_name="IDS Project", author="your@email.com", filepath=None):
+        self.handler = BcfHandler(project_name=project_name, author=author, filepath=filepath)
+
+    def add(self, spec_index, element_id, success, sentence):
+        if sentence is None:
+            return
+        inst = self.ifc_file.by_id(element_id)
+        self.handler.add_result({"guid": inst.GlobalId, "sentence": sentence, "ifc_element": inst})
+
+    def finish(self, applicable, passed):
+        super().finish(applicable, passed)
+        self.handler.flush()
 
 
 location = {"instance": "an instance ", "type": "a type ", "any": "a "}
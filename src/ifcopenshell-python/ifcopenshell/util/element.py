@@ -52,6 +52,216 @@ def get_properties(properties):
     return results
 
 
+class PsetIndex:
+    """An index of the properties and quantities of all elements in a file
+
+    The index is built in one pass over the property and type relationships,
+    and each property set definition is only read once no matter how many
+    elements share it. Occurrences inherit the property sets of their type,
+    where properties of the occurrence take precedence. Values are returned
+    as shared dictionaries and must be treated as read-only.
+
+    Edits made outside the index are not detected automatically. Either call
+    invalidate() for the affected elements, or use add_listeners() so that
+    pset, qto and type API calls keep the index up to date.
+
+    Example::
+
+        index = ifcopenshell.util.element.PsetIndex(ifc_file)
+        index.get_psets(wall)["Pset_WallCommon"]["IsExternal"]
+        index.get_elements("Pset_WallCommon", "IsExternal", True)
+    """
+
+    listened_usecases = {
+        "pset.add_pset": "product",
+        "pset.add_qto": "product",
+        "pset.edit_pset": "pset",
+        "pset.edit_qto": "qto",
+        "pset.remove_pset": "product",
+        "type.assign_type": "related_object",
+        "type.unassign_type": "related_object",
+    }
+
+    def __init__(self, ifc_file, should_inherit=True):
+        self.file = ifc_file
+        self.should_inherit = should_inherit
+        self.psets = {}
+        self.types = {}
+        self.occurrences = {}
+        self.values = {}
+        self.build()
+
+    def build(self):
+        self.types = {}
+        self.occurrences = {}
+        self.values = {}
+        definitions = {}
+
+        def get_definition(definition):
+            if definition.id() not in definitions:
+                definitions[definition.id()] = get_property_definition(definition)
+            return definitions[definition.id()]
+
+        own_psets = {}
+        for element in self.file.by_type("IfcTypeObject"):
+            for definition in element.HasPropertySets or []:
+                own_psets.setdefault(element.id(), {})[definition.Name] = get_definition(definition)
+        for rel in self.file.by_type("IfcRelDefinesByProperties"):
+            definition = rel.RelatingPropertyDefinition
+            props = get_definition(definition)
+            for element in rel.RelatedObjects:
+                own_psets.setdefault(element.id(), {})[definition.Name] = props
+        for rel in self.file.by_type("IfcRelDefinesByType"):
+            for element in rel.RelatedObjects:
+                self.types[element.id()] = rel.RelatingType.id()
+                self.occurrences.setdefault(rel.RelatingType.id(), set()).add(element.id())
+
+        self.psets = own_psets
+        if self.should_inherit:
+            for element_id, type_id in self.types.items():
+                if type_id in own_psets:
+                    self.psets[element_id] = self.inherit(own_psets[type_id], own_psets.get(element_id, {}))
+
+    def inherit(self, type_psets, psets):
+        results = dict(type_psets)
+        for name, props in psets.items():
+            if name in results:
+                results[name] = {**results[name], **props}
+            else:
+                results[name] = props
+        return results
+
+    def get_psets(self, element):
+        """Return the property sets of an element, like get_psets()
+
+        :param element: The element to get the properties of
+        :type element: ifcopenshell.entity_instance.entity_instance
+        :return: A dictionary of pset names to dictionaries of properties
+        :rtype: dict
+        """
+        return self.psets.get(element.id(), {})
+
+    def get_elements(self, pset_name, prop_name, value):
+        """Return all elements where a property has a value
+
+        The inverted index of a property is built on first use and is kept up
+        to date by invalidate().
+
+        :param pset_name: The name of the property set or quantity set
+        :type pset_name: str
+        :param prop_name: The name of the property or quantity
+        :type prop_name: str
+        :param value: The value to match
+        :return: The matching elements
+        :rtype: list[ifcopenshell.entity_instance.entity_instance]
+        """
+        return [self.file.by_id(i) for i in sorted(self.get_values(pset_name, prop_name).get(value, ()))]
+
+    def get_values(self, pset_name, prop_name):
+        """Return the inverted index of a property
+
+        :param pset_name: The name of the property set or quantity set
+        :type pset_name: str
+        :param prop_name: The name of the property or quantity
+        :type prop_name: str
+        :return: A dictionary of values to sets of ids of elements with that value
+        :rtype: dict
+        """
+        key = (pset_name, prop_name)
+        if key not in self.values:
+            self.values[key] = {}
+            for element_id, psets in self.psets.items():
+                self.add_value(key, element_id, psets)
+        return self.values[key]
+
+    def add_value(self, key, element_id, psets):
+        props = psets.get(key[0])
+        if props is None or key[1] not in props:
+            return
+        try:
+            self.values[key].setdefault(props[key[1]], set()).add(element_id)
+        except TypeError:
+            pass  # Complex properties are not hashable and cannot be queried
+
+    def invalidate(self, element):
+        """Rebuild the index entries of an element after its properties changed
+
+        Invalidating a type also rebuilds the entries of its occurrences.
+
+        :param element: The element, type or property set definition which changed
+        :type element: ifcopenshell.entity_instance.entity_instance
+        """
+        if element.is_a("IfcPropertySetDefinition"):
+            for rel in getattr(element, "DefinesOccurrence", None) or getattr(element, "PropertyDefinitionOf", ()):
+                for related_object in rel.RelatedObjects:
+                    self.invalidate(related_object)
+            for related_type in getattr(element, "DefinesType", None) or ():
+                self.invalidate(related_type)
+            return
+
+        self.discard(element.id())
+        relating_type = get_type(element)
+        if relating_type and relating_type != element:
+            self.types[element.id()] = relating_type.id()
+            self.occurrences.setdefault(relating_type.id(), set()).add(element.id())
+        psets = get_psets(element)
+        if self.should_inherit and relating_type and relating_type != element:
+            psets = self.inherit(get_psets(relating_type), psets)
+        if psets:
+            self.psets[element.id()] = psets
+        for key in self.values:
+            self.add_value(key, element.id(), psets)
+        if element.is_a("IfcTypeObject"):
+            for occurrence_id in list(self.occurrences.get(element.id(), ())):
+                self.invalidate(self.file.by_id(occurrence_id))
+
+    def discard(self, element_id):
+        """Remove an element from the index, such as before it is removed from the file
+
+        :param element_id: The id of the element
+        :type element_id: int
+        """
+        psets = self.psets.pop(element_id, {})
+        for key, values in self.values.items():
+            try:
+                values.get(psets.get(key[0], {}).get(key[1], None), set()).discard(element_id)
+            except TypeError:
+                pass
+        type_id = self.types.pop(element_id, None)
+        if type_id is not None:
+            self.occurrences.get(type_id, set()).discard(element_id)
+
+    def add_listeners(self):
+        """Keep the index up to date when the API edits properties or types"""
+        import ifcopenshell.api
+
+        name = "PsetIndex%d" % id(self)
+        for usecase_path in self.listened_usecases.keys():
+            ifcopenshell.api.add_post_listener(usecase_path, name, self.on_usecase)
+        ifcopenshell.api.add_pre_listener("root.remove_product", name, self.on_remove_product)
+
+    def remove_listeners(self):
+        import ifcopenshell.api
+
+        name = "PsetIndex%d" % id(self)
+        for usecase_path in self.listened_usecases.keys():
+            ifcopenshell.api.remove_post_listener(usecase_path, name, self.on_usecase)
+        ifcopenshell.api.remove_pre_listener("root.remove_product", name, self.on_remove_product)
+
+    def on_usecase(self, usecase_path, ifc_file, settings):
+        if ifc_file is not self.file:
+            return
+        element = settings.get(self.listened_usecases[usecase_path])
+        if element is not None:
+            self.invalidate(element)
+        for element in settings.get("related_objects") or ():
+            self.invalidate(element)
+
+    def on_remove_product(self, usecase_path, ifc_file, settings):
+        if ifc_file is self.file and settings.get("product") is not None:
+            self.discard(settings["product"].id())
+
+
 def get_type(element):
     if element.is_a("IfcTypeObject"):
         return element
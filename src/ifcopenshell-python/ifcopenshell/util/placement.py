@@ -24,3 +24,140 @@ def get_local_placement(plc):
     else:
         parent = get_local_placement(plc.PlacementRelTo)
     return np.dot(parent, get_axis2placement(plc.RelativePlacement))
+
+
+class PlacementResolver:
+    """Resolve and cache the absolute matrices of local placements in a file
+
+    Matrices are cached per IfcLocalPlacement id, so placements shared by
+    many products, such as those of storeys and buildings, are only
+    resolved once. get_local_placements() resolves many placements at once,
+    level by level from their roots, with batched matrix products.
+
+    Placements edited outside of the resolver must be invalidated, either by
+    calling invalidate() or by using add_listeners() so that
+    geometry.edit_object_placement API calls do so. Placements relative to
+    other kinds of object placement, such as grid placements, resolve to NaN.
+
+    Example::
+
+        resolver = ifcopenshell.util.placement.PlacementResolver(ifc_file)
+        products = ifc_file.by_type("IfcProduct")
+        matrices = resolver.get_local_placements([p.ObjectPlacement for p in products])
+    """
+
+    listened_usecases = ("geometry.edit_object_placement",)
+
+    def __init__(self, ifc_file):
+        self.file = ifc_file
+        self.matrices = {}
+
+    def get_local_placement(self, plc):
+        """Return the absolute matrix of a placement, like get_local_placement()"""
+        if plc is None:
+            return np.eye(4)
+        return self.get_local_placements([plc])[0]
+
+    def get_local_placements(self, placements=None):
+        """Return the absolute matrices of placements as an (N, 4, 4) array
+
+        :param placements: Placements, which may be None for an identity
+            matrix. Defaults to all IfcLocalPlacements in the file.
+        :returns: A copy of the matrices, in the order of the placements
+        :rtype: numpy.ndarray
+        """
+        if placements is None:
+            placements = self.file.by_type("IfcLocalPlacement")
+
+        # Uncached placements and their ancestors, where parents precede children
+        pending = {}
+        for plc in placements:
+            chain = []
+            while plc is not None and plc.id() not in self.matrices and plc.id() not in pending:
+                chain.append(plc)
+                plc = getattr(plc, "PlacementRelTo", None)
+            parent_id = None if plc is None else plc.id()
+            depth = pending[parent_id][2] + 1 if parent_id in pending else 0
+            for plc in reversed(chain):
+                pending[plc.id()] = (plc, parent_id, depth)
+                parent_id = plc.id()
+                depth += 1
+
+        if pending:
+            items = list(pending.values())
+            relative = self.get_axis2placements([plc for plc, parent_id, depth in items])
+            depths = np.array([depth for plc, parent_id, depth in items])
+            rows = {plc.id(): i for i, (plc, parent_id, depth) in enumerate(items)}
+            absolute = np.empty_like(relative)
+            identity = np.eye(4)
+            for depth in range(depths.max() + 1):
+                level = np.flatnonzero(depths == depth)
+                parent_ids = [items[i][1] for i in level]
+                if depth == 0:
+                    parents = np.array([identity if p is None else self.matrices[p] for p in parent_ids])
+                else:
+                    parents = absolute[[rows[p] for p in parent_ids]]
+                absolute[level] = parents @ relative[level]
+            self.matrices.update(zip(rows.keys(), absolute))
+
+        identity = np.eye(4)
+        return np.array([identity if plc is None else self.matrices[plc.id()] for plc in placements]).reshape(-1, 4, 4)
+
+    def get_axis2placements(self, placements):
+        o = np.zeros((len(placements), 3))
+        z = np.tile((0.0, 0.0, 1.0), (len(placements), 1))
+        x = np.tile((1.0, 0.0, 0.0), (len(placements), 1))
+        invalid = []
+        for i, plc in enumerate(placements):
+            if not plc.is_a("IfcLocalPlacement"):
+                invalid.append(i)
+                continue
+            relative_placement = plc.RelativePlacement
+            coordinates = relative_placement.Location.Coordinates
+            o[i, : len(coordinates)] = coordinates
+            axis = getattr(relative_placement, "Axis", None)
+            if axis:
+                z[i] = axis.DirectionRatios
+            if relative_placement.RefDirection:
+                ratios = relative_placement.RefDirection.DirectionRatios
+                x[i] = 0.0
+                x[i, : len(ratios)] = ratios
+        matrices = np.zeros((len(placements), 4, 4))
+        matrices[:, :3, 0] = x
+        matrices[:, :3, 1] = np.cross(z, x)
+        matrices[:, :3, 2] = z
+        matrices[:, :3, 3] = o
+        matrices[:, 3, 3] = 1.0
+        matrices[invalid] = np.nan
+        return matrices
+
+    def invalidate(self, plc):
+        """Discard the cached matrices of a placement and of all placements relative to it"""
+        queue = [plc]
+        while queue:
+            plc = queue.pop()
+            self.matrices.pop(plc.id(), None)
+            queue.extend(getattr(plc, "ReferencedByPlacements", ()))
+
+    def add_listeners(self):
+        """Invalidate placements when the API edits object placements"""
+        import ifcopenshell.api
+
+        name = "PlacementResolver%d" % id(self)
+        for usecase_path in self.listened_usecases:
+            ifcopenshell.api.add_pre_listener(usecase_path, name, self.on_usecase)
+            ifcopenshell.api.add_post_listener(usecase_path, name, self.on_usecase)
+
+    def remove_listeners(self):
+        import ifcopenshell.api
+
+        name = "PlacementResolver%d" % id(self)
+        for usecase_path in self.listened_usecases:
+            ifcopenshell.api.remove_pre_listener(usecase_path, name, self.on_usecase)
+            ifcopenshell.api.remove_post_listener(usecase_path, name, self.on_usecase)
+
+    def on_usecase(self, usecase_path, ifc_file, settings):
+        # Before the edit this discards the old placement tree, and after it the new one
+        plc = getattr(settings.get("product"), "ObjectPlacement", None)
+        if ifc_file is self.file and plc is not None:
+            self.invalidate(plc)
@@ -0,0 +1,182 @@
+import json
+import numpy
+import datetime
+import ifcopenshell
+import ifcopenshell.api
+
+
+class Recorder:
+    """Record the API calls made on a file to an append-only operation log
+
+    Each top level ifcopenshell.api.run() call on the file is appended to the
+    log as a line of JSON with the usecase path, its serialised settings and
+    the ids of any entities it returned. Calls made by other usecases are not
+    recorded, as replaying the top level call repeats them.
+
+    Logs are meant to be replayed with replay() onto a copy of the file as it
+    was when recording started, for example to synchronise another copy of a
+    model or to recover unsaved changes after a crash. Changes made to the
+    file without the API are not recorded.
+
+    Example::
+
+        with ifcopenshell.util.recorder.Recorder(ifc_file, "model.log"):
+            wall = ifcopenshell.api.run("root.create_entity", ifc_file, ifc_class="IfcWall")
+
+        base_file = ifcopenshell.open("model.ifc")
+        ifcopenshell.util.recorder.replay(base_file, "model.log")
+    """
+
+    version = 2
+
+    def __init__(self, ifc_file, path, should_flush=True):
+        self.file = ifc_file
+        self.should_flush = should_flush
+        self.log = open(path, "a", encoding="utf-8")
+        if not self.log.tell():
+            self.write({"version": self.version, "schema": ifc_file.schema})
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+        self.close()
+
+    def start(self):
+        ifcopenshell.api.add_vcs_listener("Recorder%d" % id(self), self.on_call)
+
+    def stop(self):
+        ifcopenshell.api.remove_vcs_listener("Recorder%d" % id(self))
+
+    def close(self):
+        self.log.close()
+
+    def on_call(self, usecase_path, ifc_file, vcs_settings, result):
+        if ifc_file is not self.file:
+            return
+        self.write({"usecase": usecase_path, "settings": vcs_settings, "result": serialise_result(result)})
+
+    def write(self, entry):
+        self.log.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        if self.should_flush:
+            self.log.flush()
+
+
+def serialise_result(result):
+    if isinstance(result, ifcopenshell.entity_instance):
+        return ifcopenshell.api.serialise_entity_instance(result)
+    elif isinstance(result, (list, tuple)):
+        return [serialise_result(r) for r in result]
+
+
+def read_log(path):
+    """Return the header and a generator of the entries of an operation log
+
+    A truncated last line, as left behind by a crash while recording, is
+    ignored. The log is only kept open while the entries are iterated.
+    """
+    with open(path, "r", encoding="utf-8") as log:
+        header = json.loads(log.readline())
+        offset = log.tell()
+
+    def entries():
+        with open(path, "r", encoding="utf-8") as log:
+            log.seek(offset)
+            for line in log:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    if line.endswith("\n"):
+                        raise
+                    return
+
+    return header, entries()
+
+
+def replay(ifc_file, path, id_map=None, should_run_listeners=False):
+    """Re-apply the API calls of an operation log to a file
+
+    Entities are created with the same ids as when recording if the file
+    matches the state of the recorded file when recording started. Otherwise,
+    the ids of entities returned by calls are mapped to the ids they were
+    created with, and their GlobalIds are restored. Entities passed to calls
+    are checked to have the same class and GlobalId as when recording, so a
+    log replayed onto the wrong file, or referring to an entity created but
+    not returned by a call with a new GlobalId, raises an error rather than
+    editing the wrong entity.
+
+    :param ifc_file: The file to apply the calls to
+    :type ifc_file: ifcopenshell.file.file
+    :param path: The path of the operation log
+    :type path: string
+    :param id_map: A mapping of recorded ids to ids in the file, as returned
+        by a previous replay onto the same file when replaying logs in turn
+    :type id_map: dict
+    :param should_run_listeners: Whether API listeners run for replayed calls
+    :type should_run_listeners: bool
+    :return: The mapping of recorded ids to ids in the file
+    :rtype: dict
+    :raises ValueError: If an entity passed to a call is not found or does not
+        match the recorded entity
+    """
+    id_map = {} if id_map is None else id_map
+    header, entries = read_log(path)
+    if header.get("version") != Recorder.version:
+        raise ValueError("Unsupported operation log version %s" % header.get("version"))
+    if header.get("schema") != ifc_file.schema:
+        raise ValueError("Operation log of a %s file cannot be replayed onto %s" % (header["schema"], ifc_file.schema))
+    for entry in entries:
+        settings = {k: deserialise_value(ifc_file, v, id_map) for k, v in entry["settings"].items()}
+        result = ifcopenshell.api.run(entry["usecase"], ifc_file, should_run_listeners=should_run_listeners, **settings)
+        map_result(entry["result"], result, id_map)
+    return id_map
+
+
+def deserialise_value(ifc_file, value, id_map):
+    if isinstance(value, list):
+        return [deserialise_value(ifc_file, v, id_map) for v in value]
+    elif not isinstance(value, dict):
+        return value
+    cast_type = value.get("cast_type")
+    if cast_type == "entity_instance":
+        return get_entity(ifc_file, value, id_map)
+    elif cast_type == "ndarray":
+        return numpy.array(value["value"])
+    elif cast_type == "datetime":
+        return datetime.datetime.fromisoformat(value["value"])
+    elif cast_type == "date":
+        return datetime.date.fromisoformat(value["value"])
+    elif cast_type == "unsupported":
+        raise ValueError("Setting value %s was not serialisable and cannot be replayed" % value["value"])
+    return {k: deserialise_value(ifc_file, v, id_map) for k, v in value.items()}
+
+
+def get_entity(ifc_file, value, id_map):
+    entity_id = id_map.get(value["value"], value["value"])
+    try:
+        entity = ifc_file.by_id(entity_id)
+    except RuntimeError:
+        raise ValueError("Recorded %s #%d was not found as #%d" % (value["type"], value["value"], entity_id))
+    if entity.is_a() != value["type"]:
+        raise ValueError("Recorded %s #%d does not match %s" % (value["type"], value["value"], entity))
+    if value["GlobalId"] and getattr(entity, "GlobalId", None) != value["GlobalId"]:
+        raise ValueError(
+            "Recorded %s #%d with GlobalId %s does not match %s"
+            % (value["type"], value["value"], value["GlobalId"], entity)
+        )
+    return entity
+
+
+def map_result(recorded, result, id_map):
+    if isinstance(recorded, list) and isinstance(result, (list, tuple)):
+        for recorded_item, item in zip(recorded, result):
+            map_result(recorded_item, item, id_map)
+    elif isinstance(recorded, dict) and isinstance(result, ifcopenshell.entity_instance):
+        if result.id() != recorded["value"]:
+            id_map[recorded["value"]] = result.id()
+        else:
+            id_map.pop(recorded["value"], None)
+        if recorded["GlobalId"] and result.GlobalId != recorded["GlobalId"]:
+            result.GlobalId = recorded["GlobalId"]
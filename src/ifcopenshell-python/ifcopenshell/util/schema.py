@@ -1,6 +1,7 @@
 import os
 import json
 import time
+import functools
 import ifcopenshell
 
 # This is highly experimental and incomplete, however, it may work for simple datasets.
@@ -8,6 +9,24 @@ import ifcopenshell
 
 cwd = os.path.dirname(os.path.realpath(__file__))
 
+# Compiled migration plans, keyed by class, source schema and target schema
+migration_plans = {}
+
+
+@functools.lru_cache(maxsize=None)
+def load_json(filename):
+    with open(os.path.join(cwd, filename), "r") as f:
+        return json.load(f)
+
+
+@functools.lru_cache(maxsize=None)
+def get_declaration(schema, name):
+    """Return the declaration of a class or type in a schema, or None if it does not exist"""
+    try:
+        return ifcopenshell.ifcopenshell_wrapper.schema_by_name(schema).declaration_by_name(name)
+    except Exception:
+        return None
+
 
 def is_a(entity, ifc_class):
     ifc_class = ifc_class.lower()
@@ -51,10 +70,13 @@ def reassign_class(ifc_file, element, new_class):
 class Migrator:
     def __init__(self):
         self.migrated_ids = {}
-        self.class_4_to_2x3 = json.load(open(os.path.join(cwd, "class_4_to_2x3.json"), "r"))
+        # Maps ids of migrated instances to their new instance, or None if they could not be migrated
+        self.migrated = {}
+        self.unsupported_classes = set()
+        self.class_4_to_2x3 = load_json("class_4_to_2x3.json")
 
         # IFC4 classes, and their IFC4 attribute : IFC2X3 attributes
-        self.attribute_4_to_2x3 = json.load(open(os.path.join(cwd, "attribute_4_to_2x3.json"), "r"))
+        self.attribute_4_to_2x3 = load_json("attribute_4_to_2x3.json")
 
         self.default_values = {
             "ChangeAction": "NOCHANGE",
@@ -106,102 +128,155 @@ class Migrator:
         }
 
     def migrate(self, element, new_file):
-        try:
-            return new_file.by_id(self.migrated_ids[element.id()])
-        except:
-            pass
-        # print("Migrating", element)
-        schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(new_file.schema)
-        new_element = self.migrate_class(element, new_file)
-        # print("Migrated class from {} to {}".format(element, new_element))
-        new_element_schema = schema.declaration_by_name(new_element.is_a())
-        if not hasattr(new_element_schema, "all_attributes"):
-            return element  # The element has no attributes, so migration is done
-        new_element = self.migrate_attributes(element, new_file, new_element, new_element_schema)
-        self.migrated_ids[element.id()] = new_element.id()
-        return new_element
+        """Migrate an element and everything it references to another file
 
-    def migrate_class(self, element, new_file):
-        try:
-            new_element = new_file.create_entity(element.is_a())
-        except:
-            # The element does not exist in this schema
-            # Complex migration is not yet supported (e.g. polygonal face set to faceted brep)
-            if new_file.schema == "IFC2X3":
-                new_element = new_file.create_entity(self.class_4_to_2x3[element.is_a()])
-            elif new_file.schema == "IFC4":
-                print("Class migration to IFC4 not yet supported for", element)
-                pass
+        Referenced instances whose class has no equivalent in the new schema
+        are left out of aggregates and replaced by a default value, if there
+        is one, in required attributes.
+
+        :returns: The migrated element
+        :raises ValueError: If the class of the element, or of an instance it
+            requires, has no equivalent in the schema of the new file
+        """
+        if element.id() not in self.migrated:
+            self.migrate_graph(element, new_file, element.is_a(True).split(".")[0])
+        new_element = self.migrated[element.id()]
+        if new_element is None:
+            raise ValueError("Class {} has no equivalent in {}".format(element.is_a(), new_file.schema))
         return new_element
 
-    def migrate_attributes(self, element, new_file, new_element, new_element_schema):
-        for i, attribute in enumerate(new_element_schema.all_attributes()):
-            if new_element_schema.derived()[i]:
+    def migrate_file(self, ifc_file, new_file):
+        """Migrate all instances of a file to another file
+
+        Instances whose class has no equivalent in the new schema are not
+        migrated and are listed in unsupported_classes.
+
+        :raises ValueError: If an instance requires an instance that could
+            not be migrated and there is no default value to use instead
+        """
+        for element in ifc_file:
+            if element.id() not in self.migrated:
+                self.migrate_graph(element, new_file, ifc_file.schema)
+
+    def migrate_graph(self, element, new_file, source_schema):
+        # An iterative depth first traversal, so that an instance is created
+        # with all of its attributes at once after everything it references
+        attributes = list(element)
+        stack = [(element, attributes, self.get_references(attributes))]
+        visiting = {element.id()}
+        while stack:
+            element, attributes, references = stack[-1]
+            reference = next((r for r in references if r.id() not in self.migrated), None)
+            if reference is not None:
+                if reference.id() in visiting:
+                    raise ValueError("Instance {} has a cyclic reference to {}".format(element, reference))
+                visiting.add(reference.id())
+                reference_attributes = list(reference)
+                stack.append((reference, reference_attributes, self.get_references(reference_attributes)))
                 continue
-            self.migrate_attribute(attribute, element, new_file, new_element, new_element_schema)
-        return new_element
+            stack.pop()
+            visiting.discard(element.id())
 
-    def migrate_attribute(self, attribute, element, new_file, new_element, new_element_schema):
-        # print("Migrating attribute", element, new_element, attribute.name())
-        if hasattr(element, attribute.name()):
-            value = getattr(element, attribute.name())
-            # print("Attribute names matched", value)
-        elif new_file.schema == "IFC2X3":
-            # IFC4 to IFC2X3: We know the IFC2X3 attribute name, but not its IFC4 equivalent
-            # print("Searching for an equivalent", new_element, attribute.name())
-            try:
-                equivalent_map = self.attribute_4_to_2x3[new_element.is_a()]
-                equivalent = list(equivalent_map.keys())[list(equivalent_map.values()).index(attribute.name())]
-                if hasattr(element, equivalent):
-                    # print("Equivalent found", equivalent)
-                    value = getattr(element, equivalent)
-                else:
-                    return
-            except:
-                print(
-                    "Unable to find equivalent attribute of {} to migrate from {} to {}".format(
-                        attribute.name(), element, new_element
-                    )
-                )
-                return  # We tried our best
-        elif new_file.schema == "IFC4":
-            # IFC2X3 to IFC4: We know the IFC4 attribute name, but not its IFC2X3 equivalent
-            # print("Searching for an equivalent", element, new_element, attribute.name())
-            try:
-                equivalent = self.attribute_4_to_2x3[new_element.is_a()][attribute.name()]
-                # print("Searching for equivalent", equivalent)
-                if hasattr(element, equivalent):
-                    value = getattr(element, equivalent)
-                else:
-                    return
-            except:
-                print(
-                    "Unable to find equivalent attribute of {} to migrate from {} to {}".format(
-                        attribute.name(), element, new_element
-                    )
-                )
-                return  # We tried our best
-
-        # print("Continuing migration of {} to migrate from {} to {}".format(attribute.name(), element, new_element))
-        if value is None and not attribute.optional():
-            value = self.generate_default_value(attribute, new_file)
-            if value is None:
-                print("Failed to generate default value for {} on {}".format(attribute.name(), element))
+            new_class, plan = self.get_plan(element.is_a(), source_schema, new_file.schema)
+            if new_class is None:
+                self.unsupported_classes.add(element.is_a())
+                self.migrated[element.id()] = None
+                continue
+            values = []
+            for source_index, attribute, is_optional in plan:
+                value = None if source_index is None else attributes[source_index]
+                if value is not None:
+                    value = self.migrate_value(value, new_file)
+                    if value is None and not is_optional:
+                        # The value refers to an instance which could not be migrated
+                        value = self.generate_default_value(attribute, new_file)
+                        if value is None:
+                            raise ValueError(
+                                "Attribute {} of {} requires {} which has no equivalent in {}".format(
+                                    attribute.name(), element, attributes[source_index], new_file.schema
+                                )
+                            )
+                elif attribute is not None and not is_optional:
+                    value = self.generate_default_value(attribute, new_file)
+                values.append(value)
+            new_element = new_file.create_entity(new_class, *values)
+            self.migrated[element.id()] = new_element
+            self.migrated_ids[element.id()] = new_element.id()
+
+    def get_references(self, value):
+        if isinstance(value, (list, tuple)):
+            for v in value:
+                yield from self.get_references(v)
+        elif isinstance(value, ifcopenshell.entity_instance) and value.id():
+            yield value
+
+    def migrate_value(self, value, new_file):
+        if isinstance(value, (list, tuple)):
+            # Instances which could not be migrated are left out
+            return [v for v in (self.migrate_value(v, new_file) for v in value) if v is not None]
         elif isinstance(value, ifcopenshell.entity_instance):
-            value = self.migrate(value, new_file)
-        elif isinstance(value, (list, tuple)):
-            if value and isinstance(value[0], ifcopenshell.entity_instance):
-                new_value = []
-                for item in value:
-                    new_value.append(self.migrate(item, new_file))
-                value = new_value
-        setattr(new_element, attribute.name(), value)
+            if value.id():
+                return self.migrated[value.id()]
+            # Simple types of selects are kept if the new schema has them
+            if get_declaration(new_file.schema, value.is_a()) is None:
+                return self.migrate_value(value.wrappedValue, new_file)
+            return new_file.create_entity(value.is_a(), self.migrate_value(value.wrappedValue, new_file))
+        return value
+
+    def get_plan(self, ifc_class, source_schema, target_schema):
+        """Return the class and attribute plan to migrate instances of a class
+
+        The plan lists, for every attribute of the new class, the index of
+        the equivalent attribute of the old class, or None if there is no
+        equivalent or the attribute is derived, along with the attribute
+        declaration and whether it is optional. Plans are compiled once per
+        class and pair of schemas.
+
+        :returns: A tuple of the new class, or None if it has no equivalent,
+            and the list of attributes
+        :rtype: tuple
+        """
+        key = (ifc_class, source_schema, target_schema)
+        if key not in migration_plans:
+            migration_plans[key] = self.compile_plan(ifc_class, source_schema, target_schema)
+        return migration_plans[key]
+
+    def compile_plan(self, ifc_class, source_schema, target_schema):
+        new_class = ifc_class
+        if get_declaration(target_schema, ifc_class) is None:
+            # Complex migration is not yet supported (e.g. polygonal face set to faceted brep)
+            # Classes without an equivalent are mapped to an empty string
+            new_class = self.class_4_to_2x3.get(ifc_class) if target_schema == "IFC2X3" else None
+            if not new_class:
+                return None, []
+        new_declaration = get_declaration(target_schema, new_class)
+        if not hasattr(new_declaration, "all_attributes"):
+            return new_class, []
+
+        source_indices = {a.name(): i for i, a in enumerate(get_declaration(source_schema, ifc_class).all_attributes())}
+        equivalents = self.attribute_4_to_2x3.get(new_class, {})
+        if target_schema == "IFC2X3":
+            # IFC4 to IFC2X3: We know the IFC2X3 attribute name, but not its IFC4 equivalent
+            equivalents = {v: k for k, v in equivalents.items()}
+        elif target_schema != "IFC4":
+            equivalents = {}
+
+        plan = []
+        derived = new_declaration.derived()
+        for i, attribute in enumerate(new_declaration.all_attributes()):
+            if derived[i]:
+                plan.append((None, None, True))
+                continue
+            name = attribute.name()
+            source_index = source_indices.get(name, source_indices.get(equivalents.get(name)))
+            plan.append((source_index, attribute, attribute.optional()))
+        return new_class, plan
 
     def generate_default_value(self, attribute, new_file):
         if attribute.name() in self.default_values:
             return self.default_values[attribute.name()]
-        elif self.default_entities[attribute.name()]:
-            return self.default_entities[attribute.name()]
+        elif self.default_entities.get(attribute.name()):
+            return self.default_entities.get(attribute.name())
         elif attribute.name() == "OwnerHistory":
             self.default_entities[attribute.name()] = new_file.create_entity(
                 "IfcOwnerHistory",
@@ -230,4 +305,4 @@ class Migrator:
                     "CreationDate": int(time.time()),
                 },
             )
-        return self.default_entities[attribute.name()]
+        return self.default_entities.get(attribute.name())
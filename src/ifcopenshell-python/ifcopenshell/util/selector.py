@@ -1,110 +1,215 @@
+import functools
 import ifcopenshell.util
 import ifcopenshell.util.fm
 import ifcopenshell.util.element
 import lark
+from ifcopenshell.entity_instance import FORWARD, get_attribute_lookup
 
+grammar = """start: query (lfunction query)*
+    query: selector | group
+    group: "(" query (lfunction query)* ")"
+    selector: (inverse_relationship)? guid_selector | (inverse_relationship)? class_selector
+    guid_selector: "#" /[0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_$]{22}/
+    class_selector: "." WORD filter ?
+    filter: "[" filter_key (comparison filter_value)? "]"
+    filter_key: WORD | pset_or_qto
+    filter_value: ESCAPED_STRING
+    pset_or_qto: /[A-Za-z0-9_]+/ "." /[A-Za-z0-9_]+/
+    lfunction: and | or
+    inverse_relationship: types | contains_elements | boundedby
+    types: "*"
+    contains_elements: "@"
+    boundedby: "@@"
+    and: "&"
+    or: "|"
+    comparison: contains | morethanequalto | lessthanequalto | equal | morethan | lessthan
+    contains: "*="
+    morethanequalto: ">="
+    lessthanequalto: "<"
+    equal: "="
+    morethan: ">"
+    lessthan: "<"
 
-class Selector:
-    def parse(self, ifc_file, query):
-        self.file = ifc_file
+    // Embed common.lark for packaging
+    DIGIT: "0".."9"
+    HEXDIGIT: "a".."f"|"A".."F"|DIGIT
+    INT: DIGIT+
+    SIGNED_INT: ["+"|"-"] INT
+    DECIMAL: INT "." INT? | "." INT
+    _EXP: ("e"|"E") SIGNED_INT
+    FLOAT: INT _EXP | DECIMAL _EXP?
+    SIGNED_FLOAT: ["+"|"-"] FLOAT
+    NUMBER: FLOAT | INT
+    SIGNED_NUMBER: ["+"|"-"] NUMBER
+    _STRING_INNER: /.*?/
+    _STRING_ESC_INNER: _STRING_INNER /(?<!\\\\)(\\\\\\\\)*?/
+    ESCAPED_STRING : "\\"" _STRING_ESC_INNER "\\""
+    LCASE_LETTER: "a".."z"
+    UCASE_LETTER: "A".."Z"
+    LETTER: UCASE_LETTER | LCASE_LETTER
+    WORD: LETTER+
+    CNAME: ("_"|LETTER) ("_"|LETTER|DIGIT)*
+    WS_INLINE: (" "|/\\t/)+
+    WS: /[ \\t\\f\\r\\n]/+
+    CR : /\\r/
+    LF : /\\n/
+    NEWLINE: (CR? LF)+
 
-        l = lark.Lark(
-            """start: query (lfunction query)*
-                    query: selector | group
-                    group: "(" query (lfunction query)* ")"
-                    selector: (inverse_relationship)? guid_selector | (inverse_relationship)? class_selector
-                    guid_selector: "#" /[0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_$]{22}/
-                    class_selector: "." WORD filter ?
-                    filter: "[" filter_key (comparison filter_value)? "]"
-                    filter_key: WORD | pset_or_qto
-                    filter_value: ESCAPED_STRING
-                    pset_or_qto: /[A-Za-z0-9_]+/ "." /[A-Za-z0-9_]+/
-                    lfunction: and | or
-                    inverse_relationship: types | contains_elements | boundedby
-                    types: "*"
-                    contains_elements: "@"
-                    boundedby: "@@"
-                    and: "&"
-                    or: "|"
-                    comparison: contains | morethanequalto | lessthanequalto | equal | morethan | lessthan
-                    contains: "*="
-                    morethanequalto: ">="
-                    lessthanequalto: "<"
-                    equal: "="
-                    morethan: ">"
-                    lessthan: "<"
-
-                    // Embed common.lark for packaging
-                    DIGIT: "0".."9"
-                    HEXDIGIT: "a".."f"|"A".."F"|DIGIT
-                    INT: DIGIT+
-                    SIGNED_INT: ["+"|"-"] INT
-                    DECIMAL: INT "." INT? | "." INT
-                    _EXP: ("e"|"E") SIGNED_INT
-                    FLOAT: INT _EXP | DECIMAL _EXP?
-                    SIGNED_FLOAT: ["+"|"-"] FLOAT
-                    NUMBER: FLOAT | INT
-                    SIGNED_NUMBER: ["+"|"-"] NUMBER
-                    _STRING_INNER: /.*?/
-                    _STRING_ESC_INNER: _STRING_INNER /(?<!\\\\)(\\\\\\\\)*?/
-                    ESCAPED_STRING : "\\"" _STRING_ESC_INNER "\\""
-                    LCASE_LETTER: "a".."z"
-                    UCASE_LETTER: "A".."Z"
-                    LETTER: UCASE_LETTER | LCASE_LETTER
-                    WORD: LETTER+
-                    CNAME: ("_"|LETTER) ("_"|LETTER|DIGIT)*
-                    WS_INLINE: (" "|/\\t/)+
-                    WS: /[ \\t\\f\\r\\n]/+
-                    CR : /\\r/
-                    LF : /\\n/
-                    NEWLINE: (CR? LF)+
-
-                    %ignore WS // Disregard spaces in text
-                 """
-        )
-
-        start = l.parse(query)
-        return self.get_group(start)
-
-    def get_group(self, group):
-        lfunction = None
-        for child in group.children:
-            if child.data == "query":
-                new_results = self.get_query(child)
-                if not lfunction:
-                    results = new_results
-                elif lfunction == "or":
-                    results.extend(new_results)
-                elif lfunction == "and":
-                    results = list(set(results).intersection(new_results))
-                results = list(set(results))
-            elif child.data == "lfunction":
-                lfunction = child.children[0].data
-        return results
+    %ignore WS // Disregard spaces in text
+"""
+
+parser = lark.Lark(grammar)
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_query(query):
+    """Parse a query and compile it into a plan, caching the plan per query string
+
+    A plan is a function which takes a Selector and returns the list of
+    matching elements. Parsing, filter key splitting and value conversion
+    therefore only happen once per distinct query.
+    """
+    return compile_group(parser.parse(query))
+
+
+def compile_group(group):
+    plans = []
+    lfunction = None
+    for child in group.children:
+        if child.data == "query":
+            plans.append((lfunction, compile_query_node(child)))
+        elif child.data == "lfunction":
+            lfunction = child.children[0].data
+
+    def execute(selector):
+        results = {}
+        for lfunction, plan in plans:
+            new_results = plan(selector)
+            if lfunction == "and":
+                new_results = set(new_results)
+                results = {e: None for e in results if e in new_results}
+            else:
+                results.update((e, None) for e in new_results)
+        return list(results)
+
+    return execute
+
+
+def compile_query_node(query):
+    for child in query.children:
+        if child.data == "selector":
+            return compile_selector(child)
+        elif child.data == "group":
+            return compile_group(child)
+
+
+def compile_selector(selector):
+    if len(selector.children) == 1:
+        inverse_relationship = None
+        class_or_guid_selector = selector.children[0]
+    else:
+        inverse_relationship = selector.children[0].children[0].data
+        class_or_guid_selector = selector.children[1]
+
+    if class_or_guid_selector.data == "class_selector":
+        plan = compile_class_selector(class_or_guid_selector)
+    elif class_or_guid_selector.data == "guid_selector":
+        guid = str(class_or_guid_selector.children[0])
+        plan = lambda selector: [selector.file.by_guid(guid)]
+
+    if not inverse_relationship:
+        return plan
+    return lambda selector: selector.parse_inverse_relationship(plan(selector), inverse_relationship)
+
+
+def compile_class_selector(class_selector):
+    ifc_class = str(class_selector.children[0])
+    if ifc_class == "COBie":
+        get_elements = ifcopenshell.util.fm.get_cobie_components
+    elif ifc_class == "COBieType":
+        get_elements = ifcopenshell.util.fm.get_cobie_types
+    elif ifc_class == "FMHEM":
+        get_elements = ifcopenshell.util.fm.get_fmhem_types
+    else:
+        get_elements = lambda ifc_file: ifc_file.by_type(ifc_class)
 
-    def get_query(self, query):
-        for child in query.children:
-            if child.data == "selector":
-                return self.get_selector(child)
-            elif child.data == "group":
-                return self.get_group(child)
-
-    def get_selector(self, selector):
-        if len(selector.children) == 1:
-            inverse_relationship = None
-            class_or_guid_selector = selector.children[0]
-        else:
-            inverse_relationship = selector.children[0]
-            class_or_guid_selector = selector.children[1]
-
-        if class_or_guid_selector.data == "class_selector":
-            results = self.get_class_selector(class_or_guid_selector)
-        elif class_or_guid_selector.data == "guid_selector":
-            results = self.get_guid_selector(class_or_guid_selector)
-
-        if not inverse_relationship:
-            return results
-        return self.parse_inverse_relationship(results, inverse_relationship.children[0].data)
+    if len(class_selector.children) > 1 and class_selector.children[1].data == "filter":
+        predicate, lookup = compile_filter(class_selector.children[1])
+
+        def execute(selector):
+            ids = lookup(selector) if lookup else None
+            if ids is None:
+                return [e for e in get_elements(selector.file) if predicate(selector, e)]
+            elif ifc_class in ("COBie", "COBieType", "FMHEM"):
+                return [e for e in get_elements(selector.file) if e.id() in ids]
+            elements = (selector.file.by_id(i) for i in sorted(ids))
+            return [e for e in elements if e.is_a(ifc_class)]
+
+        return execute
+    return lambda selector: get_elements(selector.file)
+
+
+def compile_filter(filter_rule):
+    """Compile a filter into a predicate and an optional index lookup
+
+    The lookup takes a Selector and returns the ids of all matching elements
+    using its PsetIndex, or None if the selector has no index.
+    """
+    key = filter_rule.children[0].children[0]
+    if not isinstance(key, str):
+        key = key.children[0] + "." + key.children[1]
+    key = str(key)
+    if len(filter_rule.children) == 1:
+        return (lambda selector, element: selector.get_element_value(element, key) is not None), None
+
+    comparison = filter_rule.children[1].children[0].data
+    value = filter_rule.children[2].children[0][1:-1]
+    lookup = None
+    if comparison == "equal" and "." in key and key.split(".")[0] not in ("type", "material", "container"):
+        pset_name, prop_name = key.split(".")
+
+        def lookup(selector):
+            if selector.pset_index is None:
+                return None
+            ids = set()
+            for element_value, element_ids in selector.pset_index.get_values(pset_name, prop_name).items():
+                if element_value is not None and str(element_value) == value:
+                    ids.update(element_ids)
+            return ids
+
+    if comparison == "equal":
+        compare = lambda element_value: str(element_value) == value
+    elif comparison == "contains":
+        compare = lambda element_value: value in str(element_value)
+    else:
+        try:
+            number = float(value)
+        except ValueError:
+            # Preserve the error of an invalid number for when an element is actually compared
+            number = value
+        compare = {
+            "morethan": lambda element_value: element_value > float(number),
+            "lessthan": lambda element_value: element_value < float(number),
+            "morethanequalto": lambda element_value: element_value >= float(number),
+            "lessthanequalto": lambda element_value: element_value <= float(number),
+        }.get(comparison, lambda element_value: False)
+
+    def predicate(selector, element):
+        element_value = selector.get_element_value(element, key)
+        return element_value is not None and compare(element_value)
+
+    return predicate, lookup
+
+
+class Selector:
+    def parse(self, ifc_file, query, pset_index=None):
+        if pset_index is not None and pset_index.should_inherit:
+            # Without an index, occurrences do not inherit the properties of their type either
+            raise ValueError("A selector requires a PsetIndex built with should_inherit=False")
+        self.file = ifc_file
+        self.psets = {}
+        self.pset_index = pset_index
+        return compile_query(query)(self)
 
     def parse_inverse_relationship(self, elements, inverse_relationship):
         results = []
@@ -122,36 +227,6 @@ class Selector:
                     results.append(relationship.RelatedBuildingElement)
         return results
 
-    def get_class_selector(self, class_selector):
-        if class_selector.children[0] == "COBie":
-            elements = ifcopenshell.util.fm.get_cobie_components(self.file)
-        elif class_selector.children[0] == "COBieType":
-            elements = ifcopenshell.util.fm.get_cobie_types(self.file)
-        elif class_selector.children[0] == "FMHEM":
-            elements = ifcopenshell.util.fm.get_fmhem_types(self.file)
-        else:
-            elements = self.file.by_type(class_selector.children[0])
-        if len(class_selector.children) > 1 and class_selector.children[1].data == "filter":
-            return self.filter_elements(elements, class_selector.children[1])
-        return elements
-
-    def filter_elements(self, elements, filter_rule):
-        results = []
-        key = filter_rule.children[0].children[0]
-        if not isinstance(key, str):
-            key = key.children[0] + "." + key.children[1]
-        comparison = value = None
-        if len(filter_rule.children) > 1:
-            comparison = filter_rule.children[1].children[0].data
-            value = filter_rule.children[2].children[0][1:-1]
-        for element in elements:
-            element_value = self.get_element_value(element, key)
-            if element_value is None:
-                continue
-            if not comparison or self.filter_element(element, element_value, comparison, value):
-                results.append(element)
-        return results
-
     def get_element_value(self, element, key):
         if "." in key and key.split(".")[0] == "type":
             try:
@@ -177,29 +252,26 @@ class Selector:
             except:
                 return
             key = ".".join(key.split(".")[1:])
-        info = element.get_info()
-        if key in info:
-            return info[key]
+        if key == "id":
+            return element.id()
+        elif key == "type":
+            return element.is_a()
+        attribute = get_attribute_lookup(element.wrapped_data).get(key)
+        if attribute and attribute[0] == FORWARD:
+            return element[attribute[1]]
         elif "." in key:
             pset_name, prop = key.split(".")
-            psets = ifcopenshell.util.element.get_psets(element)
+            psets = self.get_psets(element)
             if pset_name in psets and prop in psets[pset_name]:
                 return psets[pset_name][prop]
 
-    def filter_element(self, element, element_value, comparison, value):
-        if comparison == "equal":
-            return str(element_value) == value
-        elif comparison == "contains":
-            return value in str(element_value)
-        elif comparison == "morethan":
-            return element_value > float(value)
-        elif comparison == "lessthan":
-            return element_value < float(value)
-        elif comparison == "morethanequalto":
-            return element_value >= float(value)
-        elif comparison == "lessthanequalto":
-            return element_value <= float(value)
-        return False
-
-    def get_guid_selector(self, guid_selector):
-        return [self.file.by_id(guid_selector.children[0])]
+    def get_psets(self, element):
+        if getattr(self, "pset_index", None) is not None:
+            return self.pset_index.get_psets(element)
+        cache = getattr(self, "psets", None)
+        if cache is None:
+            return ifcopenshell.util.element.get_psets(element)
+        psets = cache.get(element)
+        if psets is None:
+            psets = cache[element] = ifcopenshell.util.element.get_psets(element)
+        return psets
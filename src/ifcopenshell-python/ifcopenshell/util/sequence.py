@@ -1,3 +1,4 @@
+import math
 import datetime
 import ifcopenshell.util.date
 from functools import lru_cache
@@ -131,3 +132,163 @@ def is_work_time_applicable_to_day(work_time, day):
                 and math.floor(day.day / 7) + 1 == recurrence.Position
             )
         return False  # TODO
+
+
+def get_work_time_filter(work_time):
+    """Compile a work time into a function of a day, equivalent to is_work_time_applicable_to_day
+
+    The dates and recurrence pattern of the work time are only read once,
+    which makes the function suitable to evaluate many days.
+    """
+    start = ifcopenshell.util.date.ifc2datetime(work_time.Start) if work_time.Start else None
+    finish = ifcopenshell.util.date.ifc2datetime(work_time.Finish) if work_time.Finish else None
+    recurrence = work_time.RecurrencePattern
+
+    if not recurrence:
+        is_recurring = lambda day: True
+    elif recurrence.Interval or recurrence.Occurrences:
+        is_recurring = lambda day: False  # TODO
+    else:
+        weekdays = set(recurrence.WeekdayComponent or ())
+        days = set(recurrence.DayComponent or ())
+        months = set(recurrence.MonthComponent or ())
+        position = recurrence.Position
+        recurrence_type = recurrence.RecurrenceType
+        if recurrence_type == "DAILY":
+            is_recurring = lambda day: True
+        elif recurrence_type == "WEEKLY":
+            is_recurring = lambda day: (day.weekday() + 1) in weekdays
+        elif recurrence_type == "MONTHLY_BY_DAY_OF_MONTH":
+            is_recurring = lambda day: day.day in days
+        elif recurrence_type == "MONTHLY_BY_POSITION":
+            is_recurring = lambda day: (day.weekday() + 1) in weekdays and math.floor(day.day / 7) + 1 == position
+        elif recurrence_type == "YEARLY_BY_DAY_OF_MONTH":
+            is_recurring = lambda day: day.month in months and day.day in days
+        elif recurrence_type == "YEARLY_BY_POSITION":
+            is_recurring = lambda day: (
+                day.month in months and (day.weekday() + 1) in weekdays and math.floor(day.day / 7) + 1 == position
+            )
+        else:
+            is_recurring = lambda day: False
+
+    def is_applicable(day):
+        if start is not None and start > day:
+            return False
+        if finish is not None and finish < day:
+            return False
+        return is_recurring(day)
+
+    return is_applicable
+
+
+class WorkingDayIndex:
+    """An index of the working days of a calendar over a range of dates
+
+    Every day in the range is evaluated against the working and exception
+    times of the calendar once. Working days are then counted in constant
+    time using prefix sums, and dates are offset by a number of working days
+    in constant time using the list of working days. The range grows automatically when a query falls
+    outside of it. Create one index per calendar and reuse it for all tasks
+    of a schedule. Changes to the calendar are not detected.
+
+    Example::
+
+        index = ifcopenshell.util.sequence.WorkingDayIndex(calendar, start=datetime.date(2021, 1, 1))
+        index.count_working_days(datetime.date(2021, 1, 1), datetime.date(2021, 2, 1))
+        index.get_finish_date(datetime.date(2021, 1, 1), datetime.timedelta(days=10))
+    """
+
+    # The range is never grown beyond this, in case the calendar has no working days
+    max_days = 365 * 200
+
+    def __init__(self, calendar, start=None, finish=None):
+        self.calendar = calendar
+        self.working_times = [get_work_time_filter(w) for w in calendar.WorkingTimes or []]
+        self.exception_times = [get_work_time_filter(w) for w in calendar.ExceptionTimes or []]
+        start = self.to_date(start) if start else datetime.date.today()
+        finish = self.to_date(finish) if finish else start + datetime.timedelta(days=365)
+        self.build(start, max(finish, start + datetime.timedelta(days=1)))
+
+    def to_date(self, day):
+        return datetime.date(day.year, day.month, day.day)
+
+    def build(self, start, finish):
+        self.start = start
+        self.finish = finish
+        # working_days[i] is the offset from the start of the i-th working day
+        self.working_days = []
+        # counts[i] is the number of working days before the i-th day
+        self.counts = [0]
+        day = start
+        for offset in range((finish - start).days):
+            if any(w(day) for w in self.working_times) and not any(w(day) for w in self.exception_times):
+                self.working_days.append(offset)
+            self.counts.append(len(self.working_days))
+            day += datetime.timedelta(days=1)
+
+    def extend(self, start=None, finish=None):
+        span = self.finish - self.start
+        start = min(self.start, start - span) if start else self.start
+        finish = max(self.finish, finish + span) if finish else self.finish
+        if (finish - start).days > self.max_days:
+            raise ValueError("Calendar {} has too few working days to resolve the date".format(self.calendar))
+        self.build(start, finish)
+
+    def get_offset(self, day):
+        day = self.to_date(day)
+        if day < self.start:
+            self.extend(start=day)
+        elif day >= self.finish:
+            self.extend(finish=day)
+        return (day - self.start).days
+
+    def is_working_day(self, day):
+        offset = self.get_offset(day)
+        return self.counts[offset + 1] > self.counts[offset]
+
+    def count_working_days(self, start, finish):
+        """Count the working days from the start up to but excluding the finish, like count_working_days()"""
+        if self.to_date(finish) <= self.to_date(start):
+            return 0
+        # Grow the range to cover both dates before looking up their offsets
+        self.get_offset(start)
+        self.get_offset(finish)
+        return self.counts[self.get_offset(finish)] - self.counts[self.get_offset(start)]
+
+    def get_working_day(self, day, n):
+        """Return a working day relative to a day
+
+        :param n: 0 for the first working day on or after the day, 1 for the
+            next working day after that, and so on. -1 for the last working
+            day on or before the day, -2 for the one before that, and so on.
+        """
+        while True:
+            offset = self.get_offset(day)
+            if n >= 0:
+                index = self.counts[offset] + n
+                if index < len(self.working_days):
+                    break
+                self.extend(finish=self.finish)
+            else:
+                index = self.counts[offset + 1] + n
+                if index >= 0:
+                    break
+                self.extend(start=self.start)
+        return self.start + datetime.timedelta(days=self.working_days[index])
+
+    def get_finish_date(self, start, duration, duration_type="WORKTIME"):
+        """Offset a date by a duration, like get_finish_date() with this calendar"""
+        start = self.to_date(start)
+        if duration_type == "ELAPSEDTIME":
+            return start + datetime.timedelta(days=duration.days)
+        return self.get_working_day(start, duration.days if duration.days > 0 else duration.days - 1)
+
+    def get_soonest_working_day(self, start, duration_type="WORKTIME"):
+        if duration_type == "ELAPSEDTIME":
+            return start
+        return self.get_working_day(start, 0)
+
+    def get_recent_working_day(self, start, duration_type="WORKTIME"):
+        if duration_type == "ELAPSEDTIME":
+            return start
+        return self.get_working_day(start, -1)
@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def get_array(geometry, name, dtype, width, copy=True):
+    """Return a triangulation buffer as a NumPy array with rows of a given width
+
+    Native triangulations expose zero-copy views through <name>_buffer(). A
+    view does not keep the triangulation alive: triangulations of iterator
+    elements are owned by the native iterator and are freed when it advances,
+    regardless of any Python references. The buffer is therefore copied by
+    default. Pass copy=False for a view only if it is consumed before the
+    iterator advances or the shape is released. Other geometry, such as
+    cached shapes, is converted from its tuple representation.
+    """
+    buffer = getattr(geometry, name + "_buffer", None)
+    if buffer is None:
+        array = np.array(getattr(geometry, name), dtype=dtype)
+    else:
+        array = np.frombuffer(buffer(), dtype=dtype)
+        if copy:
+            array = array.copy()
+    return array.reshape(-1, width) if width > 1 else array
+
+
+def get_vertices(geometry, copy=True):
+    return get_array(geometry, "verts", np.float64, 3, copy)
+
+
+def get_normals(geometry, copy=True):
+    return get_array(geometry, "normals", np.float64, 3, copy)
+
+
+def get_faces(geometry, copy=True):
+    return get_array(geometry, "faces", np.int32, 3, copy)
+
+
+def get_edges(geometry, copy=True):
+    return get_array(geometry, "edges", np.int32, 2, copy)
+
+
+def get_material_ids(geometry, copy=True):
+    return get_array(geometry, "material_ids", np.int32, 1, copy)
@@ -40,6 +40,22 @@ class json_logger:
         return functools.partial(self.log, level, instance=self.instance)
 
 
+class json_stream_logger(json_logger):
+    """A json_logger which writes every statement as a line of JSON to a stream
+    rather than keeping them in memory, so that memory use does not grow with
+    the number of errors."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+        self.instance = None
+
+    def log(self, level, message, *args, **kwargs):
+        statement = log_entry_type(level, message % args, kwargs.get("instance"))._asdict()
+        self.stream.write(json.dumps(statement, default=str) + "\n")
+        self.count += 1
+
+
 simple_type_python_mapping = {
     # @todo should include unicode for Python2
     "string": str,
@@ -113,6 +129,151 @@ def try_valid(attr, val, schema):
         return False
 
 
+compiled_types = {}
+entity_validators = {}
+
+
+def compile_valid(attr, schema):
+    """Compile assert_valid() for an attribute or type into a function of the
+    value only, which raises the same ValidationError as assert_valid()."""
+    if isinstance(attr, attribute):
+        attr_type = attr.type_of_attribute()
+    else:
+        attr_type = attr
+
+    instance_type = value_type = attr_type
+    while isinstance(instance_type, named_type):
+        instance_type = instance_type.declared_type()
+    while isinstance(value_type, (named_type, type_declaration)):
+        value_type = value_type.declared_type()
+    is_valid_instance = compile_type(instance_type, schema)
+    is_valid_value = compile_type(value_type, schema)
+    description = str(attr)
+
+    def check(val):
+        if isinstance(val, ifcopenshell.entity_instance):
+            invalid = not is_valid_instance(val)
+        else:
+            invalid = not is_valid_value(val)
+        if invalid:
+            raise ValidationError("%r not valid for %s" % (val, description))
+        return True
+
+    return check
+
+
+def compile_type(attr_type, schema):
+    if isinstance(attr_type, (select_type, enumeration_type)):
+        key = (schema.name(), attr_type.name())
+        if key not in compiled_types:
+            compiled_types[key] = compile_named_type(attr_type, schema)
+        return compiled_types[key]
+
+    if isinstance(attr_type, simple_type):
+        python_type = simple_type_python_mapping[attr_type.declared_type()]
+        return lambda val: type(val) == python_type
+    elif isinstance(attr_type, (entity_type, type_declaration)):
+        name = attr_type.name()
+        return lambda val: isinstance(val, ifcopenshell.entity_instance) and val.is_a(name)
+    elif isinstance(attr_type, aggregation_type):
+        b1, b2 = attr_type.bound1(), attr_type.bound2()
+        check = compile_valid(attr_type.type_of_element(), schema)
+        return lambda val: not (len(val) < b1 or (b2 != -1 and len(val) > b2) or not all(check(v) for v in val))
+
+    def not_implemented(val):
+        raise NotImplementedError("Not impl %s %s" % (type(attr_type), attr_type))
+
+    return not_implemented
+
+
+def compile_named_type(attr_type, schema):
+    if isinstance(attr_type, enumeration_type):
+        items = attr_type.enumeration_items()
+        return lambda val: val in items
+
+    checks = [compile_valid(x, schema) for x in attr_type.select_list()]
+    is_enumeration = {}
+
+    def try_check(check, val):
+        try:
+            return check(val)
+        except ValidationError:
+            return False
+
+    def is_valid(val):
+        name = val.is_a()
+        if name not in is_enumeration:
+            is_enumeration[name] = isinstance(schema.declaration_by_name(name), enumeration_type)
+        if is_enumeration[name]:
+            if not isinstance(val, ifcopenshell.entity_instance):
+                return False
+            val = val.wrappedValue
+        return any(try_check(check, val) for check in checks)
+
+    return is_valid
+
+
+def get_entity_validator(schema, name):
+    """Return a function validating an instance of an entity, which is
+    compiled once per entity declaration.
+
+    The function takes the instance and a logger, and a flag whether the
+    logger keeps track of the instance (see json_logger.set_instance).
+    """
+    key = (schema.name(), name)
+    if key in entity_validators:
+        return entity_validators[key]
+
+    entity = schema.declaration_by_name(name)
+    attrs = entity.all_attributes()
+    derived = entity.derived()
+    checks = [compile_valid(attr, schema) for attr in attrs]
+    is_required = [not (val_is_derived or attr.optional()) for attr, val_is_derived in zip(attrs, derived)]
+    inverses = [(attr, attr.name(), attr.bound1(), attr.bound2()) for attr in entity.all_inverse_attributes()]
+    abstract_error = "Entity %s is abstract" % entity.name() if entity.is_abstract() else None
+
+    def log_error(inst, logger, has_instance, error):
+        if has_instance:
+            logger.error(str(error))
+        else:
+            logger.error("In %s\n%s", inst, error)
+
+    def validate_instance(inst, logger, has_instance):
+        if abstract_error:
+            log_error(inst, logger, has_instance, abstract_error)
+
+        values = []
+        has_invalid_value = False
+        for i, attr in enumerate(attrs):
+            try:
+                values.append(inst[i])
+            except:
+                if has_instance:
+                    logger.error("Invalid attribute value for %s.%s", entity, attr)
+                else:
+                    logger.error("In %s\nInvalid attribute value for %s.%s", inst, entity, attr)
+                has_invalid_value = True
+
+        if not has_invalid_value:
+            for attr, val, check, required in zip(attrs, values, checks, is_required):
+                if val is None:
+                    if required:
+                        logger.error("Attribute %s.%s not optional", entity, attr)
+                else:
+                    try:
+                        check(val)
+                    except ValidationError as e:
+                        log_error(inst, logger, has_instance, e)
+
+        for attr, attr_name, b1, b2 in inverses:
+            val = getattr(inst, attr_name)
+            if len(val) < b1 or (b2 != -1 and len(val) > b2):
+                log_error(inst, logger, has_instance, ValidationError("%r not valid for %s" % (val, attr)))
+
+    entity_validators[key] = validate_instance
+    return validate_instance
+
+
 def validate(f, logger):
     """
     For an IFC population model `f` validate whether the entity attribute values are correctly supplied. As this
@@ -130,62 +291,83 @@ def validate(f, logger):
     unpacked until one of the above cases is reached.
     """
     schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(f.schema)
+    has_instance = hasattr(logger, "set_instance")
     for inst in f:
-        if hasattr(logger, "set_instance"):
+        if has_instance:
             logger.set_instance(inst)
+        get_entity_validator(schema, inst.is_a())(inst, logger, has_instance)
 
-        entity = schema.declaration_by_name(inst.is_a())
-        attrs = entity.all_attributes()
 
-        if entity.is_abstract():
-            e = "Entity %s is abstract" % entity.name()
-            if hasattr(logger, "set_instance"):
-                logger.error(e)
-            else:
-                logger.error("In %s\n%s", inst, e)
+class collecting_logger(json_logger):
+    """Collects statements as plain tuples, so that they can be sent across processes"""
 
-        has_invalid_value = False
-        for i in range(len(attrs)):
-            try:
-                inst[i]
-                pass
-            except:
-                if hasattr(logger, "set_instance"):
-                    logger.error("Invalid attribute value for %s.%s", entity, attrs[i])
-                else:
-                    logger.error(
-                        "In %s\nInvalid attribute value for %s.%s",
-                        inst,
-                        entity,
-                        attrs[i],
-                    )
-                has_invalid_value = True
+    def log(self, level, message, *args, **kwargs):
+        instance = kwargs.get("instance")
+        self.statements.append((level, message % args, None if instance is None else str(instance)))
 
-        if not has_invalid_value:
-            for attr, val, is_derived in zip(attrs, inst, entity.derived()):
 
-                if val is None and not (is_derived or attr.optional()):
-                    logger.error("Attribute %s.%s not optional", entity, attr)
+worker_state = {}
 
-                if val is not None:
-                    attr_type = attr.type_of_attribute()
-                    try:
-                        assert_valid(attr, val, schema)
-                    except ValidationError as e:
-                        if hasattr(logger, "set_instance"):
-                            logger.error(str(e))
-                        else:
-                            logger.error("In %s\n%s", inst, e)
 
-        for attr in entity.all_inverse_attributes():
-            val = getattr(inst, attr.name())
-            try:
-                assert_valid_inverse(attr, val, schema)
-            except ValidationError as e:
-                if hasattr(logger, "set_instance"):
-                    logger.error(str(e))
+def init_worker(filename):
+    f = ifcopenshell.open(filename)
+    worker_state["file"] = f
+    worker_state["ids"] = sorted(f.wrapped_data.entity_names())
+    worker_state["schema"] = ifcopenshell.ifcopenshell_wrapper.schema_by_name(f.schema)
+
+
+def count_instances():
+    return len(worker_state["ids"])
+
+
+def validate_range(args):
+    start, stop = args
+    f = worker_state["file"]
+    schema = worker_state["schema"]
+    logger = collecting_logger()
+    for id in worker_state["ids"][start:stop]:
+        inst = f[id]
+        logger.set_instance(inst)
+        get_entity_validator(schema, inst.is_a())(inst, logger, True)
+    return logger.statements
+
+
+def validate_parallel(filename, logger, num_processes=None, chunk_size=1024):
+    """
+    Validate a file like validate(), using a pool of worker processes which
+    each open the file once and then validate small ranges of instance ids.
+
+    Statements are passed to the logger in the order of the instance ids as
+    soon as the range they belong to is validated, so only the statements of
+    a few ranges are held in memory at a time. For loggers which keep track of
+    the instance (see json_logger.set_instance) the instance is passed as its
+    string representation.
+
+    :param filename: The path to the IFC file
+    :type filename: string
+    :param logger: A logger such as json_logger, json_stream_logger or a logging.Logger
+    :param num_processes: The number of worker processes, defaults to the number of CPUs
+    :type num_processes: None|int
+    :param chunk_size: The number of instances validated by a worker at a time
+    :type chunk_size: int
+    """
+    import os
+    import multiprocessing
+
+    num_processes = num_processes or os.cpu_count() or 1
+    has_instance = hasattr(logger, "set_instance")
+    with multiprocessing.Pool(num_processes, init_worker, (os.path.abspath(filename),)) as pool:
+        num_instances = pool.apply(count_instances)
+        ranges = ((start, start + chunk_size) for start in range(0, num_instances, chunk_size))
+        for statements in pool.imap(validate_range, ranges):
+            for level, message, instance in statements:
+                if has_instance:
+                    logger.set_instance(instance)
+                    getattr(logger, level)("%s", message)
+                elif instance is None:
+                    getattr(logger, level)("%s", message)
                 else:
-                    logger.error("In %s\n%s", inst, e)
+                    getattr(logger, level)("In %s\n%s", instance, message)
 
 
 if __name__ == "__main__":
@@ -197,15 +379,13 @@ if __name__ == "__main__":
 
     for fn in filenames:
         if "--json" in flags:
-            logger = json_logger()
+            logger = json_stream_logger(sys.stdout)
         else:
             logger = logging.getLogger("validate")
             logger.setLevel(logging.DEBUG)
 
-        f = ifcopenshell.open(fn)
-
         print("Validating", fn, file=sys.stderr)
-        validate(f, logger)
-
-        if "--json" in flags:
-            print("\n".join(json.dumps(x, default=str) for x in logger.statements))
+        if "--parallel" in flags:
+            validate_parallel(fn, logger)
+        else:
+            validate(ifcopenshell.open(fn), logger)
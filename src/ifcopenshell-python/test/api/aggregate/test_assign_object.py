@@ -0,0 +1,52 @@
+import pytest
+import test.bootstrap
+import ifcopenshell.api
+import ifcopenshell.util.element
+
+
+class TestAssignObject(test.bootstrap.IFC4):
+    def test_assigning_an_object(self):
+        element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuilding")
+        subelement = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuildingStorey")
+        rel = ifcopenshell.api.run("aggregate.assign_object", self.file, product=subelement, relating_object=element)
+        assert rel.RelatedObjects == (subelement,)
+        assert ifcopenshell.util.element.get_aggregate(subelement) == element
+
+    def test_that_multiple_products_are_moved_out_of_their_old_aggregates(self):
+        element1 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuilding")
+        element2 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuilding")
+        element3 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuilding")
+        subelements = [
+            ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuildingStorey") for i in range(3)
+        ]
+        ifcopenshell.api.run("aggregate.assign_object", self.file, products=subelements[0:2], relating_object=element1)
+        ifcopenshell.api.run("aggregate.assign_object", self.file, product=subelements[2], relating_object=element2)
+        rel1 = element1.IsDecomposedBy[0]
+        rel2_id = element2.IsDecomposedBy[0].id()
+        rel = ifcopenshell.api.run(
+            "aggregate.assign_object",
+            self.file,
+            products=[subelements[0], subelements[2]],
+            relating_object=element3,
+        )
+        assert rel1.RelatedObjects == (subelements[1],)
+        with pytest.raises(RuntimeError):
+            self.file.by_id(rel2_id)
+        assert set(rel.RelatedObjects) == {subelements[0], subelements[2]}
+        assert element3.IsDecomposedBy == (rel,)
+        assert [ifcopenshell.util.element.get_aggregate(e) for e in subelements] == [element3, element1, element3]
+
+    def test_that_already_aggregated_products_are_skipped_when_assigning_multiple_products(self):
+        element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuilding")
+        subelements = [
+            ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuildingStorey") for i in range(2)
+        ]
+        ifcopenshell.api.run("aggregate.assign_object", self.file, product=subelements[0], relating_object=element)
+        rel = ifcopenshell.api.run(
+            "aggregate.assign_object",
+            self.file,
+            products=[subelements[0], subelements[1], subelements[1]],
+            relating_object=element,
+        )
+        assert rel.RelatedObjects == tuple(subelements)
+        assert len(self.file.by_type("IfcRelAggregates")) == 1
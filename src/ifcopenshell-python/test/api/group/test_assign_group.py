@@ -0,0 +1,29 @@
+import test.bootstrap
+import ifcopenshell.api
+
+
+class TestAssignGroup(test.bootstrap.IFC4):
+    def test_assigning_a_group(self):
+        group = ifcopenshell.api.run("group.add_group", self.file)
+        element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        rel = ifcopenshell.api.run("group.assign_group", self.file, product=element, group=group)
+        assert rel.RelatedObjects == (element,)
+        assert rel.RelatingGroup == group
+
+    def test_assigning_multiple_products_to_a_group_with_existing_products(self):
+        group1 = ifcopenshell.api.run("group.add_group", self.file)
+        group2 = ifcopenshell.api.run("group.add_group", self.file)
+        elements = [ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall") for i in range(3)]
+        ifcopenshell.api.run("group.assign_group", self.file, products=elements[0:2], group=group1)
+        ifcopenshell.api.run("group.assign_group", self.file, products=elements[1:], group=group2)
+        ifcopenshell.api.run("group.assign_group", self.file, products=[elements[2], elements[2]], group=group1)
+        assert len(group1.IsGroupedBy) == 1
+        assert set(group1.IsGroupedBy[0].RelatedObjects) == set(elements)
+        assert len(group1.IsGroupedBy[0].RelatedObjects) == 3
+        # Products may belong to many groups, so they are not removed from other groups
+        assert set(group2.IsGroupedBy[0].RelatedObjects) == set(elements[1:])
+
+    def test_assigning_no_products_to_a_group(self):
+        group = ifcopenshell.api.run("group.add_group", self.file)
+        assert ifcopenshell.api.run("group.assign_group", self.file, products=[], group=group) is None
+        assert not self.file.by_type("IfcRelAssignsToGroup")
@@ -0,0 +1,60 @@
+import test.bootstrap
+import ifcopenshell.api
+import ifcopenshell.util.element
+
+
+class TestAssignMaterial(test.bootstrap.IFC4):
+    def test_assigning_a_material(self):
+        element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        material = ifcopenshell.api.run("material.add_material", self.file)
+        rel = ifcopenshell.api.run("material.assign_material", self.file, product=element, material=material)
+        assert rel.RelatingMaterial == material
+        assert ifcopenshell.util.element.get_material(element) == material
+
+    def test_assigning_a_material_to_multiple_products(self):
+        elements = [ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall") for i in range(3)]
+        material = ifcopenshell.api.run("material.add_material", self.file)
+        ifcopenshell.api.run("material.assign_material", self.file, product=elements[0], material=material)
+        rel = ifcopenshell.api.run("material.assign_material", self.file, products=elements, material=material)
+        assert rel.RelatedObjects == tuple(elements)
+        assert len(self.file.by_type("IfcRelAssociatesMaterial")) == 1
+
+    def test_that_multiple_products_are_unassigned_from_their_old_materials(self):
+        elements = [ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall") for i in range(3)]
+        material1 = ifcopenshell.api.run("material.add_material", self.file)
+        material2 = ifcopenshell.api.run("material.add_material", self.file)
+        old_rel = ifcopenshell.api.run("material.assign_material", self.file, products=elements, material=material1)
+        ifcopenshell.api.run("material.assign_material", self.file, products=elements[1:], material=material2)
+        assert old_rel.RelatedObjects == (elements[0],)
+        assert ifcopenshell.util.element.get_material(elements[1]) == material2
+        assert ifcopenshell.util.element.get_material(elements[2]) == material2
+
+    def test_assigning_a_material_set_to_multiple_products(self):
+        elements = [ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall") for i in range(3)]
+        rels = ifcopenshell.api.run(
+            "material.assign_material", self.file, products=elements, type="IfcMaterialLayerSet"
+        )
+        assert [rel.RelatedObjects for rel in rels] == [(e,) for e in elements]
+        assert all(rel.RelatingMaterial.is_a("IfcMaterialLayerSet") for rel in rels)
+        # Like individual assignments, each product gets its own set
+        assert len(set(rel.RelatingMaterial for rel in rels)) == 3
+
+    def test_assigning_a_material_list_to_multiple_products_replaces_their_old_materials(self):
+        elements = [ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall") for i in range(2)]
+        material = ifcopenshell.api.run("material.add_material", self.file)
+        old_rel = ifcopenshell.api.run("material.assign_material", self.file, products=elements, material=material)
+        rels = ifcopenshell.api.run(
+            "material.assign_material", self.file, products=elements, type="IfcMaterialList", material=material
+        )
+        assert len(self.file.by_type("IfcRelAssociatesMaterial")) == 2
+        for element, rel in zip(elements, rels):
+            assert ifcopenshell.util.element.get_material(element) == rel.RelatingMaterial
+            assert rel.RelatingMaterial.Materials == (material,)
+
+    def test_assigning_a_material_set_usage_to_multiple_products(self):
+        elements = [ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall") for i in range(3)]
+        rels = ifcopenshell.api.run(
+            "material.assign_material", self.file, products=elements, type="IfcMaterialLayerSetUsage"
+        )
+        assert [rel.RelatedObjects for rel in rels] == [(e,) for e in elements]
+        assert len(set(rel.RelatingMaterial for rel in rels)) == 3
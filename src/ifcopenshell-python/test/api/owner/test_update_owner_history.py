@@ -126,3 +126,29 @@ class TestUpdateOwnerHistory(test.bootstrap.IFC4):
         ifcopenshell.api.owner.settings.get_organisation = get_organisation
         ifcopenshell.api.owner.settings.get_application = get_application
         ifcopenshell.api.owner.settings.users = {}
+
+    def test_recreating_a_user_if_the_cached_user_was_removed(self):
+        get_person = ifcopenshell.api.owner.settings.get_person
+        get_organisation = ifcopenshell.api.owner.settings.get_organisation
+        get_application = ifcopenshell.api.owner.settings.get_application
+
+        person = self.file.createIfcPerson()
+        organisation = self.file.createIfcOrganization()
+        application = self.file.createIfcApplication()
+        ifcopenshell.api.owner.settings.get_person = lambda x : person
+        ifcopenshell.api.owner.settings.get_organisation = lambda x : organisation
+        ifcopenshell.api.owner.settings.get_application = lambda x : application
+
+        element = self.file.createIfcWall()
+        element.OwnerHistory = ifcopenshell.api.run("owner.create_owner_history", self.file)
+        self.file.remove(element.OwnerHistory.OwningUser)
+
+        history = ifcopenshell.api.run("owner.update_owner_history", self.file, element=element)
+        assert history.LastModifyingUser.ThePerson == person
+        assert history.LastModifyingUser.TheOrganization == organisation
+        assert len(self.file.by_type("IfcPersonAndOrganization")) == 1
+
+        ifcopenshell.api.owner.settings.get_person = get_person
+        ifcopenshell.api.owner.settings.get_organisation = get_organisation
+        ifcopenshell.api.owner.settings.get_application = get_application
+        ifcopenshell.api.owner.settings.users = {}
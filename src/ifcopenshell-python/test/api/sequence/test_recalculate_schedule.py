@@ -0,0 +1,153 @@
+import datetime
+import test.bootstrap
+import ifcopenshell.api
+
+
+class TestRecalculateSchedule(test.bootstrap.IFC4):
+    def create_schedule(self):
+        ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcProject")
+        self.schedule = ifcopenshell.api.run("sequence.add_work_schedule", self.file)
+
+        # Working days are Monday to Friday, except for a holiday on Wednesday the 13th
+        calendar = ifcopenshell.api.run("sequence.add_work_calendar", self.file)
+        work_time = ifcopenshell.api.run(
+            "sequence.add_work_time", self.file, work_calendar=calendar, time_type="WorkingTimes"
+        )
+        pattern = ifcopenshell.api.run("sequence.assign_recurrence_pattern", self.file, parent=work_time)
+        ifcopenshell.api.run(
+            "sequence.edit_recurrence_pattern",
+            self.file,
+            recurrence_pattern=pattern,
+            attributes={"WeekdayComponent": [1, 2, 3, 4, 5]},
+        )
+        holiday = ifcopenshell.api.run(
+            "sequence.add_work_time", self.file, work_calendar=calendar, time_type="ExceptionTimes"
+        )
+        ifcopenshell.api.run(
+            "sequence.edit_work_time",
+            self.file,
+            work_time=holiday,
+            attributes={"Start": datetime.date(2021, 1, 13), "Finish": datetime.date(2021, 1, 13)},
+        )
+
+        self.tasks = {}
+        for name, duration, duration_type in (
+            ("A", 3, "WORKTIME"),
+            ("B", 2, "WORKTIME"),
+            ("C", 4, "WORKTIME"),
+            ("D", 1, "WORKTIME"),
+            ("E", 2, "WORKTIME"),
+            ("F", 2, "ELAPSEDTIME"),
+        ):
+            task = ifcopenshell.api.run("sequence.add_task", self.file, work_schedule=self.schedule)
+            task.Name = name
+            if duration_type == "WORKTIME":
+                ifcopenshell.api.run(
+                    "control.assign_control", self.file, relating_control=calendar, related_object=task
+                )
+            task_time = ifcopenshell.api.run("sequence.add_task_time", self.file, task=task)
+            ifcopenshell.api.run(
+                "sequence.edit_task_time",
+                self.file,
+                task_time=task_time,
+                attributes={
+                    "ScheduleStart": datetime.datetime(2021, 1, 4),
+                    "ScheduleDuration": datetime.timedelta(days=duration),
+                    "DurationType": duration_type,
+                },
+            )
+            self.tasks[name] = task
+
+        self.assign_sequence("A", "B", "FINISH_START", 2)
+        self.assign_sequence("A", "C", "START_START", 1)
+        self.assign_sequence("B", "D", "FINISH_FINISH")
+        self.assign_sequence("C", "D", "FINISH_START")
+        self.assign_sequence("A", "E", "START_FINISH")
+        self.assign_sequence("D", "F", "FINISH_START", 1)
+
+    def assign_sequence(self, relating_process, related_process, sequence_type, lag=None):
+        rel = ifcopenshell.api.run(
+            "sequence.assign_sequence",
+            self.file,
+            relating_process=self.tasks[relating_process],
+            related_process=self.tasks[related_process],
+        )
+        # Set directly rather than with edit_sequence, which cascades schedule dates
+        rel.SequenceType = sequence_type
+        if lag:
+            ifcopenshell.api.run(
+                "sequence.assign_lag_time",
+                self.file,
+                rel_sequence=rel,
+                lag_value=datetime.timedelta(days=lag),
+                duration_type="WORKTIME",
+            )
+
+    def recalculate(self, is_incremental=False):
+        ifcopenshell.api.run(
+            "sequence.recalculate_schedule", self.file, work_schedule=self.schedule, is_incremental=is_incremental
+        )
+        return {
+            name: (
+                task.TaskTime.EarlyStart,
+                task.TaskTime.EarlyFinish,
+                task.TaskTime.LateStart,
+                task.TaskTime.LateFinish,
+                task.TaskTime.TotalFloat,
+                task.TaskTime.FreeFloat,
+                task.TaskTime.IsCritical,
+            )
+            for name, task in self.tasks.items()
+        }
+
+    def test_recalculating_a_schedule(self):
+        self.create_schedule()
+        d = "2021-01-{:02d}T00:00:00".format
+        assert self.recalculate() == {
+            "A": (d(4), d(7), d(4), d(7), "P0D", "P0D", True),
+            "B": (d(11), d(14), d(11), d(14), "P0D", "P0D", True),
+            "C": (d(5), d(11), d(6), d(12), "P1D", "P1D", False),
+            "D": (d(12), d(14), d(12), d(14), "P0D", "P0D", True),
+            "E": (d(4), d(6), d(12), d(17), "P7D", "P7D", False),
+            "F": (d(15), d(17), d(15), d(17), "P0D", "P0D", True),
+        }
+
+    def test_incremental_recalculations_match_full_recalculations(self):
+        self.create_schedule()
+        assert self.recalculate(is_incremental=True) == self.recalculate()
+
+        ifcopenshell.api.run(
+            "sequence.edit_task_time",
+            self.file,
+            task_time=self.tasks["C"].TaskTime,
+            attributes={"ScheduleDuration": datetime.timedelta(days=6)},
+        )
+        results = self.recalculate(is_incremental=True)
+        assert results["D"][:2] == ("2021-01-14T00:00:00", "2021-01-15T00:00:00")
+        assert results == self.recalculate()
+
+        self.assign_sequence("E", "F", "FINISH_START", 3)
+        results = self.recalculate(is_incremental=True)
+        assert results["E"][2:] == ("2021-01-08T00:00:00", "2021-01-12T00:00:00", "P4D", "P4D", False)
+        assert results == self.recalculate()
+
+        ifcopenshell.api.run(
+            "sequence.unassign_sequence",
+            self.file,
+            relating_process=self.tasks["E"],
+            related_process=self.tasks["F"],
+        )
+        assert self.recalculate(is_incremental=True) == self.recalculate()
+
+    def test_incremental_recalculations_after_listeners_are_removed(self):
+        self.create_schedule()
+        self.recalculate(is_incremental=True)
+        ifcopenshell.api.remove_all_listeners()
+        self.recalculate(is_incremental=True)
+        ifcopenshell.api.run(
+            "sequence.edit_task_time",
+            self.file,
+            task_time=self.tasks["A"].TaskTime,
+            attributes={"ScheduleDuration": datetime.timedelta(days=5)},
+        )
+        assert self.recalculate(is_incremental=True) == self.recalculate()
@@ -77,3 +77,48 @@ class TestEditObjectPlacement(test.bootstrap.IFC4):
         )
         ifcopenshell.api.run("spatial.assign_container", self.file, product=subelement, relating_structure=element2)
         assert numpy.array_equal(ifcopenshell.util.placement.get_local_placement(subelement.ObjectPlacement), matrix1)
+
+    def test_assigning_a_container_to_multiple_products(self):
+        element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuilding")
+        subelements = [ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall") for i in range(3)]
+        rel = ifcopenshell.api.run(
+            "spatial.assign_container", self.file, products=subelements, relating_structure=element
+        )
+        assert rel.RelatedElements == tuple(subelements)
+        assert len(self.file.by_type("IfcRelContainedInSpatialStructure")) == 1
+        for subelement in subelements:
+            assert ifcopenshell.util.element.get_container(subelement) == element
+
+    def test_that_multiple_products_are_moved_out_of_their_old_containers(self):
+        element1 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuilding")
+        element2 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuilding")
+        element3 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuilding")
+        subelement1 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        subelement2 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        subelement3 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        ifcopenshell.api.run(
+            "spatial.assign_container", self.file, products=[subelement1, subelement2], relating_structure=element1
+        )
+        ifcopenshell.api.run("spatial.assign_container", self.file, product=subelement3, relating_structure=element2)
+        rel1 = element1.ContainsElements[0]
+        rel2_id = element2.ContainsElements[0].id()
+        ifcopenshell.api.run(
+            "spatial.assign_container", self.file, products=[subelement1, subelement3], relating_structure=element3
+        )
+        assert rel1.RelatedElements == (subelement2,)
+        with pytest.raises(RuntimeError):
+            self.file.by_id(rel2_id)
+        assert set(element3.ContainsElements[0].RelatedElements) == {subelement1, subelement3}
+
+    def test_that_already_contained_products_are_skipped_when_assigning_multiple_products(self):
+        element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuilding")
+        subelement1 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        subelement2 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        ifcopenshell.api.run("spatial.assign_container", self.file, product=subelement1, relating_structure=element)
+        ifcopenshell.api.run(
+            "spatial.assign_container",
+            self.file,
+            products=[subelement1, subelement2, subelement2],
+            relating_structure=element,
+        )
+        assert element.ContainsElements[0].RelatedElements == (subelement1, subelement2)
@@ -0,0 +1,29 @@
+import test.bootstrap
+import ifcopenshell.api
+
+
+class TestAssignSystem(test.bootstrap.IFC4):
+    def test_assigning_a_system(self):
+        system = ifcopenshell.api.run("system.add_system", self.file)
+        element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcPipeSegment")
+        rel = ifcopenshell.api.run("system.assign_system", self.file, product=element, system=system)
+        assert rel.RelatedObjects == (element,)
+        assert rel.RelatingGroup == system
+
+    def test_assigning_multiple_products_to_a_system_with_existing_products(self):
+        system1 = ifcopenshell.api.run("system.add_system", self.file)
+        system2 = ifcopenshell.api.run("system.add_system", self.file)
+        elements = [ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcPipeSegment") for i in range(3)]
+        ifcopenshell.api.run("system.assign_system", self.file, products=elements[0:2], system=system1)
+        ifcopenshell.api.run("system.assign_system", self.file, products=elements[1:], system=system2)
+        ifcopenshell.api.run("system.assign_system", self.file, products=[elements[2], elements[2]], system=system1)
+        assert len(system1.IsGroupedBy) == 1
+        assert set(system1.IsGroupedBy[0].RelatedObjects) == set(elements)
+        assert len(system1.IsGroupedBy[0].RelatedObjects) == 3
+        # Products may belong to many systems, so they are not removed from other systems
+        assert set(system2.IsGroupedBy[0].RelatedObjects) == set(elements[1:])
+
+    def test_assigning_no_products_to_a_system(self):
+        system = ifcopenshell.api.run("system.add_system", self.file)
+        assert ifcopenshell.api.run("system.assign_system", self.file, products=[], system=system) is None
+        assert not self.file.by_type("IfcRelAssignsToGroup")
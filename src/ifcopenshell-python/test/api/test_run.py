@@ -0,0 +1,30 @@
+import test.bootstrap
+import ifcopenshell.api
+
+
+class TestRun(test.bootstrap.IFC4):
+    def test_serialising_settings_for_vcs_listeners(self):
+        calls = []
+        ifcopenshell.api.add_vcs_listener("test", lambda *args: calls.append(args))
+        try:
+            element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall", name="Foo")
+            ifcopenshell.api.run("attribute.edit_attributes", self.file, product=element, attributes={"Name": "Bar"})
+        finally:
+            ifcopenshell.api.remove_vcs_listener("test")
+        usecase_path, ifc_file, vcs_settings, result = calls[-1]
+        assert usecase_path == "attribute.edit_attributes"
+        assert ifc_file is self.file
+        assert vcs_settings["product"] == {
+            "cast_type": "entity_instance",
+            "value": element.id(),
+            "type": "IfcWall",
+            "Name": "Foo",
+            "GlobalId": element.GlobalId,
+        }
+        assert vcs_settings["attributes"] == {"Name": "Bar"}
+        assert any(c[0] == "root.create_entity" and c[3] == element for c in calls)
+
+    def test_caching_usecase_classes(self):
+        ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        usecase_class = ifcopenshell.api.usecase_classes["root.create_entity"]
+        assert usecase_class is ifcopenshell.api.root.create_entity.Usecase
@@ -0,0 +1,54 @@
+import pytest
+import test.bootstrap
+import ifcopenshell.api
+import ifcopenshell.util.element
+
+
+class TestAssignType(test.bootstrap.IFC4):
+    def test_assigning_a_type(self):
+        element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        element_type = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWallType")
+        ifcopenshell.api.run("type.assign_type", self.file, related_object=element, relating_type=element_type)
+        assert ifcopenshell.util.element.get_type(element) == element_type
+
+    def test_that_multiple_objects_are_moved_out_of_their_old_types(self):
+        type1 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWallType")
+        type2 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWallType")
+        type3 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWallType")
+        elements = [ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall") for i in range(3)]
+        ifcopenshell.api.run("type.assign_type", self.file, related_objects=elements[0:2], relating_type=type1)
+        ifcopenshell.api.run("type.assign_type", self.file, related_object=elements[2], relating_type=type2)
+        rel1 = type1.Types[0]
+        rel2_id = type2.Types[0].id()
+        rel = ifcopenshell.api.run(
+            "type.assign_type", self.file, related_objects=[elements[0], elements[2]], relating_type=type3
+        )
+        assert rel1.RelatedObjects == (elements[1],)
+        with pytest.raises(RuntimeError):
+            self.file.by_id(rel2_id)
+        assert set(rel.RelatedObjects) == {elements[0], elements[2]}
+        assert type3.Types == (rel,)
+        assert [ifcopenshell.util.element.get_type(e) for e in elements] == [type3, type1, type3]
+
+    def test_that_already_typed_objects_are_skipped_when_assigning_multiple_objects(self):
+        element_type = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWallType")
+        elements = [ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall") for i in range(2)]
+        ifcopenshell.api.run("type.assign_type", self.file, related_object=elements[0], relating_type=element_type)
+        rel = ifcopenshell.api.run(
+            "type.assign_type",
+            self.file,
+            related_objects=[elements[0], elements[1], elements[1]],
+            relating_type=element_type,
+        )
+        assert rel.RelatedObjects == tuple(elements)
+        assert len(self.file.by_type("IfcRelDefinesByType")) == 1
+
+    def test_that_material_usages_are_mapped_when_assigning_multiple_objects(self):
+        element_type = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWallType")
+        ifcopenshell.api.run("material.assign_material", self.file, product=element_type, type="IfcMaterialLayerSet")
+        layer_set = ifcopenshell.util.element.get_material(element_type)
+        elements = [ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall") for i in range(2)]
+        ifcopenshell.api.run("type.assign_type", self.file, related_objects=elements, relating_type=element_type)
+        usages = [ifcopenshell.util.element.get_material(e, should_skip_usage=False) for e in elements]
+        assert all(u.is_a("IfcMaterialLayerSetUsage") and u.ForLayerSet == layer_set for u in usages)
+        assert usages[0] != usages[1]
@@ -0,0 +1,121 @@
+import pytest
+import test.bootstrap
+import ifcopenshell.api
+import ifcopenshell.guid
+import ifcopenshell.geom.cache
+from types import SimpleNamespace
+
+
+def create_shape(size=3):
+    material = SimpleNamespace(
+        name="material",
+        has_diffuse=True,
+        has_specular=False,
+        has_transparency=False,
+        has_specularity=False,
+        diffuse=(1.0, 0.0, 0.0),
+    )
+    return SimpleNamespace(
+        geometry=SimpleNamespace(
+            id="geometry",
+            verts=tuple(float(i) for i in range(size * 3)),
+            normals=tuple(0.0 for i in range(size * 3)),
+            faces=(0, 1, 2),
+            edges=(0, 1),
+            material_ids=(0,),
+            materials=(material,),
+        ),
+        transformation=SimpleNamespace(matrix=SimpleNamespace(data=tuple(float(i) for i in range(16)))),
+        context="Body",
+        parent_id=0,
+        unique_id=0,
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ifcopenshell.geom.cache.geometry_cache(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+class TestGeometryCache:
+    def test_getting_a_missing_key(self, cache):
+        assert cache.get("key") is None
+        assert (cache.hits, cache.misses) == (0, 1)
+
+    def test_getting_a_cached_shape(self, cache):
+        cache.add("key", create_shape())
+        shape = cache.get("key")
+        assert (cache.hits, cache.misses) == (1, 0)
+        assert shape.geometry.verts == create_shape().geometry.verts
+        assert shape.geometry.faces == (0, 1, 2)
+        assert shape.geometry.materials[0].diffuse == (1.0, 0.0, 0.0)
+        assert shape.transformation.matrix.data == tuple(float(i) for i in range(16))
+
+    def test_getting_a_product_without_geometry(self, cache):
+        cache.add("key", None)
+        assert cache.get("key") is False
+
+    def test_entries_persist_between_sessions(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        cache = ifcopenshell.geom.cache.geometry_cache(path)
+        cache.add("key", create_shape())
+        cache.close()
+        cache = ifcopenshell.geom.cache.geometry_cache(path)
+        assert cache.get("key") is not None
+        assert cache.size > 0
+        cache.close()
+
+    def test_evicting_the_least_recently_used_entries(self, tmp_path):
+        entry_size = len(ifcopenshell.geom.cache.geometry_cache.pack(create_shape()))
+        cache = ifcopenshell.geom.cache.geometry_cache(str(tmp_path / "cache.sqlite"), max_size=entry_size * 2)
+        cache.add("a", create_shape())
+        cache.add("b", create_shape())
+        cache.db.execute("UPDATE shapes SET accessed = 0 WHERE key = 'a'")
+        cache.add("c", create_shape())
+        assert cache.size == entry_size * 2
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+        assert cache.get("c") is not None
+        cache.close()
+
+    def test_replacing_an_entry_does_not_count_it_twice(self, cache):
+        cache.add("key", create_shape())
+        size = cache.size
+        cache.add("key", create_shape())
+        assert cache.size == size
+        cache.add("key", None)
+        assert cache.size == 0
+
+
+class TestGetKey(test.bootstrap.IFC4):
+    @pytest.fixture(autouse=True)
+    def setup_cache(self, tmp_path):
+        self.cache = ifcopenshell.geom.cache.geometry_cache(str(tmp_path / "cache.sqlite"))
+        yield
+        self.cache.close()
+
+    def create_wall(self):
+        wall = self.file.createIfcWall(ifcopenshell.guid.new())
+        wall.ObjectPlacement = self.file.createIfcLocalPlacement(
+            RelativePlacement=self.file.createIfcAxis2Placement3D(
+                Location=self.file.createIfcCartesianPoint((0.0, 0.0, 0.0))
+            )
+        )
+        wall.Representation = self.file.createIfcProductDefinitionShape()
+        return wall
+
+    def test_keys_of_identical_products_are_equal(self):
+        assert self.cache.get_key("settings", self.create_wall()) == self.cache.get_key("settings", self.create_wall())
+
+    def test_keys_change_with_settings(self):
+        wall = self.create_wall()
+        assert self.cache.get_key("settings", wall) != self.cache.get_key("other settings", wall)
+
+    def test_keys_change_when_the_geometry_changes(self):
+        wall = self.create_wall()
+        key = self.cache.get_key("settings", wall)
+        self.cache.digests.clear()
+        wall.ObjectPlacement.RelativePlacement.Location.Coordinates = (1.0, 0.0, 0.0)
+        assert self.cache.get_key("settings", wall) != key
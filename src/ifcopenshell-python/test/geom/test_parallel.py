@@ -0,0 +1,40 @@
+import os
+import signal
+import pytest
+import multiprocessing
+import ifcopenshell.geom
+import ifcopenshell.geom.parallel
+from types import SimpleNamespace
+
+
+def kill_worker(shard_index, filename, settings_values, guids, num_threads, queue):
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def exit_worker(shard_index, filename, settings_values, guids, num_threads, queue):
+    os._exit(0)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="Patching workers relies on forking")
+class TestIterateParallel:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        monkeypatch.setattr(ifcopenshell.geom.parallel, "POLL_INTERVAL", 0.1)
+        self.monkeypatch = monkeypatch
+        self.products = [SimpleNamespace(GlobalId=str(i)) for i in range(4)]
+
+    def iterate(self):
+        settings = ifcopenshell.geom.settings()
+        return list(
+            ifcopenshell.geom.parallel.iterate_parallel(settings, "model.ifc", num_processes=2, include=self.products)
+        )
+
+    def test_raising_when_a_worker_is_killed(self):
+        self.monkeypatch.setattr(ifcopenshell.geom.parallel, "process_shard", kill_worker)
+        with pytest.raises(RuntimeError, match="exited unexpectedly"):
+            self.iterate()
+
+    def test_raising_when_a_worker_exits_without_reporting_back(self):
+        self.monkeypatch.setattr(ifcopenshell.geom.parallel, "process_shard", exit_worker)
+        with pytest.raises(RuntimeError, match="exited unexpectedly"):
+            self.iterate()
@@ -70,6 +70,27 @@ class TestTransaction(test.bootstrap.IFC4):
         self.file.redo()
         assert rel.RelatingObject is None
 
+    def test_that_inverses_are_captured_on_unbatch_excluding_batch_deleted_elements(self):
+        element = self.file.createIfcWall(GlobalId="id")
+        subelement = self.file.createIfcWall(GlobalId="id2")
+        rel = self.file.createIfcRelAggregates(GlobalId="id3", RelatingObject=element, RelatedObjects=[subelement])
+        group = self.file.createIfcRelAssignsToGroup(GlobalId="id4", RelatedObjects=[element, subelement])
+        self.file.begin_transaction()
+        self.file.batch()
+        self.file.remove(rel)
+        self.file.remove(element)
+        self.file.remove(subelement)
+        self.file.unbatch()
+        self.file.end_transaction()
+        assert len(group.RelatedObjects) == 0
+        self.file.undo()
+        rel = self.file.by_id(3)
+        assert rel.RelatingObject == self.file.by_id(1)
+        assert rel.RelatedObjects == (self.file.by_id(2),)
+        assert set(group.RelatedObjects) == {self.file.by_id(1), self.file.by_id(2)}
+        self.file.redo()
+        assert len(group.RelatedObjects) == 0
+
     def test_that_you_can_undo_and_redo_deletion_with_aggregated_inverse_relationships(self):
         element = self.file.createIfcWall(GlobalId="id")
         rel = self.file.createIfcRelAggregates()
@@ -101,6 +122,17 @@ class TestTransaction(test.bootstrap.IFC4):
         self.file.set_history_size(1)
         assert len(self.file.history) == 1
 
+    def test_setting_the_history_memory_limit(self):
+        for i in range(3):
+            self.file.begin_transaction()
+            self.file.createIfcWall()
+            self.file.end_transaction()
+        assert len(self.file.history) == 3
+        self.file.set_history_memory_limit(self.file.history[-1].size)
+        assert len(self.file.history) == 1
+        self.file.set_history_memory_limit(0)
+        assert len(self.file.history) == 0
+
     def test_discarding_the_active_transaction(self):
         self.file.begin_transaction()
         self.file.discard_transaction()
@@ -209,3 +241,47 @@ class TestFile(test.bootstrap.IFC4):
         element = self.file.createIfcWall()
         g = ifcopenshell.file.from_string(self.file.wrapped_data.to_string())
         assert g.by_id(1).is_a("IfcWall")
+
+    def test_reusing_wrappers_with_the_wrapper_cache(self):
+        self.file.set_wrapper_cache()
+        owner = self.file.createIfcOwnerHistory()
+        element = self.file.createIfcWall(OwnerHistory=owner)
+        assert self.file.by_id(element.id()) is element
+        assert self.file.by_type("IfcWall")[0] is element
+        assert element.OwnerHistory is owner
+
+    def test_removed_elements_are_evicted_from_the_wrapper_cache(self):
+        self.file.set_wrapper_cache()
+        element = self.file.createIfcWall(GlobalId="global_id")
+        self.file.remove(element)
+        assert element.id() not in self.file.wrapper_cache
+
+    def test_getting_attributes_of_all_elements_of_a_type_as_columns(self):
+        placement = self.file.createIfcLocalPlacement()
+        wall = self.file.createIfcWall(GlobalId="a", Name="Foo", ObjectPlacement=placement)
+        slab = self.file.createIfcSlab(GlobalId="b")
+        columns = self.file.get_attributes("IfcElement", ["GlobalId", "Name", "ObjectPlacement"])
+        rows = {
+            r[0]: r[1:] for r in zip(columns["id"], columns["GlobalId"], columns["Name"], columns["ObjectPlacement"])
+        }
+        assert rows == {wall.id(): ("a", "Foo", placement.id()), slab.id(): ("b", None, 0)}
+        columns = self.file.get_attributes("IfcElement", ["GlobalId"], include_subtypes=False)
+        assert len(columns["id"]) == 0
+
+    def test_lazily_iterating_elements_by_type(self):
+        wall = self.file.createIfcWall()
+        slab = self.file.createIfcSlab()
+        assert set(self.file.iter_by_type("IfcElement")) == {wall, slab}
+        assert list(self.file.iter_by_type("IfcWall", include_subtypes=False)) == [wall]
+
+    def test_iterating_elements_by_type_in_chunks(self):
+        walls = [self.file.createIfcWall() for i in range(5)]
+        chunks = list(self.file.iter_by_type("IfcWall", chunk_size=2))
+        assert [len(c) for c in chunks] == [2, 2, 1]
+        assert set(sum(chunks, [])) == set(walls)
+
+    def test_lazily_traversing_direct_attributes_of_an_element(self):
+        owner = self.file.createIfcOwnerHistory()
+        element = self.file.createIfcWall(OwnerHistory=owner)
+        assert list(self.file.iter_traverse(element)) == [element, owner]
+        assert list(self.file.iter_traverse(element, chunk_size=1)) == [[element], [owner]]
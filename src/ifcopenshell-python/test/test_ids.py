@@ -1,9 +1,14 @@
+import io
 import os
+import gzip
+import json
 import logging
 import unittest
 import tempfile
 import requests
+import numpy as np
 import ifcopenshell
+import ifcopenshell.api
 from bcf import bcfxml
 from ifcopenshell import ids
 
@@ -324,5 +329,172 @@ class TestIdsReporting(unittest.TestCase):
         self.assertEqual(len(topics), 5)
 
 
+IDS_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<ids xmlns="http://standards.buildingsmart.org/IDS" xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:schemaLocation="http://standards.buildingsmart.org/IDS  ids_04.xsd">
+    <specification name="Walls" necessity="required">
+        <applicability>
+            <entity>
+                <name><simpleValue>IfcWall</simpleValue></name>
+            </entity>
+        </applicability>
+        <requirements>
+            <property location="any">
+                <propertyset><simpleValue>Test</simpleValue></propertyset>
+                <name><simpleValue>Rating</simpleValue></name>
+                <value><simpleValue>A</simpleValue></value>
+            </property>
+        </requirements>
+    </specification>
+    <specification name="Slabs" necessity="required">
+        <applicability>
+            <entity>
+                <name><simpleValue>IfcSlab</simpleValue></name>
+            </entity>
+        </applicability>
+        <requirements>
+            <property location="any">
+                <propertyset><simpleValue>attribute</simpleValue></propertyset>
+                <name><simpleValue>Name</simpleValue></name>
+                <value><simpleValue>Slab</simpleValue></value>
+            </property>
+        </requirements>
+    </specification>
+    <info/>
+</ids>
+"""
+
+
+def create_ifc_file():
+    ifc_file = ifcopenshell.api.run("project.create_file")
+    ifcopenshell.api.run("root.create_entity", ifc_file, ifc_class="IfcProject")
+    walls = []
+    for rating in ("A", "B", None):
+        wall = ifcopenshell.api.run("root.create_entity", ifc_file, ifc_class="IfcWall", name="Wall")
+        if rating:
+            pset = ifcopenshell.api.run("pset.add_pset", ifc_file, product=wall, name="Test")
+            ifcopenshell.api.run("pset.edit_pset", ifc_file, pset=pset, properties={"Rating": rating})
+        walls.append(wall)
+    slab = ifcopenshell.api.run("root.create_entity", ifc_file, ifc_class="IfcSlab", name="Slab")
+    return ifc_file, walls, slab
+
+
+class RecordingSink(ids.ResultSink):
+    report_passed = True
+    report_failed = True
+
+    def __init__(self):
+        self.results = []
+
+    def add(self, spec_index, element_id, success, sentence):
+        self.results.append((spec_index, element_id, success, sentence))
+
+
+class TestIdsChecking(unittest.TestCase):
+    def setUp(self):
+        self.ids_file = ids.ids.open(IDS_XML)
+        self.ifc_file, self.walls, self.slab = create_ifc_file()
+
+    def test_get_candidates(self):
+        candidates = self.ids_file.get_candidates(self.ifc_file)
+        expected = {w.id(): [0] for w in self.walls}
+        expected[self.slab.id()] = [1]
+        self.assertEqual(candidates, expected)
+
+    def test_check_elements(self):
+        candidates = self.ids_file.get_candidates(self.ifc_file)
+        results = list(self.ids_file.check_elements(self.ifc_file, candidates, report_passed=False))
+        self.assertEqual(
+            [r[:3] for r in results],
+            [
+                (0, self.walls[0].id(), True),
+                (0, self.walls[1].id(), False),
+                (0, self.walls[2].id(), False),
+                (1, self.slab.id(), True),
+            ],
+        )
+        self.assertIsNone(results[0][3])
+        self.assertIn("not compliant", results[1][3])
+
+    def test_check_elements_of_some_candidates_only(self):
+        candidates = self.ids_file.get_candidates(self.ifc_file)
+        element_ids = [self.slab.id()]
+        results = list(self.ids_file.check_elements(self.ifc_file, candidates, element_ids=element_ids))
+        self.assertEqual([r[:3] for r in results], [(1, self.slab.id(), True)])
+
+    def test_serial_and_parallel_results_match(self):
+        filepath = os.path.join(tempfile.mkdtemp(), "model.ifc")
+        self.ifc_file.write(filepath)
+        serial = RecordingSink()
+        self.ids_file.validate(filepath, sink=serial)
+        parallel = RecordingSink()
+        self.ids_file.validate(filepath, sink=parallel, num_processes=2)
+        self.assertEqual(len(serial.results), 4)
+        self.assertEqual(parallel.results, serial.results)
+
+
+class TestResultSinks(unittest.TestCase):
+    def setUp(self):
+        self.ids_file = ids.ids.open(IDS_XML)
+        self.ifc_file, self.walls, self.slab = create_ifc_file()
+
+    def test_result_sink(self):
+        sink = RecordingSink()
+        self.ids_file.validate(self.ifc_file, sink=sink)
+        self.assertEqual(sink.applicable, [3, 1])
+        self.assertEqual(sink.passed, [1, 1])
+        self.assertEqual([r[2] for r in sink.results], [True, False, False, True])
+
+    def test_count_sink(self):
+        sink = ids.CountSink()
+        self.ids_file.validate(self.ifc_file, sink=sink)
+        self.assertEqual(sink.counts, [("Walls", 3, 1), ("Slabs", 1, 1)])
+
+    def test_json_lines_sink(self):
+        stream = io.StringIO()
+        sink = ids.JsonLinesSink(stream=stream)
+        self.ids_file.validate(self.ifc_file, sink=sink)
+        results = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([r["id"] for r in results], [self.walls[1].id(), self.walls[2].id()])
+        self.assertEqual(results[0]["specification"], "Walls")
+        self.assertEqual(results[0]["guid"], self.walls[1].GlobalId)
+        self.assertFalse(results[0]["result"])
+
+    def test_json_lines_sink_reporting_valid_results_to_a_compressed_file(self):
+        filepath = os.path.join(tempfile.mkdtemp(), "results.jsonl.gz")
+        sink = ids.JsonLinesSink(filepath=filepath, report_valid=True)
+        self.ids_file.validate(self.ifc_file, sink=sink)
+        with gzip.open(filepath, "rt", encoding="utf-8") as f:
+            results = [json.loads(line) for line in f]
+        self.assertEqual([r["result"] for r in results], [True, False, False, True])
+
+    def test_columnar_sink(self):
+        filepath = os.path.join(tempfile.mkdtemp(), "results.npz")
+        sink = ids.ColumnarSink(filepath)
+        self.ids_file.validate(self.ifc_file, sink=sink)
+        data = np.load(filepath)
+        self.assertEqual(data["names"].tolist(), ["Walls", "Slabs"])
+        self.assertEqual(data["applicable"].tolist(), [3, 1])
+        self.assertEqual(data["passed"].tolist(), [1, 1])
+        self.assertEqual(data["specification"].tolist(), [0, 0, 0, 1])
+        self.assertEqual(data["id"].tolist(), [w.id() for w in self.walls] + [self.slab.id()])
+        self.assertEqual(data["result"].tolist(), [True, False, False, True])
+
+    def test_bcf_sink(self):
+        filepath = os.path.join(tempfile.mkdtemp(), "results.bcf")
+        sink = ids.BcfSink(filepath=filepath)
+        self.ids_file.validate(self.ifc_file, sink=sink)
+        topics = bcfxml.load(filepath).get_topics()
+        self.assertEqual(len(topics), 2)
+        self.assertTrue(all(t.title.startswith("IfcWall") for t in topics.values()))
+
+    def test_bcf_sink_adds_results_to_a_saved_report(self):
+        filepath = os.path.join(tempfile.mkdtemp(), "results.bcf")
+        sink = ids.BcfSink(filepath=filepath)
+        self.ids_file.validate(self.ifc_file, sink=sink)
+        self.assertEqual(len(bcfxml.load(filepath).get_topics()), 2)
+        self.ids_file.validate(self.ifc_file, sink=sink)
+        self.assertEqual(len(bcfxml.load(filepath).get_topics()), 4)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,111 @@
+import os
+import pytest
+import test.bootstrap
+import ifcopenshell
+import ifcopenshell.validate
+
+TEST_FILES = [
+    os.path.join(os.path.dirname(__file__), "..", "ifcopenshell", "util", "schema", "Pset_IFC4_ADD2.ifc"),
+    os.path.join(os.path.dirname(__file__), "..", "..", "blenderbim", "test", "files", "basic.ifc"),
+    os.path.join(os.path.dirname(__file__), "..", "..", "blenderbim", "test", "files", "decomposition.ifc"),
+    os.path.join(os.path.dirname(__file__), "..", "..", "blenderbim", "test", "files", "manual-geolocation.ifc"),
+    os.path.join(
+        os.path.dirname(__file__), "..", "..", "ifcbimtester", "examples", "01_ifcschema_translated", "IFC2X3_col.ifc"
+    ),
+]
+
+
+def validate_uncompiled(f, logger):
+    """The validation loop as it was before validators were compiled"""
+    schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(f.schema)
+    for inst in f:
+        logger.set_instance(inst)
+        entity = schema.declaration_by_name(inst.is_a())
+        attrs = entity.all_attributes()
+        if entity.is_abstract():
+            logger.error("Entity %s is abstract" % entity.name())
+        has_invalid_value = False
+        for i in range(len(attrs)):
+            try:
+                inst[i]
+            except:
+                logger.error("Invalid attribute value for %s.%s", entity, attrs[i])
+                has_invalid_value = True
+        if not has_invalid_value:
+            for attr, val, is_derived in zip(attrs, inst, entity.derived()):
+                if val is None and not (is_derived or attr.optional()):
+                    logger.error("Attribute %s.%s not optional", entity, attr)
+                if val is not None:
+                    try:
+                        ifcopenshell.validate.assert_valid(attr, val, schema)
+                    except ifcopenshell.validate.ValidationError as e:
+                        logger.error(str(e))
+        for attr in entity.all_inverse_attributes():
+            try:
+                ifcopenshell.validate.assert_valid_inverse(attr, getattr(inst, attr.name()), schema)
+            except ifcopenshell.validate.ValidationError as e:
+                logger.error(str(e))
+
+
+def get_statements(f, validate):
+    logger = ifcopenshell.validate.json_logger()
+    validate(f, logger)
+    return [(s["level"], s["message"], str(s["instance"])) for s in logger.statements]
+
+
+def create_invalid_file():
+    f = ifcopenshell.file(schema="IFC4")
+    f.createIfcWall()  # Missing GlobalId
+    f.createIfcBuildingElement(ifcopenshell.guid.new())  # Abstract
+    f.createIfcCartesianPoint((0.0, 0.0, 0.0, 0.0))  # Too many coordinates
+    f.createIfcRelAggregates(ifcopenshell.guid.new(), RelatingObject=f.createIfcWall(ifcopenshell.guid.new()))
+    f.createIfcPropertySingleValue("Name", NominalValue=f.createIfcLabel("Label"))
+    f.createIfcPropertySingleValue("Name", NominalValue=f.createIfcBoolean(True))
+    return f
+
+
+@pytest.mark.parametrize("filename", [f for f in TEST_FILES if os.path.isfile(f)])
+def test_compiled_validation_matches_the_uncompiled_validation(filename):
+    f = ifcopenshell.open(filename)
+    assert get_statements(f, ifcopenshell.validate.validate) == get_statements(f, validate_uncompiled)
+
+
+def test_compiled_validation_reports_the_same_errors_for_an_invalid_file():
+    f = create_invalid_file()
+    statements = get_statements(f, ifcopenshell.validate.validate)
+    assert statements
+    assert statements == get_statements(f, validate_uncompiled)
+
+
+@pytest.mark.parametrize("filename", [f for f in TEST_FILES if os.path.isfile(f)])
+def test_compiled_attribute_checks_match_assert_valid(filename):
+    f = ifcopenshell.open(filename)
+    schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(f.schema)
+    for inst in f:
+        entity = schema.declaration_by_name(inst.is_a())
+        for attr, val in zip(entity.all_attributes(), inst):
+            if val is None:
+                continue
+            expected = ifcopenshell.validate.try_valid(attr, val, schema)
+            try:
+                result = ifcopenshell.validate.compile_valid(attr, schema)(val)
+            except ifcopenshell.validate.ValidationError:
+                result = False
+            assert result == expected
+
+
+def test_entity_validators_are_compiled_once_per_entity():
+    schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name("IFC4")
+    validator = ifcopenshell.validate.get_entity_validator(schema, "IfcWall")
+    assert ifcopenshell.validate.get_entity_validator(schema, "IfcWall") is validator
+
+
+def test_parallel_validation_matches_serial_validation(tmp_path):
+    f = create_invalid_file()
+    filename = str(tmp_path / "invalid.ifc")
+    f.write(filename)
+    f = ifcopenshell.open(filename)
+    logger = ifcopenshell.validate.json_logger()
+    ifcopenshell.validate.validate_parallel(filename, logger, num_processes=2, chunk_size=2)
+    statements = [(s["level"], s["message"], s["instance"]) for s in logger.statements]
+    assert statements == get_statements(f, ifcopenshell.validate.validate)
@@ -78,6 +78,40 @@ class TestGetPropertiesIFC4(test.bootstrap.IFC4):
         }
 
 
+class TestPsetIndexIFC4(test.bootstrap.IFC4):
+    def test_indexing_psets_including_those_inherited_from_the_type(self):
+        element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        type_element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWallType")
+        ifcopenshell.api.run("type.assign_type", self.file, related_object=element, relating_type=type_element)
+        pset = ifcopenshell.api.run("pset.add_pset", self.file, product=type_element, name="name")
+        ifcopenshell.api.run("pset.edit_pset", self.file, pset=pset, properties={"a": "b", "c": "d"})
+        pset = ifcopenshell.api.run("pset.add_pset", self.file, product=element, name="name")
+        ifcopenshell.api.run("pset.edit_pset", self.file, pset=pset, properties={"a": "x"})
+        index = ifcopenshell.util.element.PsetIndex(self.file)
+        assert index.get_psets(element) == {"name": {"a": "x", "c": "d"}}
+        assert index.get_psets(type_element) == {"name": {"a": "b", "c": "d"}}
+        assert index.get_elements("name", "c", "d") == [element, type_element]
+        assert index.get_elements("name", "a", "x") == [element]
+
+    def test_updating_the_index_when_the_api_edits_a_pset(self):
+        element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        pset = ifcopenshell.api.run("pset.add_pset", self.file, product=element, name="name")
+        ifcopenshell.api.run("pset.edit_pset", self.file, pset=pset, properties={"a": "b"})
+        index = ifcopenshell.util.element.PsetIndex(self.file)
+        index.add_listeners()
+        try:
+            assert index.get_elements("name", "a", "b") == [element]
+            ifcopenshell.api.run("pset.edit_pset", self.file, pset=pset, properties={"a": "c"})
+            assert index.get_psets(element) == {"name": {"a": "c"}}
+            assert index.get_elements("name", "a", "b") == []
+            assert index.get_elements("name", "a", "c") == [element]
+            ifcopenshell.api.run("pset.remove_pset", self.file, product=element, pset=pset)
+            assert index.get_psets(element) == {}
+            assert index.get_elements("name", "a", "c") == []
+        finally:
+            index.remove_listeners()
+
+
 class TestGetTypeIFC4(test.bootstrap.IFC4):
     def test_getting_the_type_of_a_product(self):
         element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
@@ -0,0 +1,56 @@
+import numpy as np
+import test.bootstrap
+import ifcopenshell.api
+import ifcopenshell.util.placement
+
+
+class TestPlacementResolverIFC4(test.bootstrap.IFC4):
+    def create_placement(self, coordinates, placement_rel_to=None):
+        point = self.file.createIfcCartesianPoint(coordinates)
+        return self.file.createIfcLocalPlacement(placement_rel_to, self.file.createIfcAxis2Placement3D(point))
+
+    def test_resolving_placements_like_the_recursive_function(self):
+        storey = self.create_placement((0.0, 0.0, 3.0))
+        axis = self.file.createIfcDirection((0.0, 1.0, 0.0))
+        ref_direction = self.file.createIfcDirection((0.0, 0.0, 1.0))
+        rotated = self.file.createIfcLocalPlacement(
+            storey,
+            self.file.createIfcAxis2Placement3D(
+                self.file.createIfcCartesianPoint((1.0, 2.0, 3.0)), axis, ref_direction
+            ),
+        )
+        wall = self.create_placement((1.0, 0.0, 0.0), rotated)
+        placements = [storey, rotated, wall, None]
+        resolver = ifcopenshell.util.placement.PlacementResolver(self.file)
+        matrices = resolver.get_local_placements(placements)
+        assert matrices.shape == (4, 4, 4)
+        for plc, matrix in zip(placements, matrices):
+            assert np.allclose(matrix, ifcopenshell.util.placement.get_local_placement(plc))
+        assert np.allclose(resolver.get_local_placement(wall), ifcopenshell.util.placement.get_local_placement(wall))
+
+    def test_resolving_all_placements_in_a_file(self):
+        storey = self.create_placement((0.0, 0.0, 3.0))
+        wall = self.create_placement((1.0, 0.0, 0.0), storey)
+        matrices = ifcopenshell.util.placement.PlacementResolver(self.file).get_local_placements()
+        assert matrices.shape == (2, 4, 4)
+        assert np.allclose(matrices[1][:, 3], (1.0, 0.0, 3.0, 1.0))
+
+    def test_invalidating_placements_when_the_api_edits_an_object_placement(self):
+        element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuilding")
+        subelement = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        ifcopenshell.api.run("geometry.edit_object_placement", self.file, product=element)
+        ifcopenshell.api.run("spatial.assign_container", self.file, product=subelement, relating_structure=element)
+        ifcopenshell.api.run("geometry.edit_object_placement", self.file, product=subelement)
+        resolver = ifcopenshell.util.placement.PlacementResolver(self.file)
+        resolver.add_listeners()
+        try:
+            assert np.allclose(resolver.get_local_placement(subelement.ObjectPlacement), np.eye(4))
+            matrix = np.eye(4)
+            matrix[:, 3] = (1.0, 2.0, 3.0, 1.0)
+            ifcopenshell.api.run(
+                "geometry.edit_object_placement", self.file, product=element, matrix=matrix.copy(), is_si=False
+            )
+            assert np.allclose(resolver.get_local_placement(element.ObjectPlacement), matrix)
+            assert np.allclose(resolver.get_local_placement(subelement.ObjectPlacement), np.eye(4))
+        finally:
+            resolver.remove_listeners()
@@ -0,0 +1,91 @@
+import gc
+import pytest
+import warnings
+import test.bootstrap
+import ifcopenshell
+import ifcopenshell.api
+import ifcopenshell.util.element
+import ifcopenshell.util.recorder
+
+
+class TestRecorderIFC4(test.bootstrap.IFC4):
+    def test_replaying_recorded_calls_onto_the_original_file(self, tmp_path):
+        path = str(tmp_path / "model.log")
+        self.file.write(str(tmp_path / "model.ifc"))
+        with ifcopenshell.util.recorder.Recorder(self.file, path):
+            storey = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuildingStorey")
+            walls = [ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall") for i in range(2)]
+            ifcopenshell.api.run("spatial.assign_container", self.file, products=walls, relating_structure=storey)
+            ifcopenshell.api.run("attribute.edit_attributes", self.file, product=walls[0], attributes={"Name": "W"})
+
+        base_file = ifcopenshell.open(str(tmp_path / "model.ifc"))
+        assert ifcopenshell.util.recorder.replay(base_file, path) == {}
+        replayed_walls = [base_file.by_id(w.id()) for w in walls]
+        assert [w.GlobalId for w in replayed_walls] == [w.GlobalId for w in walls]
+        assert replayed_walls[0].Name == "W"
+        assert ifcopenshell.util.element.get_container(replayed_walls[1]).GlobalId == storey.GlobalId
+
+    def test_mapping_the_ids_of_created_entities(self, tmp_path):
+        path = str(tmp_path / "model.log")
+        with ifcopenshell.util.recorder.Recorder(self.file, path):
+            wall = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+            ifcopenshell.api.run("attribute.edit_attributes", self.file, product=wall, attributes={"Name": "W"})
+
+        base_file = ifcopenshell.api.run("project.create_file")
+        base_file.createIfcWall()
+        id_map = ifcopenshell.util.recorder.replay(base_file, path)
+        replayed_wall = base_file.by_id(id_map[wall.id()])
+        assert replayed_wall.GlobalId == wall.GlobalId
+        assert replayed_wall.Name == "W"
+
+    def test_only_recording_top_level_calls(self, tmp_path):
+        path = str(tmp_path / "model.log")
+        with ifcopenshell.util.recorder.Recorder(self.file, path):
+            ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        header, entries = ifcopenshell.util.recorder.read_log(path)
+        assert header["schema"] == "IFC4"
+        assert [e["usecase"] for e in entries] == ["root.create_entity"]
+
+    def test_replaying_onto_an_entity_of_a_different_class(self, tmp_path):
+        wall = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        path = str(tmp_path / "model.log")
+        with ifcopenshell.util.recorder.Recorder(self.file, path):
+            ifcopenshell.api.run("attribute.edit_attributes", self.file, product=wall, attributes={"Name": "W"})
+
+        base_file = ifcopenshell.api.run("project.create_file")
+        slab = base_file.create_entity("IfcSlab", wall.GlobalId, id=wall.id())
+        with pytest.raises(ValueError):
+            ifcopenshell.util.recorder.replay(base_file, path)
+        assert slab.Name is None
+
+    def test_replaying_onto_an_entity_with_a_different_global_id(self, tmp_path):
+        wall = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        path = str(tmp_path / "model.log")
+        with ifcopenshell.util.recorder.Recorder(self.file, path):
+            ifcopenshell.api.run("attribute.edit_attributes", self.file, product=wall, attributes={"Name": "W"})
+
+        base_file = ifcopenshell.api.run("project.create_file")
+        base_file.create_entity("IfcWall", ifcopenshell.guid.new(), id=wall.id())
+        with pytest.raises(ValueError):
+            ifcopenshell.util.recorder.replay(base_file, path)
+
+    def test_replaying_onto_a_missing_entity(self, tmp_path):
+        wall = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        path = str(tmp_path / "model.log")
+        with ifcopenshell.util.recorder.Recorder(self.file, path):
+            ifcopenshell.api.run("attribute.edit_attributes", self.file, product=wall, attributes={"Name": "W"})
+
+        with pytest.raises(ValueError):
+            ifcopenshell.util.recorder.replay(ifcopenshell.api.run("project.create_file"), path)
+
+    def test_reading_a_log_without_iterating_its_entries_leaves_no_file_open(self, tmp_path):
+        path = str(tmp_path / "model.log")
+        with ifcopenshell.util.recorder.Recorder(self.file, path):
+            ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            header, entries = ifcopenshell.util.recorder.read_log(path)
+            del entries
+            gc.collect()
+        assert header["version"] == ifcopenshell.util.recorder.Recorder.version
+        assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
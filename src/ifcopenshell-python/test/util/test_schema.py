@@ -0,0 +1,106 @@
+import pytest
+import ifcopenshell
+import ifcopenshell.util.schema
+
+
+def migrate_file(ifc_file, schema):
+    new_file = ifcopenshell.file(schema=schema)
+    migrator = ifcopenshell.util.schema.Migrator()
+    migrator.migrate_file(ifc_file, new_file)
+    return new_file, migrator
+
+
+def create_2x3_file():
+    ifc = ifcopenshell.file(schema="IFC2X3")
+    person = ifc.createIfcPerson(FamilyName="Foo")
+    organisation = ifc.createIfcOrganization(Name="Bar")
+    user = ifc.createIfcPersonAndOrganization(person, organisation)
+    application = ifc.createIfcApplication(organisation, "1.0", "App", "App")
+    history = ifc.createIfcOwnerHistory(user, application, None, "ADDED", None, None, None, 0)
+    point = ifc.createIfcCartesianPoint((1.0, 2.0, 3.0))
+    placement = ifc.createIfcLocalPlacement(None, ifc.createIfcAxis2Placement3D(point))
+    ifc.createIfcWall(ifcopenshell.guid.new(), history, "Wall", None, None, placement)
+    ifc.createIfcSpace(
+        ifcopenshell.guid.new(), history, "Space", None, None, placement, None, "Long", "ELEMENT", "INTERNAL"
+    )
+    return ifc
+
+
+class TestMigrator:
+    def test_migrating_from_ifc2x3_to_ifc4_and_back(self):
+        ifc = create_2x3_file()
+        ifc4, migrator = migrate_file(ifc, "IFC4")
+        assert not migrator.unsupported_classes
+        wall = ifc4.by_type("IfcWall")[0]
+        assert wall.GlobalId == ifc.by_type("IfcWall")[0].GlobalId
+        assert wall.Name == "Wall"
+        assert wall.OwnerHistory.OwningUser.ThePerson.FamilyName == "Foo"
+        assert wall.ObjectPlacement.RelativePlacement.Location.Coordinates == (1.0, 2.0, 3.0)
+        space = ifc4.by_type("IfcSpace")[0]
+        # Renamed attributes are migrated to their equivalent
+        assert space.PredefinedType == "INTERNAL"
+        assert space.CompositionType == "ELEMENT"
+        assert space.ObjectPlacement == wall.ObjectPlacement
+
+        ifc2x3, migrator2 = migrate_file(ifc4, "IFC2X3")
+        assert not migrator2.unsupported_classes
+        for element in ifc:
+            new_element = ifc2x3.by_id(migrator2.migrated_ids[migrator.migrated_ids[element.id()]])
+            assert new_element.get_info(include_identifier=False, recursive=True) == element.get_info(
+                include_identifier=False, recursive=True
+            )
+
+    def test_migrating_from_ifc4_to_ifc2x3_and_back(self):
+        ifc = ifcopenshell.file(schema="IFC4")
+        point = ifc.createIfcCartesianPoint((1.0, 2.0, 3.0))
+        placement = ifc.createIfcLocalPlacement(None, ifc.createIfcAxis2Placement3D(point))
+        ifc.createIfcWall(ifcopenshell.guid.new(), None, "Wall", None, None, placement, None, None, "SOLIDWALL")
+        element = ifc.createIfcExternalSpatialElement(ifcopenshell.guid.new(), Name="External")
+        element.PredefinedType = "EXTERNAL"
+
+        ifc2x3, migrator = migrate_file(ifc, "IFC2X3")
+        wall = ifc2x3.by_type("IfcWall")[0]
+        assert wall.Name == "Wall"
+        assert wall.ObjectPlacement.RelativePlacement.Location.Coordinates == (1.0, 2.0, 3.0)
+        # Required attributes which did not exist in IFC4 get a default
+        assert wall.OwnerHistory.is_a("IfcOwnerHistory")
+        # Classes are migrated to their equivalent
+        space = ifc2x3.by_type("IfcSpace")[0]
+        assert space.Name == "External"
+        assert space.InteriorOrExteriorSpace == "EXTERNAL"
+        assert space.CompositionType == "ELEMENT"
+
+        ifc4, migrator = migrate_file(ifc2x3, "IFC4")
+        wall = ifc4.by_type("IfcWall")[0]
+        assert wall.Name == "Wall"
+        assert wall.GlobalId == ifc.by_type("IfcWall")[0].GlobalId
+        assert wall.ObjectPlacement.RelativePlacement.Location.Coordinates == (1.0, 2.0, 3.0)
+        assert ifc4.by_type("IfcSpace")[0].PredefinedType == "EXTERNAL"
+
+    def test_unsupported_classes_are_left_out_of_aggregates(self):
+        ifc = ifcopenshell.file(schema="IFC4")
+        points = ifc.createIfcCartesianPointList3D(((0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0)))
+        face_set = ifc.createIfcTriangulatedFaceSet(points, None, None, ((1, 2, 3),))
+        point = ifc.createIfcCartesianPoint((0.0, 0.0, 0.0))
+        context = ifc.createIfcGeometricRepresentationContext(
+            None, "Model", 3, 1.0e-05, ifc.createIfcAxis2Placement3D(point)
+        )
+        ifc.createIfcShapeRepresentation(context, "Body", "Tessellation", [face_set, point])
+
+        ifc2x3, migrator = migrate_file(ifc, "IFC2X3")
+        assert migrator.unsupported_classes == {"IfcTriangulatedFaceSet", "IfcCartesianPointList3D"}
+        representation = ifc2x3.by_type("IfcShapeRepresentation")[0]
+        assert [i.is_a() for i in representation.Items] == ["IfcCartesianPoint"]
+        assert migrator.migrated[face_set.id()] is None
+        with pytest.raises(ValueError):
+            migrator.migrate(face_set, ifc2x3)
+
+    def test_unsupported_classes_required_by_an_attribute_are_rejected(self):
+        ifc = ifcopenshell.file(schema="IFC4")
+        points = ifc.createIfcCartesianPointList2D(((0.0, 0.0), (1.0, 0.0), (0.0, 1.0)))
+        curve = ifc.createIfcIndexedPolyCurve(points)
+        profile = ifc.createIfcArbitraryClosedProfileDef("AREA", None, curve)
+        with pytest.raises(ValueError):
+            migrate_file(ifc, "IFC2X3")
+        with pytest.raises(ValueError):
+            ifcopenshell.util.schema.Migrator().migrate(profile, ifcopenshell.file(schema="IFC2X3"))
@@ -0,0 +1,106 @@
+import pytest
+import test.bootstrap
+import ifcopenshell.api
+import ifcopenshell.util.element
+import ifcopenshell.util.selector
+
+
+class TestSelector(test.bootstrap.IFC4):
+    # Expected results are those of the previous, uncompiled implementation,
+    # which did not guarantee an order, so results are compared as sets.
+    @pytest.fixture(autouse=True)
+    def setup_model(self, setup):
+        run = ifcopenshell.api.run
+        self.storey = run("root.create_entity", self.file, ifc_class="IfcBuildingStorey", name="Level 1")
+        self.wall_type = run("root.create_entity", self.file, ifc_class="IfcWallType", name="Type A")
+        self.walls = []
+        for i in range(4):
+            wall = run("root.create_entity", self.file, ifc_class="IfcWall", name="Wall %d" % i)
+            pset = run("pset.add_pset", self.file, product=wall, name="Pset_WallCommon")
+            run(
+                "pset.edit_pset", self.file, pset=pset, properties={"IsExternal": i % 2 == 0, "ThermalTransmittance": i}
+            )
+            self.walls.append(wall)
+        run("type.assign_type", self.file, related_object=self.walls[0], relating_type=self.wall_type)
+        run("type.assign_type", self.file, related_object=self.walls[1], relating_type=self.wall_type)
+        run("spatial.assign_container", self.file, product=self.walls[2], relating_structure=self.storey)
+        self.slab = run("root.create_entity", self.file, ifc_class="IfcSlab", name="Slab")
+        self.selector = ifcopenshell.util.selector.Selector()
+
+    def select(self, query, pset_index=None):
+        return set(self.selector.parse(self.file, query, pset_index=pset_index))
+
+    def test_selecting_by_class(self):
+        assert self.select(".IfcWall") == set(self.walls)
+        assert self.select(".IfcBuildingElement") == set(self.walls + [self.slab])
+        assert self.select(".IfcDoor") == set()
+
+    def test_selecting_by_guid(self):
+        assert self.select("#" + self.walls[1].GlobalId) == {self.walls[1]}
+
+    def test_filtering_by_the_existence_of_an_attribute(self):
+        self.walls[0].Name = None
+        assert self.select(".IfcWall[Name]") == set(self.walls[1:])
+
+    def test_filtering_by_attributes(self):
+        assert self.select('.IfcWall[Name = "Wall 1"]') == {self.walls[1]}
+        assert self.select('.IfcWall[Name *= "all"]') == set(self.walls)
+        assert self.select('.IfcWall[type = "IfcWall"]') == set(self.walls)
+
+    def test_filtering_by_properties(self):
+        assert self.select('.IfcWall[Pset_WallCommon.IsExternal = "True"]') == {self.walls[0], self.walls[2]}
+        assert self.select('.IfcWall[Pset_WallCommon.ThermalTransmittance > "1"]') == {self.walls[2], self.walls[3]}
+        assert self.select('.IfcWall[Pset_WallCommon.ThermalTransmittance >= "1"]') == set(self.walls[1:])
+        assert self.select('.IfcWall[Pset_WallCommon.ThermalTransmittance < "1"]') == {self.walls[0]}
+
+    def test_filtering_by_properties_with_an_index(self):
+        index = ifcopenshell.util.element.PsetIndex(self.file, should_inherit=False)
+        for query in (
+            '.IfcWall[Pset_WallCommon.IsExternal = "True"]',
+            '.IfcWall[Pset_WallCommon.IsExternal = "False"]',
+            '.IfcWall[Pset_WallCommon.ThermalTransmittance = "2"]',
+            '.IfcSlab[Pset_WallCommon.IsExternal = "True"]',
+            '.IfcWall[Pset_Foo.Bar = "True"]',
+        ):
+            assert self.select(query, pset_index=index) == self.select(query)
+
+    def test_filtering_typed_elements_by_properties_with_and_without_an_index(self):
+        run = ifcopenshell.api.run
+        pset = run("pset.add_pset", self.file, product=self.wall_type, name="Pset_WallCommon")
+        run("pset.edit_pset", self.file, pset=pset, properties={"IsExternal": True, "Reference": "TA"})
+        index = ifcopenshell.util.element.PsetIndex(self.file, should_inherit=False)
+        for query, expected in (
+            ('.IfcWall[Pset_WallCommon.IsExternal = "True"]', {self.walls[0], self.walls[2]}),
+            ('.IfcWall[Pset_WallCommon.Reference = "TA"]', set()),
+            ('.IfcWallType[Pset_WallCommon.Reference = "TA"]', {self.wall_type}),
+        ):
+            assert self.select(query) == expected
+            assert self.select(query, pset_index=index) == expected
+
+    def test_an_index_with_inherited_properties_is_not_supported(self):
+        index = ifcopenshell.util.element.PsetIndex(self.file)
+        with pytest.raises(ValueError):
+            self.select('.IfcWall[Pset_WallCommon.IsExternal = "True"]', pset_index=index)
+
+    def test_filtering_by_related_elements(self):
+        assert self.select('.IfcWall[type.Name = "Type A"]') == {self.walls[0], self.walls[1]}
+        assert self.select('.IfcWall[container.Name = "Level 1"]') == {self.walls[2]}
+
+    def test_selecting_inverse_relationships(self):
+        assert self.select("*.IfcWallType") == {self.walls[0], self.walls[1]}
+        assert self.select("@.IfcBuildingStorey") == {self.walls[2]}
+
+    def test_combining_queries(self):
+        assert self.select(".IfcWall | .IfcSlab") == set(self.walls + [self.slab])
+        assert self.select('.IfcWall & .IfcWall[Name = "Wall 3"]') == {self.walls[3]}
+        assert self.select('.IfcWall[Name = "Wall 0"] | .IfcWall[Name = "Wall 0"]') == {self.walls[0]}
+
+    def test_grouping_queries(self):
+        query = '(.IfcWall & .IfcWall[Pset_WallCommon.IsExternal = "True"]) | .IfcSlab'
+        assert self.select(query) == {self.walls[0], self.walls[2], self.slab}
+        query = '.IfcWall & (.IfcWall[Name = "Wall 1"] | .IfcWall[Name = "Wall 2"])'
+        assert self.select(query) == {self.walls[1], self.walls[2]}
+
+    def test_results_have_no_duplicates(self):
+        results = self.selector.parse(self.file, ".IfcWall | .IfcWall")
+        assert len(results) == len(set(results)) == 4
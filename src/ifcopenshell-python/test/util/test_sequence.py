@@ -0,0 +1,36 @@
+import datetime
+import test.bootstrap
+import ifcopenshell.util.sequence
+
+
+class TestWorkingDayIndexIFC4(test.bootstrap.IFC4):
+    def create_calendar(self):
+        weekdays = self.file.createIfcRecurrencePattern("WEEKLY", WeekdayComponent=[1, 2, 3, 4, 5])
+        holiday = self.file.createIfcWorkTime(Start="2021-01-04", Finish="2021-01-05")
+        return self.file.createIfcWorkCalendar(
+            ifcopenshell.guid.new(),
+            WorkingTimes=[self.file.createIfcWorkTime(RecurrencePattern=weekdays)],
+            ExceptionTimes=[holiday],
+        )
+
+    def test_counting_working_days_like_the_calendar_functions(self):
+        calendar = self.create_calendar()
+        index = ifcopenshell.util.sequence.WorkingDayIndex(calendar, start=datetime.date(2021, 1, 1))
+        start = datetime.date(2020, 12, 1)
+        for offset in range(0, 90, 7):
+            finish = start + datetime.timedelta(days=offset)
+            assert index.count_working_days(start, finish) == ifcopenshell.util.sequence.count_working_days(
+                start, finish, calendar
+            )
+
+    def test_offsetting_dates_like_the_calendar_functions(self):
+        calendar = self.create_calendar()
+        index = ifcopenshell.util.sequence.WorkingDayIndex(calendar, start=datetime.date(2021, 1, 1))
+        start = datetime.date(2021, 1, 1)
+        for days in (-10, -1, 0, 1, 2, 5, 30, 400):
+            duration = datetime.timedelta(days=days)
+            for duration_type in ("WORKTIME", "ELAPSEDTIME"):
+                assert index.get_finish_date(start, duration, duration_type) == (
+                    ifcopenshell.util.sequence.get_finish_date(start, duration, duration_type, calendar)
+                )
+        assert index.get_finish_date(start, datetime.timedelta(days=1)) == datetime.date(2021, 1, 6)
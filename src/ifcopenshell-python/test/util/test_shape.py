@@ -0,0 +1,76 @@
+import gc
+import numpy as np
+import test.bootstrap
+import ifcopenshell.geom
+import ifcopenshell.guid
+import ifcopenshell.util.shape
+from types import SimpleNamespace
+
+
+class TestGetVertices:
+    def test_getting_vertices_as_rows_of_coordinates(self):
+        geometry = SimpleNamespace(verts=(0.0, 0.0, 0.0, 1.0, 0.0, 0.0))
+        vertices = ifcopenshell.util.shape.get_vertices(geometry)
+        assert vertices.shape == (2, 3)
+        assert vertices.dtype == np.float64
+        assert vertices.tolist() == [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]]
+
+    def test_getting_vertices_from_a_native_buffer(self):
+        data = np.array([0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+        geometry = SimpleNamespace(verts_buffer=lambda: memoryview(data.tobytes()))
+        assert ifcopenshell.util.shape.get_vertices(geometry).tolist() == [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]]
+
+
+class TestGetFaces:
+    def test_getting_faces_as_rows_of_vertex_indices(self):
+        geometry = SimpleNamespace(faces=(0, 1, 2, 2, 3, 0))
+        faces = ifcopenshell.util.shape.get_faces(geometry)
+        assert faces.dtype == np.int32
+        assert faces.tolist() == [[0, 1, 2], [2, 3, 0]]
+
+
+class TestGetMaterialIds:
+    def test_getting_material_ids_per_face(self):
+        geometry = SimpleNamespace(material_ids=(0, 1))
+        assert ifcopenshell.util.shape.get_material_ids(geometry).tolist() == [0, 1]
+
+
+class TestNativeTriangulation(test.bootstrap.IFC4):
+    def create_shape(self):
+        context = self.file.createIfcGeometricRepresentationContext(
+            ContextType="Model",
+            CoordinateSpaceDimension=3,
+            Precision=1e-5,
+            WorldCoordinateSystem=self.file.createIfcAxis2Placement3D(
+                self.file.createIfcCartesianPoint((0.0, 0.0, 0.0))
+            ),
+        )
+        profile = self.file.createIfcRectangleProfileDef("AREA", XDim=1.0, YDim=2.0)
+        solid = self.file.createIfcExtrudedAreaSolid(profile, None, self.file.createIfcDirection((0.0, 0.0, 1.0)), 3.0)
+        wall = self.file.createIfcWall(
+            ifcopenshell.guid.new(),
+            ObjectPlacement=self.file.createIfcLocalPlacement(
+                RelativePlacement=self.file.createIfcAxis2Placement3D(
+                    self.file.createIfcCartesianPoint((0.0, 0.0, 0.0))
+                )
+            ),
+            Representation=self.file.createIfcProductDefinitionShape(
+                Representations=[self.file.createIfcShapeRepresentation(context, "Body", "SweptSolid", [solid])]
+            ),
+        )
+        settings = ifcopenshell.geom.settings()
+        return ifcopenshell.geom.create_shape(settings, wall)
+
+    def test_buffers_match_the_tuple_attributes(self):
+        geometry = self.create_shape().geometry
+        assert ifcopenshell.util.shape.get_vertices(geometry).ravel().tolist() == list(geometry.verts)
+        assert ifcopenshell.util.shape.get_faces(geometry).ravel().tolist() == list(geometry.faces)
+        assert ifcopenshell.util.shape.get_vertices(geometry, copy=False).ravel().tolist() == list(geometry.verts)
+
+    def test_arrays_outlive_the_shape_by_default(self):
+        shape = self.create_shape()
+        expected = list(shape.geometry.verts)
+        vertices = ifcopenshell.util.shape.get_vertices(shape.geometry)
+        del shape
+        gc.collect()
+        assert vertices.ravel().tolist() == expected
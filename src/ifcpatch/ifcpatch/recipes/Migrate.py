@@ -17,21 +17,36 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
 
+import time
 import ifcopenshell
 import ifcopenshell.util.schema
 
 
 class Patcher:
-    def __init__(self, src, file, logger, args=None):
+    def __init__(self, src, file, logger, schema: str = "IFC4"):
+        """Migrate
+
+        Migrate a model to another schema, such as from IFC2X3 to IFC4.
+
+        Migration is experimental and only supports IFC2X3 and IFC4. Classes
+        without an equivalent in the new schema are not migrated.
+
+        :param schema: The schema to migrate to.
+        """
         self.src = src
         self.file = file
         self.logger = logger
-        self.args = args
+        self.schema = schema
 
     def patch(self):
-        self.file_patched = ifcopenshell.file(schema=self.args[0])
+        self.file_patched = ifcopenshell.file(schema=self.schema)
         migrator = ifcopenshell.util.schema.Migrator()
-        for element in self.file:
-            migrator.migrate(element, self.file_patched)
-            print("Migrating", element)
-            print("Successfully converted to", migrator.migrate(element, self.file_patched))
+        start = time.perf_counter()
+        migrator.migrate_file(self.file, self.file_patched)
+        duration = time.perf_counter() - start
+        total = len(migrator.migrated)
+        self.logger.info(
+            "Migrated {} instances in {:.2f}s ({:.0f} instances/s)".format(total, duration, total / (duration or 1))
+        )
+        for ifc_class in sorted(migrator.unsupported_classes):
+            self.logger.warning("Class migration to {} not yet supported for {}".format(self.schema, ifc_class))
@@ -1,4 +1,3 @@
-
 # IfcPatch - IFC patching utiliy
 # Copyright (C) 2020, 2021 Dion Moult <dion@thinkmoult.com>
 #
@@ -18,68 +17,97 @@
 # along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
 
 import ifcopenshell
-import ifcopenshell.util.element
-from toposort import toposort_flatten as toposort
-
 
 
 class Patcher:
-    def __init__(self, src, file, logger, args=None):
+    def __init__(self, src, file, logger, tolerance: float = 0.0):
+        """Optimise
+
+        Merge duplicate instances, such as repeated points, directions and
+        owner histories, and write the remaining instances to a new file.
+
+        Instances are hashed bottom-up, once each, from their class and
+        attribute values, where references are replaced by the hash of the
+        instance they refer to. Instances are rewritten to the new file as
+        soon as all instances they refer to are, so this runs in a single
+        pass over the file.
+
+        :param tolerance: Treat cartesian points as equal if their coordinates
+            round to the same multiples of this tolerance. Zero only merges
+            exactly equal points. The first point found is kept. All other
+            floating point values are always compared exactly.
+        """
         self.src = src
         self.file = file
         self.logger = logger
-        self.args = args
+        self.tolerance = float(tolerance or 0.0)
         self.optimized_file = ifcopenshell.file(schema=self.file.schema)
 
-
     def patch(self):
-        def generate_instances_and_references():
-            """
-            Generator which yields an entity id and 
-            the set of all of its references contained in its attributes. 
-            """
-            for inst in self.file:
-                yield inst.id(), set(i.id() for i in self.file.traverse(inst)[1:] if i.id())
+        # Maps the id of every visited instance to its canonical instance in the new file
+        self.instance_mapping = {}
+        # Maps the hash key of every canonical instance to the canonical instance
+        self.hash_to_instance = {}
 
-        instance_mapping = {}
+        for inst in self.file:
+            if inst.id() not in self.instance_mapping:
+                self.optimise(inst)
 
+        self.logger.info("Merged {} instances into {}".format(len(self.instance_mapping), len(self.hash_to_instance)))
+        self.file = self.optimized_file
 
-        def map_value(v):
-            """
-            Recursive function which replicates an entity instance, with 
-            its attributes, mapping references to already registered
-            instances. Indeed, because of the toposort we know that 
-            forward attribute value instances are mapped before the instances
-            that reference them.
-            """
-            if isinstance(v, (list, tuple)):
-                # lists are recursively traversed
-                return type(v)(map(map_value, v))
-            elif isinstance(v, ifcopenshell.entity_instance):
-                if v.id() == 0:
-                    # express simple types are not part of the toposort and just copied
-                    return self.optimized_file.create_entity(v.is_a(), v[0])
-          
-                
-                return instance_mapping[v]
-            else:
-                # a plain python value can just be returned
-                return v
-
-        info_to_id = {}
-            
-        for id in toposort(dict(generate_instances_and_references())):
-            inst = self.file[id]
-            info = inst.get_info(include_identifier=False, recursive=True, return_type=frozenset)
-            if info in info_to_id:
-                mapped = instance_mapping[inst] = instance_mapping[self.file[info_to_id[info]]]
+    def optimise(self, inst):
+        # An iterative depth first traversal, as the nesting of geometry may
+        # exceed the Python recursion limit
+        attributes = list(inst)
+        stack = [(inst, attributes, self.get_references(attributes))]
+        visiting = {inst.id()}
+        while stack:
+            inst, attributes, references = stack[-1]
+            reference = next((r for r in references if r.id() not in self.instance_mapping), None)
+            if reference is not None:
+                if reference.id() in visiting:
+                    raise ValueError("Instance {} has a cyclic reference to {}".format(inst, reference))
+                visiting.add(reference.id())
+                reference_attributes = list(reference)
+                stack.append((reference, reference_attributes, self.get_references(reference_attributes)))
+                continue
+            stack.pop()
+            visiting.discard(inst.id())
 
+            if self.tolerance and inst.is_a("IfcCartesianPoint"):
+                key = (inst.is_a(), tuple(round(c / self.tolerance) for c in inst.Coordinates))
             else:
-                info_to_id[info] = id
-                instance_mapping[inst] = self.optimized_file.create_entity(
-                    inst.is_a(),
-                    *map(map_value, inst)
+                key = (inst.is_a(), tuple(self.get_key(v) for v in attributes))
+            canonical = self.hash_to_instance.get(key)
+            if canonical is None:
+                canonical = self.hash_to_instance[key] = self.optimized_file.create_entity(
+                    inst.is_a(), *[self.map_value(v) for v in attributes]
                 )
+            self.instance_mapping[inst.id()] = canonical
 
-        self.file = self.optimized_file
-        
\ No newline at end of file
+    def get_references(self, value):
+        if isinstance(value, (list, tuple)):
+            for v in value:
+                yield from self.get_references(v)
+        elif isinstance(value, ifcopenshell.entity_instance) and value.id():
+            yield value
+
+    def get_key(self, value):
+        if isinstance(value, (list, tuple)):
+            return tuple(self.get_key(v) for v in value)
+        elif isinstance(value, ifcopenshell.entity_instance):
+            if value.id() == 0:
+                # Express simple types are values rather than references
+                return (value.is_a(), self.get_key(value.wrappedValue))
+            return self.instance_mapping[value.id()].id()
+        return value
+
+    def map_value(self, value):
+        if isinstance(value, (list, tuple)):
+            return type(value)(map(self.map_value, value))
+        elif isinstance(value, ifcopenshell.entity_instance):
+            if value.id() == 0:
+                return self.optimized_file.create_entity(value.is_a(), value.wrappedValue)
+            return self.instance_mapping[value.id()]
+        return value
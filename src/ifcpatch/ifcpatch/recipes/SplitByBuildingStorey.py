@@ -17,45 +17,271 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import re
+import multiprocessing
+import ifcopenshell
+import ifcopenshell.util.selector
+
+# The patcher whose partitions are written by forked worker processes, which
+# inherit the parsed file rather than parsing it again
+forked_patcher = None
+
+
+def write_forked_partition(index):
+    return forked_patcher.write_partition(index)
+
+
 class Patcher:
-    def __init__(self, src, file, logger, args=None):
+    # Element classes of each discipline, where the first match wins
+    disciplines = (
+        (
+            "Structural",
+            ("IfcBeam", "IfcColumn", "IfcFooting", "IfcPile", "IfcMember", "IfcPlate", "IfcReinforcingElement"),
+        ),
+        ("Services", ("IfcDistributionElement",)),
+        ("Architecture", ("IfcElement",)),
+    )
+
+    # Resources which refer to the instances they apply to rather than being
+    # referred to by them, and so are not reached by following references
+    inverse_resources = (
+        ("IfcStyledItem", "Item"),
+        ("IfcPresentationLayerAssignment", "AssignedItems"),
+        ("IfcMaterialDefinitionRepresentation", "RepresentedMaterial"),
+        ("IfcExternalReferenceRelationship", "RelatedResourceObjects"),
+    )
+
+    def __init__(self, src, file, logger, key: str = "storey", query: str = "", num_processes: int = 1):
+        """Split By Building Storey
+
+        Split a model into one file per partition, such as per building storey.
+
+        The model is parsed once. Every element is assigned to partitions
+        along with its decomposition, such as its openings and parts. The
+        set of partitions of every other instance is then derived from the
+        relationships and references of the elements, so that each file
+        contains the shared spatial structure, types, property sets, styles
+        and other resources that its elements need. Files are named
+        "<index>-<name>.ifc" and written to the working directory.
+
+        :param key: What to partition by, either "storey", "building",
+            "discipline" or "query".
+        :param query: Selector queries separated by semicolons, one per
+            partition, used when the key is "query".
+        :param num_processes: The number of processes writing files in
+            parallel, where 0 uses all CPUs. Parallel writing is only
+            available where processes can be forked.
+        """
         self.src = src
         self.file = file
         self.logger = logger
-        self.args = args
+        self.key = key
+        self.query = query
+        self.num_processes = int(num_processes)
 
     def patch(self):
-        import ifcopenshell
-        from shutil import copyfile
-        storeys = self.file.by_type('IfcBuildingStorey')
-        for i, storey in enumerate(storeys):
-            dest = '{}-{}.ifc'.format(i, storey.Name)
-            copyfile(self.src, dest)
-            old_ifc = ifcopenshell.open(dest)
-            new_ifc = ifcopenshell.file(schema=self.file.schema)
-            if self.file.schema == 'IFC2X3':
-                elements = old_ifc.by_type('IfcProject') + old_ifc.by_type('IfcProduct')
-            else:
-                elements = old_ifc.by_type('IfcContext') + old_ifc.by_type('IfcProduct')
-            inverse_elements = []
-            for element in elements:
-                if element.is_a('IfcElement') \
-                        and not self.is_in_storey(element, storey):
-                    element.Representation = None
+        self.partitions = self.get_partitions()
+        self.all_partitions = (1 << len(self.partitions)) - 1
+        # Maps instance ids to a bitmask of the partitions they belong to
+        self.masks = {}
+        # Ids of products and contexts, whose partitions are never derived from references
+        self.fixed = set()
+        # Ids of instances with aggregates that must be filtered per partition
+        self.filtered = set()
+
+        self.assign_products()
+        self.assign_dependents()
+        self.assign_relationships()
+        for inst_id in list(self.masks):
+            self.assign_references(self.file.by_id(inst_id))
+        self.assign_inverse_resources()
+
+        self.members = [[] for partition in self.partitions]
+        for inst_id, mask in sorted(self.masks.items()):
+            index = 0
+            while mask:
+                if mask & 1:
+                    self.members[index].append(inst_id)
+                mask >>= 1
+                index += 1
+
+        num_processes = self.num_processes or os.cpu_count() or 1
+        if num_processes > 1 and "fork" in multiprocessing.get_all_start_methods():
+            global forked_patcher
+            forked_patcher = self
+            try:
+                with multiprocessing.get_context("fork").Pool(num_processes) as pool:
+                    filepaths = pool.map(write_forked_partition, range(len(self.partitions)))
+            finally:
+                forked_patcher = None
+        else:
+            filepaths = [self.write_partition(i) for i in range(len(self.partitions))]
+        for filepath, members in zip(filepaths, self.members):
+            self.logger.info("Wrote {} instances to {}".format(len(members), filepath))
+
+    def get_partitions(self):
+        if self.key == "storey":
+            return [(s.Name, self.get_decomposition([s])) for s in self.file.by_type("IfcBuildingStorey")]
+        elif self.key == "building":
+            return [(b.Name, self.get_decomposition([b])) for b in self.file.by_type("IfcBuilding")]
+        elif self.key == "discipline":
+            elements = {}
+            for element in self.file.by_type("IfcElement"):
+                # Features such as openings follow the element they belong to
+                if not element.is_a("IfcFeatureElement"):
+                    elements.setdefault(self.get_discipline(element), []).append(element)
+            return [(name, self.get_decomposition(elements[name])) for name, _ in self.disciplines if name in elements]
+        elif self.key == "query":
+            selector = ifcopenshell.util.selector.Selector()
+            queries = [q.strip() for q in self.query.split(";") if q.strip()]
+            return [(q, self.get_decomposition(selector.parse(self.file, q))) for q in queries]
+        raise ValueError("Unknown partition key {}".format(self.key))
+
+    def get_discipline(self, element):
+        for name, ifc_classes in self.disciplines:
+            if any(element.is_a(ifc_class) for ifc_class in ifc_classes):
+                return name
+
+    def get_decomposition(self, products):
+        results = {}
+        queue = list(products)
+        while queue:
+            product = queue.pop()
+            if product.id() in results:
+                continue
+            results[product.id()] = product
+            for rel in getattr(product, "ContainsElements", ()):
+                queue.extend(rel.RelatedElements)
+            for rel in getattr(product, "IsDecomposedBy", ()):
+                queue.extend(rel.RelatedObjects)
+            for rel in getattr(product, "IsNestedBy", ()):
+                queue.extend(rel.RelatedObjects)
+            for rel in getattr(product, "HasOpenings", ()):
+                queue.append(rel.RelatedOpeningElement)
+            for rel in getattr(product, "HasPorts", ()):
+                queue.append(rel.RelatingPort)
+        return list(results.values())
+
+    def assign_products(self):
+        for index, (name, products) in enumerate(self.partitions):
+            for product in products:
+                self.masks[product.id()] = self.masks.get(product.id(), 0) | (1 << index)
+        # Products outside of any partition are shared, except for elements
+        # and their ports, which only belong to the partitions they are in
+        contexts = self.file.by_type("IfcProject" if self.file.schema == "IFC2X3" else "IfcContext")
+        for product in self.file.by_type("IfcProduct") + contexts:
+            self.fixed.add(product.id())
+            if product.id() not in self.masks and not product.is_a("IfcElement") and not product.is_a("IfcPort"):
+                self.masks[product.id()] = self.all_partitions
+
+    def assign_dependents(self):
+        # Definitions such as types and property sets, and assigned objects
+        # such as groups, belong to the partitions of the objects they relate to
+        relationships = []
+        for rel in self.file.by_type("IfcRelDefines") + self.file.by_type("IfcRelAssigns"):
+            attributes = rel.get_info(include_identifier=False, recursive=False)
+            related = [v for k, v in attributes.items() if k.startswith("Related")]
+            relating = [v for k, v in attributes.items() if k.startswith("Relating")]
+            relating = [v for v in relating if v is not None and v.id() not in self.fixed]
+            if relating:
+                relationships.append((list(self.get_references(related)), relating))
+        has_changed = True
+        while has_changed:
+            has_changed = False
+            for related, relating in relationships:
+                mask = 0
+                for inst in related:
+                    mask |= self.masks.get(inst.id(), 0)
+                for inst in relating:
+                    current = self.masks.get(inst.id(), 0)
+                    if current | mask != current:
+                        self.masks[inst.id()] = current | mask
+                        has_changed = True
+
+    def assign_relationships(self):
+        # A relationship belongs to the partitions of all of its singular
+        # objects and of at least one object of each of its aggregates
+        for rel in self.file.by_type("IfcRelationship"):
+            mask = self.all_partitions
+            for value in rel:
+                if isinstance(value, ifcopenshell.entity_instance):
+                    if value.is_a("IfcRoot"):
+                        mask &= self.masks.get(value.id(), 0)
+                elif isinstance(value, (list, tuple)):
+                    roots = [v for v in self.get_references(value) if v.is_a("IfcRoot")]
+                    if roots:
+                        self.filtered.add(rel.id())
+                        aggregate_mask = 0
+                        for root in roots:
+                            aggregate_mask |= self.masks.get(root.id(), 0)
+                        mask &= aggregate_mask
+            if mask:
+                self.masks[rel.id()] = mask
+
+    def assign_references(self, inst):
+        mask = self.masks[inst.id()]
+        queue = [inst]
+        while queue:
+            for reference in self.get_references(list(queue.pop())):
+                if reference.id() in self.fixed:
                     continue
-                if element.is_a('IfcElement'):
-                    styled_rep_items = [i for i in old_ifc.traverse(element) if i.is_a('IfcRepresentationItem') and i.StyledByItem]
-                    [new_ifc.add(i.StyledByItem[0]) for i in styled_rep_items]
-                new_ifc.add(element)
-                inverse_elements.extend(old_ifc.get_inverse(element))
-            for inverse_element in inverse_elements:
-                new_ifc.add(inverse_element)
-            for element in new_ifc.by_type('IfcElement'):
-                if not self.is_in_storey(element, storey):
-                    new_ifc.remove(element)
-            new_ifc.write(dest)
-
-    def is_in_storey(self, element, storey):
-        return element.ContainedInStructure \
-            and element.ContainedInStructure[0].RelatingStructure.is_a('IfcBuildingStorey') \
-            and element.ContainedInStructure[0].RelatingStructure.GlobalId == storey.GlobalId
+                current = self.masks.get(reference.id(), 0)
+                if current | mask != current:
+                    self.masks[reference.id()] = current | mask
+                    queue.append(reference)
+
+    def assign_inverse_resources(self):
+        resources = []
+        for ifc_class, attribute in self.inverse_resources:
+            try:
+                insts = self.file.by_type(ifc_class)
+            except RuntimeError:
+                # The class does not exist in this schema
+                continue
+            for inst in insts:
+                value = getattr(inst, attribute)
+                mask = 0
+                for reference in self.get_references(value):
+                    mask |= self.masks.get(reference.id(), 0)
+                if mask:
+                    self.masks[inst.id()] = self.masks.get(inst.id(), 0) | mask
+                    if isinstance(value, (list, tuple)):
+                        self.filtered.add(inst.id())
+                    resources.append(inst)
+        for inst in resources:
+            self.assign_references(inst)
+
+    def get_references(self, value):
+        if isinstance(value, (list, tuple)):
+            for v in value:
+                yield from self.get_references(v)
+        elif isinstance(value, ifcopenshell.entity_instance) and value.id():
+            yield value
+
+    def write_partition(self, index):
+        bit = 1 << index
+        new = ifcopenshell.file(schema=self.file.schema)
+        for inst_id in self.members[index]:
+            inst = self.file.by_id(inst_id)
+            if inst_id in self.filtered:
+                new.create_entity(inst.is_a(), *[self.filter_value(new, v, bit) for v in inst])
+            else:
+                new.add(inst)
+        name = re.sub(r"[^\w\-. ]", "_", str(self.partitions[index][0]))
+        filepath = "{}-{}.ifc".format(index, name)
+        new.write(filepath)
+        return filepath
+
+    def filter_value(self, new, value, bit):
+        if isinstance(value, (list, tuple)):
+            return [
+                self.filter_value(new, v, bit)
+                for v in value
+                if not isinstance(v, ifcopenshell.entity_instance) or not v.id() or self.masks.get(v.id(), 0) & bit
+            ]
+        elif isinstance(value, ifcopenshell.entity_instance):
+            if value.id() == 0:
+                return new.create_entity(value.is_a(), value.wrappedValue)
+            return new.add(value)
+        return value
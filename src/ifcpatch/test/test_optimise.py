@@ -0,0 +1,63 @@
+import logging
+import ifcopenshell
+from ifcpatch.recipes.Optimise import Patcher
+
+
+def optimise(ifc, tolerance=0.0):
+    patcher = Patcher(None, ifc, logging.getLogger("IFCPatch"), tolerance)
+    patcher.patch()
+    return patcher.file
+
+
+class TestOptimise:
+    def test_merging_duplicate_instances(self):
+        ifc = ifcopenshell.file(schema="IFC4")
+        for i in range(3):
+            point = ifc.createIfcCartesianPoint((1.0, 2.0, 3.0))
+            direction = ifc.createIfcDirection((0.0, 0.0, 1.0))
+            ifc.createIfcAxis2Placement3D(point, direction)
+        ifc.createIfcCartesianPoint((1.0, 2.0, 4.0))
+        result = optimise(ifc)
+        assert len(result.by_type("IfcAxis2Placement3D")) == 1
+        assert len(result.by_type("IfcDirection")) == 1
+        assert sorted(p.Coordinates for p in result.by_type("IfcCartesianPoint")) == [(1.0, 2.0, 3.0), (1.0, 2.0, 4.0)]
+        placement = result.by_type("IfcAxis2Placement3D")[0]
+        assert placement.Location.Coordinates == (1.0, 2.0, 3.0)
+        assert placement.Axis.DirectionRatios == (0.0, 0.0, 1.0)
+
+    def test_instances_with_different_references_are_kept(self):
+        ifc = ifcopenshell.file(schema="IFC4")
+        ifc.createIfcAxis2Placement3D(ifc.createIfcCartesianPoint((0.0, 0.0, 0.0)))
+        ifc.createIfcAxis2Placement3D(ifc.createIfcCartesianPoint((1.0, 0.0, 0.0)))
+        result = optimise(ifc)
+        assert len(result.by_type("IfcAxis2Placement3D")) == 2
+
+    def test_merging_points_within_a_tolerance(self):
+        ifc = ifcopenshell.file(schema="IFC4")
+        ifc.createIfcAxis2Placement3D(ifc.createIfcCartesianPoint((1.0, 2.0, 3.0)))
+        ifc.createIfcAxis2Placement3D(ifc.createIfcCartesianPoint((1.0001, 2.0, 3.0)))
+        ifc.createIfcCartesianPoint((1.1, 2.0, 3.0))
+        assert len(optimise(ifc).by_type("IfcCartesianPoint")) == 3
+
+        ifc = ifcopenshell.file(schema="IFC4")
+        ifc.createIfcAxis2Placement3D(ifc.createIfcCartesianPoint((1.0, 2.0, 3.0)))
+        ifc.createIfcAxis2Placement3D(ifc.createIfcCartesianPoint((1.0001, 2.0, 3.0)))
+        ifc.createIfcCartesianPoint((1.1, 2.0, 3.0))
+        result = optimise(ifc, tolerance=0.001)
+        points = result.by_type("IfcCartesianPoint")
+        assert sorted(p.Coordinates for p in points) == [(1.0, 2.0, 3.0), (1.1, 2.0, 3.0)]
+        # Placements referring to the merged points are merged too
+        assert len(result.by_type("IfcAxis2Placement3D")) == 1
+
+    def test_other_floats_are_compared_exactly_with_a_tolerance(self):
+        ifc = ifcopenshell.file(schema="IFC4")
+        ifc.createIfcDirection((1.0, 0.0, 0.0))
+        ifc.createIfcDirection((1.0001, 0.0, 0.0))
+        ifc.createIfcQuantityLength(Name="Length", LengthValue=1.0)
+        ifc.createIfcQuantityLength(Name="Length", LengthValue=1.0001)
+        result = optimise(ifc, tolerance=0.001)
+        assert sorted(d.DirectionRatios for d in result.by_type("IfcDirection")) == [
+            (1.0, 0.0, 0.0),
+            (1.0001, 0.0, 0.0),
+        ]
+        assert sorted(q.LengthValue for q in result.by_type("IfcQuantityLength")) == [1.0, 1.0001]
@@ -0,0 +1,110 @@
+import logging
+import multiprocessing
+import pytest
+import ifcopenshell
+import ifcopenshell.api
+from ifcpatch.recipes.SplitByBuildingStorey import Patcher
+
+
+def run(usecase, *args, **settings):
+    return ifcopenshell.api.run(usecase, *args, **settings)
+
+
+class TestSplitByBuildingStorey:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        # Partitions are written to the working directory
+        monkeypatch.chdir(tmp_path)
+        self.path = tmp_path
+        self.file = ifc = run("project.create_file")
+        project = run("root.create_entity", ifc, ifc_class="IfcProject", name="Project")
+        site = run("root.create_entity", ifc, ifc_class="IfcSite", name="Site")
+        building = run("root.create_entity", ifc, ifc_class="IfcBuilding", name="Building")
+        run("aggregate.assign_object", ifc, product=site, relating_object=project)
+        run("aggregate.assign_object", ifc, product=building, relating_object=site)
+        self.wall_type = run("root.create_entity", ifc, ifc_class="IfcWallType", name="Shared Type")
+        self.material = run("material.add_material", ifc, name="Shared Material")
+        self.storeys = []
+        self.elements = []
+        for i in range(2):
+            storey = run("root.create_entity", ifc, ifc_class="IfcBuildingStorey", name="Level {}".format(i))
+            run("aggregate.assign_object", ifc, product=storey, relating_object=building)
+            wall = run("root.create_entity", ifc, ifc_class="IfcWall", name="Wall {}".format(i))
+            column = run("root.create_entity", ifc, ifc_class="IfcColumn", name="Column {}".format(i))
+            run("spatial.assign_container", ifc, product=wall, relating_structure=storey)
+            run("spatial.assign_container", ifc, product=column, relating_structure=storey)
+            run("type.assign_type", ifc, related_object=wall, relating_type=self.wall_type)
+            run("material.assign_material", ifc, product=wall, material=self.material)
+            self.storeys.append(storey)
+            self.elements.append([wall, column])
+        opening = run("root.create_entity", ifc, ifc_class="IfcOpeningElement", name="Opening")
+        run("void.add_opening", ifc, opening=opening, element=self.elements[0][0])
+        self.elements[0].append(opening)
+
+    def split(self, **settings):
+        Patcher(None, self.file, logging.getLogger("IFCPatch"), **settings).patch()
+
+    def open(self, filename):
+        return ifcopenshell.open(str(self.path / filename))
+
+    def get_guids(self, ifc, ifc_class):
+        return {e.GlobalId for e in ifc.by_type(ifc_class)}
+
+    def assert_storey_partitions(self):
+        for i, elements in enumerate(self.elements):
+            ifc = self.open("{}-Level {}.ifc".format(i, i))
+            assert self.get_guids(ifc, "IfcElement") == {e.GlobalId for e in elements}
+            assert self.get_guids(ifc, "IfcBuildingStorey") == {self.storeys[i].GlobalId}
+            assert len(ifc.by_type("IfcProject")) == 1
+            assert len(ifc.by_type("IfcBuilding")) == 1
+            # Shared elements are copied into every partition that uses them
+            assert self.get_guids(ifc, "IfcWallType") == {self.wall_type.GlobalId}
+            assert [m.Name for m in ifc.by_type("IfcMaterial")] == ["Shared Material"]
+            # Relationships only refer to elements within the partition
+            rel = ifc.by_type("IfcRelDefinesByType")[0]
+            assert {e.GlobalId for e in rel.RelatedObjects} == {elements[0].GlobalId}
+            rel = ifc.by_guid(self.storeys[i].GlobalId).ContainsElements[0]
+            assert {e.GlobalId for e in rel.RelatedElements} == {e.GlobalId for e in elements[:2]}
+            rel = ifc.by_type("IfcRelAggregates")
+            assert {s.GlobalId for r in rel for s in r.RelatedObjects if s.is_a("IfcBuildingStorey")} == {
+                self.storeys[i].GlobalId
+            }
+
+    def test_splitting_by_storey(self):
+        self.split()
+        self.assert_storey_partitions()
+        assert len(self.open("0-Level 0.ifc").by_type("IfcRelVoidsElement")) == 1
+        assert len(self.open("1-Level 1.ifc").by_type("IfcRelVoidsElement")) == 0
+
+    @pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="Requires forked processes")
+    def test_splitting_by_storey_in_parallel(self):
+        self.split(num_processes=2)
+        self.assert_storey_partitions()
+
+    def test_splitting_by_building(self):
+        self.split(key="building")
+        ifc = self.open("0-Building.ifc")
+        assert self.get_guids(ifc, "IfcElement") == {e.GlobalId for e in sum(self.elements, [])}
+
+    def test_splitting_by_discipline(self):
+        self.split(key="discipline")
+        structural = self.open("0-Structural.ifc")
+        architecture = self.open("1-Architecture.ifc")
+        assert self.get_guids(structural, "IfcElement") == {e[1].GlobalId for e in self.elements}
+        assert self.get_guids(structural, "IfcWallType") == set()
+        walls = {e[0].GlobalId for e in self.elements} | {self.elements[0][2].GlobalId}
+        assert self.get_guids(architecture, "IfcElement") == walls
+        assert self.get_guids(architecture, "IfcWallType") == {self.wall_type.GlobalId}
+
+    def test_splitting_by_query(self):
+        self.split(key="query", query=".IfcWall; .IfcColumn")
+        walls = self.open("0-.IfcWall.ifc")
+        columns = self.open("1-.IfcColumn.ifc")
+        assert self.get_guids(walls, "IfcElement") == {e[0].GlobalId for e in self.elements} | {
+            self.elements[0][2].GlobalId
+        }
+        assert self.get_guids(columns, "IfcElement") == {e[1].GlobalId for e in self.elements}
+
+    def test_an_unknown_key_is_rejected(self):
+        with pytest.raises(ValueError):
+            self.split(key="foo")
@@ -246,6 +246,15 @@ struct ShapeRTTI : public boost::static_visitor<PyObject*>
 	%}
 };
 
+%{
+	template <typename T>
+	static PyObject* helper_fn_vector_buffer(const std::vector<T>& v) {
+		static char empty = 0;
+		char* data = v.empty() ? &empty : (char*) v.data();
+		return PyMemoryView_FromMemory(data, v.size() * sizeof(T), PyBUF_READ);
+	}
+%}
+
 // Specialized accessors follow later, for otherwise property definitions
 // would appear before templated getter functions are defined.
 %extend IfcGeom::Representation::Triangulation<float> {
@@ -256,6 +265,30 @@ struct ShapeRTTI : public boost::static_visitor<PyObject*>
 	%}
 };
 %extend IfcGeom::Representation::Triangulation<double> {
+	// Zero-copy read-only views on the native triangulation buffers. The
+	// views do not own the triangulation and are only valid for as long as
+	// it exists, which for iterator elements is until the iterator advances.
+	// Use ifcopenshell.util.shape, which copies the buffers by default.
+	PyObject* verts_buffer() const {
+		return helper_fn_vector_buffer($self->verts());
+	}
+
+	PyObject* normals_buffer() const {
+		return helper_fn_vector_buffer($self->normals());
+	}
+
+	PyObject* faces_buffer() const {
+		return helper_fn_vector_buffer($self->faces());
+	}
+
+	PyObject* edges_buffer() const {
+		return helper_fn_vector_buffer($self->edges());
+	}
+
+	PyObject* material_ids_buffer() const {
+		return helper_fn_vector_buffer($self->material_ids());
+	}
+
 	%pythoncode %{
         # Hide the getters with read-only property implementations
         verts = property(verts)
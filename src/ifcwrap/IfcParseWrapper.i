@@ -109,6 +109,20 @@ static IfcUtil::ArgumentType helper_fn_attribute_type(const IfcUtil::IfcBaseClas
 		return keys;
 	}
 
+	std::vector<unsigned> by_type_ids(const std::string& type, bool include_subtypes) {
+		IfcEntityList::ptr instances = include_subtypes
+			? $self->instances_by_type(type)
+			: $self->instances_by_type_excl_subtypes(type);
+		std::vector<unsigned> ids;
+		if (instances) {
+			ids.reserve(instances->size());
+			for (IfcEntityList::it it = instances->begin(); it != instances->end(); ++it) {
+				ids.push_back((*it)->data().id());
+			}
+		}
+		return ids;
+	}
+
 	std::vector<std::string> types() const {
 		const size_t n = std::distance($self->types_begin(), $self->types_end());
 		std::vector<std::string> ts;
@@ -226,6 +240,14 @@ static IfcUtil::ArgumentType helper_fn_attribute_type(const IfcUtil::IfcBaseClas
 		return self->declaration().name();
 	}
 
+	std::string is_a(bool with_schema) const {
+		if (with_schema) {
+			return self->declaration().schema()->name() + "." + self->declaration().name();
+		} else {
+			return self->declaration().name();
+		}
+	}
+
 	std::pair<IfcUtil::ArgumentType,Argument*> get_argument(unsigned i) {
 		return std::pair<IfcUtil::ArgumentType,Argument*>($self->data().getArgument(i)->type(), $self->data().getArgument(i));
 	}
@@ -684,10 +706,26 @@ static IfcUtil::ArgumentType helper_fn_attribute_type(const IfcUtil::IfcBaseClas
 
 %{
 	PyObject* get_info_cpp(IfcUtil::IfcBaseClass* v);
+	PyObject* convert_cpp_attribute_to_python(IfcUtil::ArgumentType type, Argument& arg, bool instances_as_ids = false);
+
+	// Entity instances are either expanded into dictionaries or, when
+	// instances_as_ids is set, returned as their STEP id. Type declaration
+	// instances (e.g. an IfcLabel in a select) have no id and are returned
+	// as their wrapped value instead.
+	PyObject* convert_cpp_instance_to_python(IfcUtil::IfcBaseClass* v, bool instances_as_ids) {
+		if (!instances_as_ids) {
+			return get_info_cpp(v);
+		}
+		if (v->declaration().as_entity()) {
+			return pythonize(v->data().id());
+		}
+		Argument* value = v->data().getArgument(0);
+		return convert_cpp_attribute_to_python(value->type(), *value, true);
+	}
 
 	// @todo refactor this to remove duplication with the typemap. 
 	// except this is calls the above function in case of instances.
-	PyObject* convert_cpp_attribute_to_python(IfcUtil::ArgumentType type, Argument& arg) {
+	PyObject* convert_cpp_attribute_to_python(IfcUtil::ArgumentType type, Argument& arg, bool instances_as_ids) {
 		if (!arg.isNull() && type != IfcUtil::Argument_DERIVED) {
 		try {
 		switch(type) {
@@ -726,13 +764,13 @@ static IfcUtil::ArgumentType helper_fn_attribute_type(const IfcUtil::IfcBaseClas
 			break; }
 			case IfcUtil::Argument_ENTITY_INSTANCE: {
 				IfcUtil::IfcBaseClass* v = arg;
-				return get_info_cpp(v);
+				return convert_cpp_instance_to_python(v, instances_as_ids);
 			break; }
 			case IfcUtil::Argument_AGGREGATE_OF_ENTITY_INSTANCE: {
 				IfcEntityList::ptr v = arg;
 				auto r = PyTuple_New(v->size());
 				for (unsigned i = 0; i < v->size(); ++i) {
-					PyTuple_SetItem(r, i, get_info_cpp((*v)[i]));
+					PyTuple_SetItem(r, i, convert_cpp_instance_to_python((*v)[i], instances_as_ids));
 				}				
 				return r;
 			break; }
@@ -755,7 +793,7 @@ static IfcUtil::ArgumentType helper_fn_attribute_type(const IfcUtil::IfcBaseClas
 					IfcEntityList::ptr v_i = arg;
 					auto r = PyTuple_New(v_i->size());
 					for (unsigned i = 0; i < v_i->size(); ++i) {
-						PyTuple_SetItem(r, i, get_info_cpp((*v_i)[i]));
+						PyTuple_SetItem(r, i, convert_cpp_instance_to_python((*v_i)[i], instances_as_ids));
 					}
 					PyTuple_SetItem(rs, std::distance(vs->begin(), it), r);
 				}				
@@ -813,3 +851,67 @@ static IfcUtil::ArgumentType helper_fn_attribute_type(const IfcUtil::IfcBaseClas
 	}
 %}
 
+
+%inline %{
+	// Reads the named attributes of all instances of a type in a single call.
+	// Returns a tuple of the instance ids, the attribute types and a list of
+	// columns with one value per instance, with entity instance references
+	// converted to ids.
+	PyObject* get_attributes_cpp(IfcParse::IfcFile* f, const std::string& type, const std::vector<std::string>& names, bool include_subtypes) {
+		const IfcParse::declaration* decl = f->schema()->declaration_by_name(type);
+		const IfcParse::entity* entity = decl->as_entity();
+		if (!entity) {
+			throw IfcParse::IfcException(type + " is not an entity");
+		}
+
+		const std::vector<const IfcParse::attribute*> attrs = entity->all_attributes();
+		std::vector<size_t> indices;
+		std::vector<IfcUtil::ArgumentType> types;
+		indices.reserve(names.size());
+		types.reserve(names.size());
+		for (auto it = names.begin(); it != names.end(); ++it) {
+			ptrdiff_t index = entity->attribute_index(*it);
+			if (index == -1) {
+				throw IfcParse::IfcException(*it + " not found on " + entity->name());
+			}
+			indices.push_back((size_t) index);
+			types.push_back(entity->derived()[index]
+				? IfcUtil::Argument_DERIVED
+				: IfcUtil::from_parameter_type(attrs[index]->type_of_attribute()));
+		}
+
+		IfcEntityList::ptr instances = include_subtypes
+			? f->instances_by_type(decl)
+			: f->instances_by_type_excl_subtypes(decl);
+		const unsigned n = instances ? instances->size() : 0;
+
+		PyObject* ids = PyList_New(n);
+		std::vector<PyObject*> columns;
+		columns.reserve(names.size());
+		for (size_t j = 0; j < names.size(); ++j) {
+			columns.push_back(PyList_New(n));
+		}
+
+		for (unsigned i = 0; i < n; ++i) {
+			IfcUtil::IfcBaseClass* inst = (*instances)[i];
+			PyList_SET_ITEM(ids, i, pythonize(inst->data().id()));
+			for (size_t j = 0; j < indices.size(); ++j) {
+				Argument* value = inst->data().getArgument(indices[j]);
+				PyList_SET_ITEM(columns[j], i, convert_cpp_attribute_to_python(types[j], *value, true));
+			}
+		}
+
+		PyObject* type_names = PyList_New(types.size());
+		PyObject* column_list = PyList_New(columns.size());
+		for (size_t j = 0; j < columns.size(); ++j) {
+			PyList_SET_ITEM(type_names, j, PyUnicode_FromString(IfcUtil::ArgumentTypeToString(types[j])));
+			PyList_SET_ITEM(column_list, j, columns[j]);
+		}
+
+		PyObject* result = PyTuple_New(3);
+		PyTuple_SET_ITEM(result, 0, ids);
+		PyTuple_SET_ITEM(result, 1, type_names);
+		PyTuple_SET_ITEM(result, 2, column_list);
+		return result;
+	}
+%}